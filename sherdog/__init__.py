@@ -0,0 +1,4 @@
+"""
+Scraper of fighters, fights, organizations and events from Sherdog. Modules are imported by their full name, e.g.
+from sherdog.scrapers import scrape_all_fighters, so importing the package itself stays free of dependencies.
+"""
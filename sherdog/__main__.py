@@ -0,0 +1,9 @@
+"""
+python -m sherdog runs the sherdog command.
+"""
+import sys
+
+from sherdog.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""
+Fight record analytics over scraped fights: per-fighter records, streaks, finish rates, distributions of finishing
+rounds and times and Elo-style ratings. Fights are loaded once into NumPy column arrays and every aggregate is
+computed by vectorized passes over them; ratings are updated chronologically one fight day at a time, so the whole
+history is rebuilt in a few thousand array operations instead of a Python loop over every row. Both views of a bout
+(one from each fighter page) are merged, so fights.jsonl, bouts exported by fight_index.py and fights scraped from
+event pages give the same results.
+
+python -m sherdog.analytics data/fights.jsonl --records data/records.jsonl --top 20
+"""
+import argparse
+import time
+
+from types import ModuleType
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sherdog.serialization import loads
+from sherdog.sinks import open_sink
+
+numpy: Optional[ModuleType]
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _get_numpy() -> ModuleType:
+    if numpy is None:
+        raise ImportError("Fight analytics requires numpy package")
+    return numpy
+
+
+# scores of results seen from fighter A, other results (no contest) are not scored
+SCORES = {"win": 1.0, "loss": 0.0, "draw": 0.5}
+METHOD_OTHER, METHOD_KO, METHOD_SUBMISSION, METHOD_DECISION = 0, 1, 2, 3
+# fights of unknown date are ordered after all dated ones by their event index
+UNDATED_DAY = 1 << 40
+ROUND_SECONDS = 300
+
+
+def get_method(general_decision: Optional[str]) -> int:
+    """
+    Classify general decision of a fight.
+    :param general_decision: General decision, e.g. KO, TKO, Submission or Decision.
+    :return: One of METHOD_* codes.
+    """
+    if not general_decision:
+        return METHOD_OTHER
+    decision = general_decision.upper()
+    if "KO" in decision:
+        return METHOD_KO
+    if decision.startswith("SUB"):
+        return METHOD_SUBMISSION
+    if decision.startswith("DECISION"):
+        return METHOD_DECISION
+    return METHOD_OTHER
+
+
+class FightAnalytics(object):
+    """FightAnalytics class - columnar store of unique bouts with vectorized aggregates and ratings."""
+
+    def __init__(self, columns: Dict[str, Any]) -> None:
+        """
+        Initializes a FightAnalytics instance, both views of the same bout are merged into one bout.
+        :param columns: Dictionary of equally long arrays fighter_a, fighter_b, event, day (days since epoch),
+                        score (of fighter A, NaN if not scored), method, round and time (seconds in the last round).
+        """
+        numpy = _get_numpy()
+        low = numpy.minimum(columns["fighter_a"], columns["fighter_b"])
+        high = numpy.maximum(columns["fighter_a"], columns["fighter_b"])
+        score = numpy.where(columns["fighter_a"] == low, columns["score"], 1.0 - columns["score"])
+        # bout key (fighters, event, round, time) as in fight_index.py, the first view of a bout is kept
+        order = numpy.lexsort((columns["time"], columns["round"], columns["event"], high, low))
+        keys = numpy.stack([low, high, columns["event"], columns["round"], columns["time"]])[:, order]
+        first = numpy.ones(len(order), dtype=bool)
+        first[1:] = numpy.any(keys[:, 1:] != keys[:, :-1], axis=0)
+        unique = order[first]
+
+        self.fighters, fighter_ids = numpy.unique(numpy.concatenate([low[unique], high[unique]]), return_inverse=True)
+        bouts = len(unique)
+        self.low = fighter_ids[:bouts]
+        self.high = fighter_ids[bouts:]
+        self.score = score[unique]
+        self.event = columns["event"][unique]
+        self.day = columns["day"][unique]
+        self.method = columns["method"][unique]
+        self.round = columns["round"][unique]
+        self.time = columns["time"][unique]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]]) -> "FightAnalytics":
+        """
+        Load fights in Fight.to_dict format.
+        :param rows: Dictionaries returned by Fight.to_dict.
+        :return: FightAnalytics instance.
+        """
+        numpy = _get_numpy()
+        fighter_a, fighter_b, event, dates, scores, methods, rounds, times = ([] for _ in range(8))
+        for row in rows:
+            fighter_a.append(row["fighterIndexA"])
+            fighter_b.append(row["fighterIndexB"])
+            event.append(row["eventIndex"])
+            dates.append(row["date"][:10] if row["date"] else None)
+            scores.append(SCORES.get((row["result"] or "").lower(), numpy.nan))
+            methods.append(get_method(row["generalDecision"]))
+            rounds.append(row["round"])
+            times.append(row["specificTime"])
+        day = numpy.array(dates, dtype="datetime64[D]").astype("int64")
+        event_array = numpy.array(event, dtype=numpy.int64)
+        undated = numpy.array([date is None for date in dates], dtype=bool)
+        return cls(
+            {
+                "fighter_a": numpy.array(fighter_a, dtype=numpy.int64),
+                "fighter_b": numpy.array(fighter_b, dtype=numpy.int64),
+                "event": event_array,
+                "day": numpy.where(undated, UNDATED_DAY + event_array, day),
+                "score": numpy.array(scores, dtype=numpy.float64),
+                "method": numpy.array(methods, dtype=numpy.int8),
+                "round": numpy.array(rounds, dtype=numpy.int64),
+                "time": numpy.array(times, dtype=numpy.int64),
+            }
+        )
+
+    @classmethod
+    def from_jsonl(cls, *paths: str) -> "FightAnalytics":
+        """
+        Load fights from JSONL files, e.g. fights.jsonl written by scrape_all_fighters or bouts of fight_index.py.
+        :param paths: JSONL files with fights.
+        :return: FightAnalytics instance.
+        """
+
+        def iterate_rows() -> Iterator[Dict[str, Any]]:
+            for path in paths:
+                with open(path, "rb") as fights_file:
+                    for line in fights_file:
+                        if line.strip():
+                            yield loads(line)
+
+        return cls.from_rows(iterate_rows())
+
+    def _get_views(self) -> Tuple[Any, Any, Any]:
+        # every bout seen from both fighters, ordered by fighter and then chronologically
+        numpy = _get_numpy()
+        fighter = numpy.concatenate([self.low, self.high])
+        score = numpy.concatenate([self.score, 1.0 - self.score])
+        method = numpy.concatenate([self.method, self.method])
+        event = numpy.concatenate([self.event, self.event])
+        order = numpy.lexsort((event, numpy.concatenate([self.day, self.day]), fighter))
+        return fighter[order], score[order], method[order]
+
+    def get_fight_seconds(self) -> Any:
+        """
+        Get total duration of bouts, finished rounds are counted as full five minute rounds.
+        :return: Array of seconds, -1 for bouts of unknown round or time.
+        """
+        numpy = _get_numpy()
+        known = (self.round > 0) & (self.time >= 0)
+        return numpy.where(known, (self.round - 1) * ROUND_SECONDS + self.time, -1)
+
+    def get_records(self) -> Dict[str, Any]:
+        """
+        Compute records of all fighters in vectorized passes.
+        :return: Dictionary of arrays aligned with fighters: fights, wins, losses, draws, no contests, wins by method,
+                 finish rate (share of wins by KO or submission), mean fight duration, longest win streak and
+                 current streak (positive for wins, negative for losses).
+        """
+        numpy = _get_numpy()
+        count = len(self.fighters)
+        fighter, score, method = self._get_views()
+        wins = score == 1.0
+        records: Dict[str, Any] = {"fighter": self.fighters}
+        records["fights"] = numpy.bincount(fighter, minlength=count)
+        records["wins"] = numpy.bincount(fighter, weights=wins, minlength=count).astype(numpy.int64)
+        records["losses"] = numpy.bincount(fighter, weights=score == 0.0, minlength=count).astype(numpy.int64)
+        records["draws"] = numpy.bincount(fighter, weights=score == 0.5, minlength=count).astype(numpy.int64)
+        records["no_contests"] = records["fights"] - records["wins"] - records["losses"] - records["draws"]
+        for name, method_code in (("ko", METHOD_KO), ("submission", METHOD_SUBMISSION), ("decision", METHOD_DECISION)):
+            method_wins = wins & (method == method_code)
+            records[f"{name}_wins"] = numpy.bincount(fighter, weights=method_wins, minlength=count).astype(numpy.int64)
+        finishes = records["ko_wins"] + records["submission_wins"]
+        records["finish_rate"] = numpy.divide(
+            finishes, records["wins"], out=numpy.zeros(count), where=records["wins"] > 0
+        )
+
+        seconds = numpy.concatenate([self.get_fight_seconds()] * 2)
+        fighter_ids = numpy.concatenate([self.low, self.high])
+        known = seconds >= 0
+        known_fights = numpy.bincount(fighter_ids, weights=known, minlength=count)
+        total_seconds = numpy.bincount(fighter_ids[known], weights=seconds[known], minlength=count)
+        records["mean_fight_seconds"] = numpy.divide(
+            total_seconds, known_fights, out=numpy.full(count, numpy.nan), where=known_fights > 0
+        )
+
+        # run-length encoding of chronological outcomes (1 win, -1 loss, 0 anything else) of every fighter
+        outcome = numpy.where(wins, 1, numpy.where(score == 0.0, -1, 0))
+        run_start = numpy.ones(len(fighter), dtype=bool)
+        run_start[1:] = (fighter[1:] != fighter[:-1]) | (outcome[1:] != outcome[:-1])
+        starts = numpy.flatnonzero(run_start)
+        run_length = numpy.diff(numpy.append(starts, len(fighter)))
+        run_fighter = fighter[starts]
+        run_outcome = outcome[starts]
+        longest = numpy.zeros(count, dtype=numpy.int64)
+        win_runs = run_outcome == 1
+        numpy.maximum.at(longest, run_fighter[win_runs], run_length[win_runs])
+        records["longest_win_streak"] = longest
+        last_run = numpy.ones(len(starts), dtype=bool)
+        last_run[:-1] = run_fighter[1:] != run_fighter[:-1]
+        current = numpy.zeros(count, dtype=numpy.int64)
+        current[run_fighter[last_run]] = run_length[last_run] * run_outcome[last_run]
+        records["current_streak"] = current
+        return records
+
+    def get_round_distribution(self, finishes_only: bool = True) -> Dict[int, int]:
+        """
+        Count bouts by their last round.
+        :param finishes_only: Count only bouts finished by KO or submission.
+        :return: Dictionary mapping round to number of bouts.
+        """
+        numpy = _get_numpy()
+        selected = self.round > 0
+        if finishes_only:
+            selected &= (self.method == METHOD_KO) | (self.method == METHOD_SUBMISSION)
+        counts = numpy.bincount(self.round[selected])
+        return {int(round_): int(counts[round_]) for round_ in numpy.flatnonzero(counts)}
+
+    def get_time_distribution(self, bin_seconds: int = 30, finishes_only: bool = True) -> Dict[int, int]:
+        """
+        Count bouts by time in their last round.
+        :param bin_seconds: Width of time bins.
+        :param finishes_only: Count only bouts finished by KO or submission.
+        :return: Dictionary mapping start of time bin in seconds to number of bouts.
+        """
+        numpy = _get_numpy()
+        selected = self.time >= 0
+        if finishes_only:
+            selected &= (self.method == METHOD_KO) | (self.method == METHOD_SUBMISSION)
+        counts = numpy.bincount(self.time[selected] // bin_seconds)
+        return {int(time_bin) * bin_seconds: int(counts[time_bin]) for time_bin in numpy.flatnonzero(counts)}
+
+    def get_ratings(self, k_factor: float = 32.0, initial_rating: float = 1500.0) -> Dict[str, Any]:
+        """
+        Compute Elo-style ratings over the whole history. Bouts of one day are rated together from the ratings
+        before that day, so a fighter fighting twice on the same day (tournaments) gets both updates summed.
+        Bouts without scored result (no contest) do not change ratings.
+        :param k_factor: Maximal rating change of one bout.
+        :param initial_rating: Rating of fighters before their first bout.
+        :return: Dictionary of arrays aligned with fighters: final rating, peak rating and number of rated bouts.
+        """
+        numpy = _get_numpy()
+        count = len(self.fighters)
+        ratings = numpy.full(count, initial_rating)
+        peaks = numpy.full(count, initial_rating)
+        scored = numpy.flatnonzero(~numpy.isnan(self.score))
+        scored = scored[numpy.lexsort((self.event[scored], self.day[scored]))]
+        low, high, score, day = self.low[scored], self.high[scored], self.score[scored], self.day[scored]
+        boundaries = numpy.append(numpy.flatnonzero(day[1:] != day[:-1]) + 1, len(day))
+        start = 0
+        for end in boundaries:
+            low_day, high_day = low[start:end], high[start:end]
+            expected = 1.0 / (1.0 + 10.0 ** ((ratings[high_day] - ratings[low_day]) / 400.0))
+            delta = k_factor * (score[start:end] - expected)
+            numpy.add.at(ratings, low_day, delta)
+            numpy.add.at(ratings, high_day, -delta)
+            peaks[low_day] = numpy.maximum(peaks[low_day], ratings[low_day])
+            peaks[high_day] = numpy.maximum(peaks[high_day], ratings[high_day])
+            start = end
+        rated = numpy.bincount(numpy.concatenate([low, high]), minlength=count)
+        return {"fighter": self.fighters, "rating": ratings, "peak_rating": peaks, "rated_fights": rated}
+
+    def iterate_records(self, ratings: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Join records with ratings into rows of the records file.
+        :param ratings: Ratings returned by get_ratings, computed with default parameters if not set.
+        :return: Iterator of dictionaries, one per fighter.
+        """
+        numpy = _get_numpy()
+        records = self.get_records()
+        records.update((name, values) for name, values in (ratings or self.get_ratings()).items())
+        columns = dict()
+        for name, values in records.items():
+            if values.dtype.kind == "f":
+                # NaN is not valid JSON
+                values = numpy.where(numpy.isnan(values), None, values)
+            columns[name] = values.tolist()
+        names = list(columns)
+        for values in zip(*columns.values()):
+            yield dict(zip(names, values))
+
+
+def get_top_fighters(ratings: Dict[str, Any], top: int = 20) -> List[Tuple[int, float]]:
+    """
+    Get fighters with the highest ratings.
+    :param ratings: Ratings returned by FightAnalytics.get_ratings.
+    :param top: Number of returned fighters.
+    :return: List of (fighter index, rating) tuples ordered from the highest rating.
+    """
+    numpy = _get_numpy()
+    order = numpy.argsort(-ratings["rating"])[:top]
+    return list(zip(ratings["fighter"][order].tolist(), ratings["rating"][order].tolist()))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute fighter records, streaks and ratings from scraped fights.")
+    parser.add_argument("fights", nargs="+", help="JSONL files with fights")
+    parser.add_argument("--records", help="file where records of fighters are written (.jsonl, .csv or .parquet)")
+    parser.add_argument("--top", type=int, default=20, help="number of printed fighters with the highest rating")
+    parser.add_argument("--k-factor", type=float, default=32.0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    analytics = FightAnalytics.from_jsonl(*args.fights)
+    elapsed = time.perf_counter() - start
+    print(f"Loaded {len(analytics.low)} bouts of {len(analytics.fighters)} fighters in {elapsed:.2f} s")
+    start = time.perf_counter()
+    fighter_ratings = analytics.get_ratings(k_factor=args.k_factor)
+    print(f"Rated the whole history in {time.perf_counter() - start:.2f} s")
+    for position, (fighter_index, rating) in enumerate(get_top_fighters(fighter_ratings, args.top), start=1):
+        print(f"{position:3d}. fighter {fighter_index:>7d} {rating:8.1f}")
+    print(f"Finishing rounds: {analytics.get_round_distribution()}")
+    if args.records:
+        with open_sink(args.records, "records") as sink:
+            sink.write(analytics.iterate_records(fighter_ratings))
+        print(f"Written records to {args.records}")
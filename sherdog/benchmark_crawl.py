@@ -0,0 +1,279 @@
+"""
+Offline benchmarks of the crawl engine against local stand-in of sherdog.com (see sherdog_standin.py),
+so changes of the engine can be measured reproducibly without touching the real site. Every benchmark runs
+in its own process and reports throughput, p50/p99 request latency and peak RSS. Measurements are checked
+against regression thresholds and the script exits with status 1 when any of them is violated.
+
+python -m sherdog.benchmark_crawl --fighters 300 --organizations 30 --latency 0.02 --not-found-rate 0.2
+python -m sherdog.benchmark_crawl --thresholds thresholds.json --output results.json
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+from typing import Any, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+from sherdog import scrapers
+
+from sherdog.fight import Fight
+from sherdog.http_session import set_base_url
+from sherdog.metrics import get_metrics
+from sherdog.sherdog_standin import StandInServer, SyntheticWorld
+
+FIRST_FIGHTER_INDEX = 472993
+FIRST_ORGANIZATION_INDEX = 17000
+
+# minimal throughput, maximal latency and memory, defaults are loose enough for a laptop
+DEFAULT_THRESHOLDS: Dict[str, Dict[str, float]] = {
+    "scrape_all_fighters": {"min_pages_per_second": 5.0, "max_p99_seconds": 1.0, "max_peak_rss_mb": 300.0},
+    "scrape_all_fighters_concurrently": {
+        "min_pages_per_second": 20.0,
+        "max_p99_seconds": 1.0,
+        "max_peak_rss_mb": 300.0,
+    },
+    "scrape_all_organizations": {"min_pages_per_second": 5.0, "max_p99_seconds": 1.0, "max_peak_rss_mb": 300.0},
+    "Fight.get_fights": {"min_pages_per_second": 200.0, "max_p99_seconds": 0.05, "max_peak_rss_mb": 300.0},
+}
+
+
+def _get_peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_crawl(function_name: str, kwargs: Dict[str, Any], base_url: str, results: Any) -> None:
+    # runs in a fresh process, so peak RSS and metrics belong to the benchmarked crawl only
+    set_base_url(base_url)
+    metrics = get_metrics()
+    metrics.reset()
+    with tempfile.TemporaryDirectory() as output_directory, open(os.devnull, "w") as devnull:
+        for name in ("fighters_filename", "fights_filename", "organization_filename", "events_filename"):
+            if name in kwargs:
+                kwargs[name] = os.path.join(output_directory, kwargs[name])
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(devnull):
+            getattr(scrapers, function_name)(**kwargs)
+        elapsed = time.perf_counter() - start
+    snapshot = metrics.to_dict()
+    results.put(
+        {
+            "seconds": elapsed,
+            "p50_seconds": snapshot["stages"]["request"]["p50"],
+            "p99_seconds": snapshot["stages"]["request"]["p99"],
+            "errors": metrics.get_counter("errors_total"),
+            "retries": metrics.get_counter("retries_total"),
+            "peak_rss_mb": _get_peak_rss_mb(),
+        }
+    )
+
+
+def benchmark_crawl(name: str, function_name: str, kwargs: Dict[str, Any], server: StandInServer) -> Dict[str, Any]:
+    """
+    Run crawl function against stand-in server in a separate process.
+    :param name: Name of the benchmark, key of its thresholds.
+    :param function_name: Name of crawl function in scrapers module.
+    :param kwargs: Arguments of the crawl function, output file names are placed to a temporary directory.
+    :param server: Running stand-in server.
+    :return: Measurement with pages per second, bytes per second, latency percentiles and peak RSS.
+    """
+    stats_before = server.get_stats()
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_run_crawl, args=(function_name, kwargs, server.base_url, results))
+    process.start()
+    measurement = results.get()
+    process.join()
+    stats = {key: value - stats_before.get(key, 0) for key, value in server.get_stats().items()}
+    elapsed = measurement.pop("seconds")
+    return {
+        "benchmark": name,
+        "seconds": elapsed,
+        "pages_per_second": stats.get("status_200", 0) / elapsed,
+        "bytes_per_second": stats.get("bytes", 0) / elapsed,
+        "requests": stats.get("requests", 0),
+        "not_found": stats.get("status_404", 0),
+        "throttled": stats.get("status_429", 0),
+        **measurement,
+    }
+
+
+def _run_get_fights(pages: List[Any], repeat: int, results: Any) -> None:
+    soups = [(fighter_index, BeautifulSoup(content, features="html.parser")) for fighter_index, content in pages]
+    durations = list()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for fighter_index, soup_obj in soups:
+            call_start = time.perf_counter()
+            Fight.get_fights(soup_obj=soup_obj, fighter_a_index=fighter_index)
+            durations.append(time.perf_counter() - call_start)
+    elapsed = time.perf_counter() - start
+    durations.sort()
+    results.put(
+        {
+            "seconds": elapsed,
+            "p50_seconds": durations[len(durations) // 2],
+            "p99_seconds": durations[min(len(durations) - 1, int(0.99 * len(durations)))],
+            "peak_rss_mb": _get_peak_rss_mb(),
+        }
+    )
+
+
+def benchmark_get_fights(pages: List[Any], repeat: int = 3) -> Dict[str, Any]:
+    """
+    Measure Fight.get_fights on already parsed pages, parsing of HTML is not part of the measurement.
+    :param pages: List of (fighter_index, page_content) tuples.
+    :param repeat: How many times the pages are processed.
+    :return: Measurement with pages per second, latency percentiles of one call and peak RSS.
+    """
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_run_get_fights, args=(pages, repeat, results))
+    process.start()
+    measurement = results.get()
+    process.join()
+    return {
+        "benchmark": "Fight.get_fights",
+        "pages_per_second": len(pages) * repeat / measurement["seconds"],
+        **measurement,
+    }
+
+
+def check_thresholds(measurements: List[Dict[str, Any]], thresholds: Dict[str, Dict[str, float]]) -> List[str]:
+    """
+    Compare measurements with regression thresholds.
+    :param measurements: Measurements returned by benchmark functions.
+    :param thresholds: Benchmark name to min_pages_per_second, max_p99_seconds and max_peak_rss_mb mapping.
+    :return: Descriptions of violated thresholds, empty if there are none.
+    """
+    violations = list()
+    for measurement in measurements:
+        limits = thresholds.get(measurement["benchmark"], dict())
+        name = measurement["benchmark"]
+        if measurement["pages_per_second"] < limits.get("min_pages_per_second", 0.0):
+            violations.append(
+                f"{name}: {measurement['pages_per_second']:.1f} pages/s < {limits['min_pages_per_second']}"
+            )
+        p99 = measurement["p99_seconds"]
+        if p99 is not None and p99 > limits.get("max_p99_seconds", float("inf")):
+            violations.append(f"{name}: p99 {p99:.4f} s > {limits['max_p99_seconds']}")
+        if measurement["peak_rss_mb"] > limits.get("max_peak_rss_mb", float("inf")):
+            violations.append(f"{name}: peak RSS {measurement['peak_rss_mb']:.0f} MB > {limits['max_peak_rss_mb']}")
+    return violations
+
+
+def run_benchmarks(
+    fighters: int = 300,
+    organizations: int = 30,
+    concurrency: int = 8,
+    latency_seconds: float = 0.02,
+    not_found_rate: float = 0.2,
+    throttle_rate: float = 0.0,
+    seed: int = 0,
+    corpus_directory: Optional[str] = None,
+    benchmarks: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Run all benchmarks against freshly started stand-in server.
+    :param fighters: Number of fighter indexes crawled by fighter benchmarks.
+    :param organizations: Number of organization indexes crawled by organization benchmark.
+    :param concurrency: Number of requests in flight of the concurrent crawl.
+    :param latency_seconds: Latency of every answer of the stand-in server.
+    :param not_found_rate: Share of missing fighters and organizations.
+    :param throttle_rate: Share of requests answered by 429.
+    :param seed: Seed of synthetic pages and injected failures.
+    :param corpus_directory: Directory with recorded pages served instead of synthetic ones.
+    :param benchmarks: Names of benchmarks to run, all of them by default.
+    :return: List of measurements.
+    """
+    selected = benchmarks or list(DEFAULT_THRESHOLDS)
+    measurements = list()
+    fighter_range = {"start_index": FIRST_FIGHTER_INDEX, "end_index": FIRST_FIGHTER_INDEX + fighters - 1}
+    fighter_files = {"fighters_filename": "fighters.jsonl", "fights_filename": "fights.jsonl"}
+    with StandInServer(
+        corpus_directory=corpus_directory,
+        latency_seconds=latency_seconds,
+        not_found_rate=not_found_rate,
+        throttle_rate=throttle_rate,
+        seed=seed,
+    ) as server:
+        if "scrape_all_fighters" in selected:
+            kwargs = {"scrape_fighters_cnt": fighters, **fighter_files, **fighter_range}
+            measurements.append(benchmark_crawl("scrape_all_fighters", "scrape_all_fighters", kwargs, server))
+        if "scrape_all_fighters_concurrently" in selected:
+            kwargs = {"concurrency": concurrency, "requests_per_second": 0.0, **fighter_files, **fighter_range}
+            measurements.append(
+                benchmark_crawl(
+                    "scrape_all_fighters_concurrently", "scrape_all_fighters_concurrently", kwargs, server
+                )
+            )
+        if "scrape_all_organizations" in selected:
+            kwargs = {
+                "organization_filename": "organizations.jsonl",
+                "events_filename": "events.jsonl",
+                "start_index": FIRST_ORGANIZATION_INDEX,
+                "end_index": FIRST_ORGANIZATION_INDEX + organizations - 1,
+            }
+            measurements.append(
+                benchmark_crawl("scrape_all_organizations", "scrape_all_organizations", kwargs, server)
+            )
+    if "Fight.get_fights" in selected:
+        world = SyntheticWorld(seed=seed)
+        pages = [
+            (fighter_index, world.fighter_page(fighter_index))
+            for fighter_index in range(FIRST_FIGHTER_INDEX, FIRST_FIGHTER_INDEX + fighters)
+        ]
+        measurements.append(benchmark_get_fights(pages))
+    return measurements
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark crawl engine against local stand-in of sherdog.com.")
+    parser.add_argument("--fighters", type=int, default=300, help="number of crawled fighter indexes")
+    parser.add_argument("--organizations", type=int, default=30, help="number of crawled organization indexes")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02, help="latency of stand-in answers in seconds")
+    parser.add_argument("--not-found-rate", type=float, default=0.2)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus", help="directory with recorded fighters/, organizations/ and events/ pages")
+    parser.add_argument("--benchmarks", nargs="+", choices=sorted(DEFAULT_THRESHOLDS))
+    parser.add_argument("--thresholds", help="JSON file overriding default regression thresholds")
+    parser.add_argument("--output", help="JSON file where measurements are saved")
+    args = parser.parse_args()
+
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    if args.thresholds:
+        with open(args.thresholds) as thresholds_file:
+            thresholds.update(json.load(thresholds_file))
+    results = run_benchmarks(
+        fighters=args.fighters,
+        organizations=args.organizations,
+        concurrency=args.concurrency,
+        latency_seconds=args.latency,
+        not_found_rate=args.not_found_rate,
+        throttle_rate=args.throttle_rate,
+        seed=args.seed,
+        corpus_directory=args.corpus,
+        benchmarks=args.benchmarks,
+    )
+    for result in results:
+        p50 = f"{result['p50_seconds'] * 1000:.2f}" if result["p50_seconds"] is not None else "-"
+        p99 = f"{result['p99_seconds'] * 1000:.2f}" if result["p99_seconds"] is not None else "-"
+        print(
+            f"{result['benchmark']:<34} {result['pages_per_second']:9.1f} pages/s  p50 {p50} ms  "
+            f"p99 {p99} ms  peak RSS {result['peak_rss_mb']:.1f} MB"
+        )
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+    failures = check_thresholds(results, thresholds)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,167 @@
+"""
+Benchmark of extraction backends over a corpus of saved fighter pages.
+Pages have to be stored as <fighter_index>.html files, e.g. pages/27944.html.
+
+python -m sherdog.benchmark_parsers pages/ --backends soup lxml
+"""
+import argparse
+import datetime
+import glob
+import multiprocessing
+import os
+import random
+import resource
+import time
+
+from typing import Any, Dict, List
+
+from sherdog.extractors import EXTRACTORS
+from sherdog.offline_parser import parse_fighter_page
+from sherdog.fighter import Fighter
+from sherdog.normalization import (
+    BIRTH_DATE_FORMAT,
+    FIGHT_DATE_FORMAT,
+    clear_caches,
+    normalize_birth_date,
+    normalize_fight_date,
+)
+from sherdog.user_agent import get_user_agent
+
+
+def load_corpus(directory: str) -> List[Any]:
+    """
+    Load saved fighter pages into memory, so disk reads are not part of the measurement.
+    :param directory: Directory with <fighter_index>.html files.
+    :return: List of (fighter_index, page_content) tuples.
+    """
+    corpus = list()
+    for path in sorted(glob.glob(os.path.join(directory, "*.html"))):
+        with open(path, "rb") as page_file:
+            corpus.append((Fighter.get_index_from_path(path), page_file.read()))
+    return corpus
+
+
+def _run_backend(backend: str, corpus: List[Any], repeat: int, results: Any) -> None:
+    # every backend runs in its own process so peak RSS is not shared between backends
+    parsed: List[Any] = list()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parsed = list()
+        for fighter_index, content in corpus:
+            try:
+                parsed.append(parse_fighter_page(content, fighter_index, backend=backend))
+            except Exception as error:
+                parsed.append(repr(error))
+    elapsed = time.perf_counter() - start
+    results.put(
+        {
+            "backend": backend,
+            "pages_per_second": len(corpus) * repeat / elapsed if elapsed else 0.0,
+            "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+            "parsed": parsed,
+        }
+    )
+
+
+def benchmark(corpus: List[Any], backends: List[str], repeat: int = 1) -> List[Dict[str, Any]]:
+    """
+    Measure pages/sec and peak memory of given backends, output of each backend is compared to the first one.
+    :param corpus: Pages returned by load_corpus.
+    :param backends: Names of compared backends.
+    :param repeat: How many times the corpus is parsed.
+    :return: List of measurements, one per backend.
+    """
+    measurements = list()
+    for backend in backends:
+        results: Any = multiprocessing.Queue()
+        process = multiprocessing.Process(target=_run_backend, args=(backend, corpus, repeat, results))
+        process.start()
+        measurements.append(results.get())
+        process.join()
+    reference = measurements[0]["parsed"]
+    for measurement in measurements:
+        parsed = measurement.pop("parsed")
+        measurement["mismatched_pages"] = sum(1 for a, b in zip(reference, parsed) if a != b)
+    return measurements
+
+
+def measure_construction(count: int = 10000) -> Dict[str, float]:
+    """
+    Measure per-object cost of Fighter construction and of getting User-Agent header for a request.
+    :param count: Number of measured calls.
+    :return: Dictionary with microseconds per Fighter and per user agent.
+    """
+    # the first call loads user agents database, it is paid once per process
+    start = time.perf_counter()
+    get_user_agent()
+    first_user_agent = time.perf_counter() - start
+    start = time.perf_counter()
+    for fighter_index in range(count):
+        Fighter(fighter_index=fighter_index)
+    fighter_elapsed = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(count):
+        get_user_agent()
+    user_agent_elapsed = time.perf_counter() - start
+    return {
+        "fighter_us": fighter_elapsed / count * 1e6,
+        "user_agent_us": user_agent_elapsed / count * 1e6,
+        "user_agent_load_ms": first_user_agent * 1e3,
+    }
+
+
+def measure_date_normalization(count: int = 200000, distinct_dates: int = 5000) -> Dict[str, float]:
+    """
+    Measure per-row cost of date normalization with strptime and with the cached normalization, results of both
+    paths are compared.
+    :param count: Number of normalized dates, as many as fight rows of a large crawl.
+    :param distinct_dates: Number of distinct dates repeated across the rows.
+    :return: Dictionary with microseconds per date of both paths and number of mismatched results.
+    """
+    randomizer = random.Random(0)
+    first_day = datetime.date(1990, 1, 1)
+    days = [first_day + datetime.timedelta(days=randomizer.randrange(12000)) for _ in range(distinct_dates)]
+    measurements = dict()
+    for name, date_format, normalize in (
+        ("fight_date", FIGHT_DATE_FORMAT, normalize_fight_date),
+        ("birth_date", BIRTH_DATE_FORMAT, normalize_birth_date),
+    ):
+        texts = [randomizer.choice(days).strftime(date_format) for _ in range(count)]
+        start = time.perf_counter()
+        expected = [datetime.datetime.strptime(text, date_format).isoformat() for text in texts]
+        strptime_elapsed = time.perf_counter() - start
+        clear_caches()
+        start = time.perf_counter()
+        normalized = [normalize(text) for text in texts]
+        cached_elapsed = time.perf_counter() - start
+        measurements[f"{name}_strptime_us"] = strptime_elapsed / count * 1e6
+        measurements[f"{name}_cached_us"] = cached_elapsed / count * 1e6
+        measurements[f"{name}_mismatched"] = sum(1 for a, b in zip(expected, normalized) if a != b)
+    return measurements
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmark fighter page extraction backends.")
+    arg_parser.add_argument("corpus", help="directory with saved <fighter_index>.html pages")
+    arg_parser.add_argument("--backends", nargs="+", default=list(EXTRACTORS), choices=sorted(EXTRACTORS))
+    arg_parser.add_argument("--repeat", type=int, default=1)
+    args = arg_parser.parse_args()
+
+    construction = measure_construction()
+    print(
+        f"Fighter construction {construction['fighter_us']:.2f} us | "
+        f"user agent {construction['user_agent_us']:.2f} us (first load {construction['user_agent_load_ms']:.1f} ms)"
+    )
+    dates = measure_date_normalization()
+    for name in ("fight_date", "birth_date"):
+        print(
+            f"{name}: strptime {dates[f'{name}_strptime_us']:.2f} us | cached {dates[f'{name}_cached_us']:.2f} us | "
+            f"mismatched {dates[f'{name}_mismatched']:.0f}"
+        )
+    pages = load_corpus(args.corpus)
+    print(f"Loaded {len(pages)} pages")
+    for result in benchmark(pages, args.backends, repeat=args.repeat):
+        print(
+            f"{result['backend']:>6}: {result['pages_per_second']:8.1f} pages/sec | "
+            f"peak RSS {result['peak_rss_mb']:7.1f} MB | mismatched pages {result['mismatched_pages']}"
+        )
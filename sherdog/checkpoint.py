@@ -0,0 +1,143 @@
+import datetime
+import sqlite3
+import threading
+
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class CrawlLedger(object):
+    """CrawlLedger class - durable record of done, failed and skipped indexes, so a crawl can be resumed."""
+
+    DONE = "done"
+    FAILED = "failed"
+    SKIPPED = "skipped"
+
+    def __init__(self, path: str = "data/crawl.sqlite", kind: str = "fighters") -> None:
+        """
+        Initializes a CrawlLedger instance, creates the sqlite database if it does not exist.
+        :param path: Path to the sqlite database, it can be shared by ledgers of different kinds.
+        :param kind: Kind of crawled pages (e.g. fighters or organizations).
+        """
+        self.path = path
+        self.kind = kind
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS ledger (
+                kind TEXT NOT NULL,
+                idx INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (kind, idx)
+            )
+            """
+        )
+        self._connection.commit()
+
+    def pending(
+        self, start_index: int, end_index: int, shard: int = 0, shards: int = 1, max_attempts: int = 3
+    ) -> Iterator[int]:
+        """
+        Get indexes which still have to be crawled - never seen ones and failed ones with attempts left.
+        Index space is split to shards by modulo, so several machines can crawl the same range without overlap.
+        :param start_index: First index of the range.
+        :param end_index: Last index of the range (inclusive).
+        :param shard: Shard crawled by this process, from 0 to shards - 1.
+        :param shards: Number of shards.
+        :param max_attempts: Failed index is retried until it fails this many times.
+        :return: Iterator of indexes in ascending order.
+        """
+        if not 0 <= shard < shards:
+            raise ValueError(f"Shard has to be between 0 and {shards - 1}, got {shard}")
+        with self._lock:
+            finished = {
+                row[0]
+                for row in self._connection.execute(
+                    "SELECT idx FROM ledger WHERE kind = ? AND idx BETWEEN ? AND ? AND (state != ? OR attempts >= ?)",
+                    (self.kind, start_index, end_index, self.FAILED, max_attempts),
+                )
+            }
+        first_index = start_index + (shard - start_index) % shards
+        for index in range(first_index, end_index + 1, shards):
+            if index not in finished:
+                yield index
+
+    def filter_pending(self, indexes: Iterable[int], max_attempts: int = 3) -> List[int]:
+        """
+        Keep indexes which still have to be crawled, for sparse indexes not forming a range (e.g. events).
+        :param indexes: Candidate indexes.
+        :param max_attempts: Failed index is retried until it fails this many times.
+        :return: List of pending indexes in the given order.
+        """
+        with self._lock:
+            finished = {
+                row[0]
+                for row in self._connection.execute(
+                    "SELECT idx FROM ledger WHERE kind = ? AND (state != ? OR attempts >= ?)",
+                    (self.kind, self.FAILED, max_attempts),
+                )
+            }
+        return [index for index in indexes if index not in finished]
+
+    def mark_done(self, index: int) -> None:
+        self._mark(index, self.DONE)
+
+    def mark_skipped(self, index: int) -> None:
+        self._mark(index, self.SKIPPED)
+
+    def mark_failed(self, index: int, error: Optional[str] = None) -> None:
+        self._mark(index, self.FAILED, error)
+
+    def get_state(self, index: int) -> Optional[Dict[str, object]]:
+        """
+        Get record of a given index.
+        :param index: Crawled index.
+        :return: Dictionary with state, attempts and error keys or None if index was not crawled yet.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT state, attempts, error FROM ledger WHERE kind = ? AND idx = ?", (self.kind, index)
+            ).fetchone()
+        if not row:
+            return None
+        return {"state": row[0], "attempts": row[1], "error": row[2]}
+
+    def summary(self) -> Dict[str, int]:
+        """
+        Count indexes of the ledger kind by their state.
+        :return: Dictionary with number of done, failed and skipped indexes.
+        """
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT state, COUNT(*) FROM ledger WHERE kind = ? GROUP BY state", (self.kind,)
+            ).fetchall()
+        counts = {self.DONE: 0, self.FAILED: 0, self.SKIPPED: 0}
+        counts.update(dict(rows))
+        return counts
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def _mark(self, index: int, state: str, error: Optional[str] = None) -> None:
+        # attempts count only failures, successful retry keeps the number of previous failures
+        failed = 1 if state == self.FAILED else 0
+        now = datetime.datetime.utcnow().replace(microsecond=0).isoformat()
+        with self._lock:
+            self._connection.execute(
+                """
+                INSERT INTO ledger (kind, idx, state, attempts, error, updated_at) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (kind, idx) DO UPDATE SET
+                    state = excluded.state,
+                    attempts = ledger.attempts + excluded.attempts,
+                    error = excluded.error,
+                    updated_at = excluded.updated_at
+                """,
+                (self.kind, index, state, failed, error, now),
+            )
+            self._connection.commit()
@@ -0,0 +1,396 @@
+"""
+Command line entry point of the parser, installed as sherdog command. Only the standard library is imported at
+startup, every subcommand imports the modules it uses, so short jobs do not pay for requests, BeautifulSoup,
+pyarrow or the proxy code they never touch.
+
+sherdog fighters --start 1 --end 500000 --concurrency 16 --fighters-output data/fighters.jsonl
+sherdog organizations --start 17000 --end 20000
+sherdog events --since 2024-01-01
+sherdog refresh --events data/events.jsonl
+sherdog proxies validate --output data/proxies.txt
+sherdog parse-only pages/ --backend lxml
+sherdog benchmark --fighters 300 --organizations 30
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+from typing import Any, Callable, List, Optional
+
+DEFAULT_LEDGER = "data/crawl.sqlite"
+DEFAULT_USER_AGENT_CACHE = "data/user_agents.json"
+LEDGER_HELP = (
+    f"crawl ledger, {DEFAULT_LEDGER} by default unless an output is Parquet, which cannot be resumed, "
+    "empty string disables resuming"
+)
+COMMANDS = ("fighters", "organizations", "events", "refresh", "proxies", "parse-only", "benchmark")
+
+
+def _make_directories(*paths: str) -> None:
+    for path in paths:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+
+def _open_ledger(args: argparse.Namespace, kind: str, *outputs: str) -> Optional[Any]:
+    ledger_path = args.ledger
+    if ledger_path is None:
+        # Parquet is written at once and cannot be resumed, so the default ledger is used for appendable outputs only
+        if any(output.lower().endswith(".parquet") for output in outputs):
+            return None
+        ledger_path = DEFAULT_LEDGER
+    if not ledger_path:
+        return None
+    from sherdog.checkpoint import CrawlLedger
+
+    _make_directories(ledger_path)
+    return CrawlLedger(ledger_path, kind=kind)
+
+
+def _open_page_store(args: argparse.Namespace) -> Optional[Any]:
+    if not args.page_store:
+        return None
+    from sherdog.page_store import PageStore
+
+    _make_directories(args.page_store)
+    return PageStore(args.page_store)
+
+
+def _open_liveness(args: argparse.Namespace) -> Optional[Any]:
+    if not args.liveness:
+        return None
+    from sherdog.probe import LivenessMap
+
+    _make_directories(args.liveness)
+    return LivenessMap(args.liveness)
+
+
+def _run_crawl(args: argparse.Namespace, function: Callable[..., Any], **kwargs: Any) -> Any:
+    # metrics and profiling are shared by all crawl subcommands
+    from sherdog.metrics import get_metrics, serve_metrics, start_json_dump
+
+    if args.metrics_port:
+        serve_metrics(args.metrics_port)
+    stop_dump = start_json_dump(args.metrics_json) if args.metrics_json else None
+    try:
+        if args.profile:
+            from sherdog.scrapers import run_profiled
+
+            return run_profiled(args.profile, function, **kwargs)
+        return function(**kwargs)
+    finally:
+        if stop_dump:
+            stop_dump.set()
+            get_metrics().dump_json(args.metrics_json)
+        if args.print_metrics:
+            print(json.dumps(get_metrics().to_dict(), indent=2))
+
+
+def run_fighters(args: argparse.Namespace) -> int:
+    from sherdog.scrapers import scrape_all_fighters_concurrently
+
+    proxy_pool = None
+    if args.proxies:
+        from sherdog.proxy import ProxyPool
+
+        # adaptive crawl retries throttled answers in the rate limiter, not inside proxy sessions
+        proxy_pool = ProxyPool(retries=0) if args.adaptive else ProxyPool()
+        proxy_pool.start()
+    liveness = _open_liveness(args)
+    _make_directories(args.fighters_output, args.fights_output)
+    try:
+        _run_crawl(
+            args,
+            scrape_all_fighters_concurrently,
+            fighters_filename=args.fighters_output,
+            fights_filename=args.fights_output,
+            start_index=args.start,
+            end_index=args.end,
+            concurrency=args.concurrency,
+            requests_per_second=args.requests_per_second,
+            page_store=_open_page_store(args),
+            backend=args.backend,
+            ledger=_open_ledger(args, "fighters", args.fighters_output, args.fights_output),
+            shard=args.shard,
+            shards=args.shards,
+            proxy_pool=proxy_pool,
+            http2=args.http2,
+            liveness=liveness,
+            probe=args.probe,
+            adaptive=args.adaptive,
+        )
+    finally:
+        if proxy_pool:
+            proxy_pool.stop()
+    return 0
+
+
+def run_organizations(args: argparse.Namespace) -> int:
+    from sherdog.scrapers import scrape_all_organizations
+
+    rate_limiter = None
+    if args.adaptive:
+        from sherdog.crawler import AdaptiveRateLimiter
+
+        rate_limiter = AdaptiveRateLimiter(args.requests_per_second or 4.0, max_concurrency=args.concurrency)
+    liveness = _open_liveness(args)
+    _make_directories(args.organizations_output, args.events_output)
+    _run_crawl(
+        args,
+        scrape_all_organizations,
+        organization_filename=args.organizations_output,
+        events_filename=args.events_output,
+        page_store=_open_page_store(args),
+        start_index=args.start,
+        end_index=args.end,
+        ledger=_open_ledger(args, "organizations", args.organizations_output, args.events_output),
+        shard=args.shard,
+        shards=args.shards,
+        liveness=liveness,
+        rate_limiter=rate_limiter,
+        concurrency=args.concurrency,
+        requests_per_second=0.0 if args.adaptive else args.requests_per_second,
+        probe=args.probe,
+    )
+    return 0
+
+
+def run_events(args: argparse.Namespace) -> int:
+    from sherdog.scrapers import scrape_all_events
+
+    _make_directories(args.fights_output)
+    _run_crawl(
+        args,
+        scrape_all_events,
+        events_filename=args.events,
+        fights_filename=args.fights_output,
+        since=args.since,
+        concurrency=args.concurrency,
+        requests_per_second=args.requests_per_second,
+        page_store=_open_page_store(args),
+        ledger=_open_ledger(args, "events", args.fights_output),
+    )
+    return 0
+
+
+def run_refresh(args: argparse.Namespace) -> int:
+    from sherdog.incremental import refresh_from_events
+
+    _make_directories(args.fighters_output, args.fights_output, args.state)
+    counts = _run_crawl(
+        args,
+        refresh_from_events,
+        events_filename=args.events,
+        fighters_filename=args.fighters_output,
+        fights_filename=args.fights_output,
+        state_path=args.state,
+        since=args.since,
+        concurrency=args.concurrency,
+        backend=args.backend,
+        requests_per_second=args.requests_per_second,
+    )
+    print(f"Refreshed {counts['fighters']} fighters and {counts['fights']} fights from {counts['events']} events")
+    return 0
+
+
+def run_proxies_validate(args: argparse.Namespace) -> int:
+    from sherdog.proxy import Proxies
+
+    proxies = Proxies()
+    if args.input:
+        with open(args.input) as input_file:
+            proxies_data = [{"url": line.strip(), "https_available": True} for line in input_file if line.strip()]
+    else:
+        proxies_data = list(proxies._get_free_proxies())
+    print(f"Validating {len(proxies_data)} proxies")
+    valid_proxies = sorted(
+        proxies._get_only_valid_proxies(proxies_data), key=lambda proxy_data: proxy_data["request_time"]
+    )
+    for proxy_data in valid_proxies:
+        https = "https" if proxy_data["https_available"] else "http only"
+        print(f"{proxy_data['url']:<22} {proxy_data['request_time'] * 1000:8.1f} ms  {https}")
+    print(f"Got {len(valid_proxies)} valid proxies")
+    if args.output:
+        _make_directories(args.output)
+        with open(args.output, "w") as output_file:
+            output_file.writelines(f"{proxy_data['url']}\n" for proxy_data in valid_proxies)
+    return 0 if valid_proxies else 1
+
+
+def run_parse_only(args: argparse.Namespace) -> int:
+    import glob
+
+    from sherdog.offline_parser import parse_fighter_files
+    from sherdog.sinks import open_sink
+
+    paths = sorted(glob.glob(os.path.join(args.pages, "*.html")))
+    _make_directories(args.fighters_output, args.fights_output)
+    parsed_pages = 0
+    with open_sink(args.fighters_output, "fighters") as fighter_file:
+        with open_sink(args.fights_output, "fights") as fights_file:
+            for fighter, fights in parse_fighter_files(paths, processes=args.processes, backend=args.backend):
+                if fighter is not None:
+                    fighter_file.write([fighter])
+                    fights_file.write(fights)
+                    parsed_pages += 1
+    print(f"Parsed {parsed_pages} of {len(paths)} pages from {args.pages}")
+    return 0
+
+
+def run_benchmark(args: argparse.Namespace) -> int:
+    from sherdog.benchmark_crawl import DEFAULT_THRESHOLDS, check_thresholds, run_benchmarks
+
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    if args.thresholds:
+        with open(args.thresholds) as thresholds_file:
+            thresholds.update(json.load(thresholds_file))
+    results = run_benchmarks(
+        fighters=args.fighters,
+        organizations=args.organizations,
+        concurrency=args.concurrency,
+        latency_seconds=args.latency,
+        not_found_rate=args.not_found_rate,
+        benchmarks=args.benchmarks,
+    )
+    for result in results:
+        print(
+            f"{result['benchmark']:<34} {result['pages_per_second']:9.1f} pages/s  "
+            f"peak RSS {result['peak_rss_mb']:.1f} MB"
+        )
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(results, output_file, indent=2)
+    failures = check_thresholds(results, thresholds)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+
+def _add_crawl_arguments(parser: argparse.ArgumentParser, start: int, end: int, concurrency: int, rate: float) -> None:
+    parser.add_argument("--start", type=int, default=start, help="first crawled index")
+    parser.add_argument("--end", type=int, default=end, help="last crawled index (inclusive)")
+    parser.add_argument("--concurrency", type=int, default=concurrency, help="requests in flight")
+    parser.add_argument("--requests-per-second", type=float, default=rate, help="rate limit, 0 disables it")
+    parser.add_argument("--shard", type=int, default=0, help="shard crawled by this process, from 0")
+    parser.add_argument("--shards", type=int, default=1, help="number of shards the index range is split to")
+    parser.add_argument("--liveness", metavar="FILE", help="bitmap of live and dead indexes")
+    parser.add_argument("--probe", action="store_true", help="probe unknown indexes by HEAD, requires --liveness")
+    parser.add_argument("--adaptive", action="store_true", help="adapt rate to 429/5xx answers and latency")
+
+
+def get_parser() -> argparse.ArgumentParser:
+    """
+    Build parser of command line arguments with all subcommands.
+    :return: Argument parser, handler of the chosen subcommand is stored in its handler attribute.
+    """
+    parser = argparse.ArgumentParser(prog="sherdog", description="Scrape fighters, fights and events from Sherdog.")
+    parser.add_argument("--profile", metavar="FILE", help="run under cProfile and save stats to FILE")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this port")
+    parser.add_argument("--metrics-json", metavar="FILE", help="dump metrics as JSON to FILE every minute")
+    parser.add_argument("--print-metrics", action="store_true", help="print metrics as JSON when the crawl ends")
+    parser.add_argument("--log-file", default="sherdog.log")
+    parser.add_argument(
+        "--user-agent-cache",
+        default=DEFAULT_USER_AGENT_CACHE,
+        metavar="FILE",
+        help="JSON cache of user agents, so fake_useragent is loaded only once, empty string disables it",
+    )
+    parser.add_argument(
+        "--user-agent-rotation",
+        default="random",
+        choices=["random", "round-robin", "fixed"],
+        help="how User-Agent header changes between requests",
+    )
+    subparsers = parser.add_subparsers(dest="command", metavar="command")
+    subparsers.required = True
+
+    fighters = subparsers.add_parser("fighters", help="crawl fighters and their fights")
+    _add_crawl_arguments(fighters, start=472993, end=500000, concurrency=8, rate=4.0)
+    fighters.add_argument("--fighters-output", default="data/fighters.jsonl", help=".jsonl, .csv, .parquet or .sqlite")
+    fighters.add_argument("--fights-output", default="data/fights.jsonl", help=".jsonl, .csv, .parquet or .sqlite")
+    fighters.add_argument("--backend", default="soup", choices=["soup", "strainer", "lxml"])
+    fighters.add_argument("--ledger", help=LEDGER_HELP)
+    fighters.add_argument("--page-store", metavar="FILE", help="archive of downloaded pages")
+    fighters.add_argument("--proxies", action="store_true", help="send requests through pool of free proxies")
+    fighters.add_argument("--http2", action="store_true", help="send direct requests over HTTP/2")
+    fighters.set_defaults(handler=run_fighters)
+
+    organizations = subparsers.add_parser("organizations", help="crawl organizations and their events")
+    _add_crawl_arguments(organizations, start=17000, end=20000, concurrency=4, rate=0.0)
+    organizations.add_argument("--organizations-output", default="data/organizations.jsonl")
+    organizations.add_argument("--events-output", default="data/events.jsonl")
+    organizations.add_argument("--ledger", help=LEDGER_HELP)
+    organizations.add_argument("--page-store", metavar="FILE", help="archive of downloaded pages")
+    organizations.set_defaults(handler=run_organizations)
+
+    events = subparsers.add_parser("events", help="crawl fight cards of events found by the organization crawl")
+    events.add_argument("--events", default="data/events.jsonl", help="events file of the organization crawl")
+    events.add_argument("--fights-output", default="data/event_fights.jsonl")
+    events.add_argument("--since", help="crawl only events of this ISO date and later")
+    events.add_argument("--concurrency", type=int, default=8)
+    events.add_argument("--requests-per-second", type=float, default=4.0)
+    events.add_argument("--ledger", help=LEDGER_HELP)
+    events.add_argument("--page-store", metavar="FILE", help="archive of downloaded pages")
+    events.set_defaults(handler=run_events)
+
+    refresh = subparsers.add_parser("refresh", help="re-scrape fighters of events newer than the last refresh")
+    refresh.add_argument("--events", default="data/events.jsonl", help="events file of the organization crawl")
+    refresh.add_argument("--fighters-output", default="data/fighters.jsonl", help="JSONL file updated in place")
+    refresh.add_argument("--fights-output", default="data/fights.jsonl", help="JSONL file updated in place")
+    refresh.add_argument("--state", default="data/refresh_state.json", help="date of the last refreshed event")
+    refresh.add_argument("--since", help="refresh events of this ISO date and later instead of the saved date")
+    refresh.add_argument("--concurrency", type=int, default=8)
+    refresh.add_argument("--requests-per-second", type=float, default=4.0)
+    refresh.add_argument("--backend", default="soup", choices=["soup", "strainer", "lxml"])
+    refresh.set_defaults(handler=run_refresh)
+
+    proxies = subparsers.add_parser("proxies", help="manage free proxies")
+    proxies_subparsers = proxies.add_subparsers(dest="proxies_command", metavar="command")
+    proxies_subparsers.required = True
+    validate = proxies_subparsers.add_parser("validate", help="validate free proxies and print the working ones")
+    validate.add_argument("--input", metavar="FILE", help="file with host:port per line, free proxy list by default")
+    validate.add_argument("--output", metavar="FILE", help="file where valid proxies are written")
+    validate.set_defaults(handler=run_proxies_validate)
+
+    parse_only = subparsers.add_parser("parse-only", help="parse saved <fighter_index>.html pages without network")
+    parse_only.add_argument("pages", help="directory with saved fighter pages")
+    parse_only.add_argument("--backend", default="soup", choices=["soup", "strainer", "lxml"])
+    parse_only.add_argument("--processes", type=int, help="number of parsing processes, number of CPUs by default")
+    parse_only.add_argument("--fighters-output", default="data/fighters.jsonl")
+    parse_only.add_argument("--fights-output", default="data/fights.jsonl")
+    parse_only.set_defaults(handler=run_parse_only)
+
+    benchmark = subparsers.add_parser("benchmark", help="benchmark the crawl against local stand-in of sherdog.com")
+    benchmark.add_argument("--fighters", type=int, default=300, help="number of crawled fighter indexes")
+    benchmark.add_argument("--organizations", type=int, default=30, help="number of crawled organization indexes")
+    benchmark.add_argument("--concurrency", type=int, default=8)
+    benchmark.add_argument("--latency", type=float, default=0.02, help="latency of stand-in answers in seconds")
+    benchmark.add_argument("--not-found-rate", type=float, default=0.2)
+    benchmark.add_argument("--benchmarks", nargs="+", help="names of benchmarks to run, all of them by default")
+    benchmark.add_argument("--thresholds", help="JSON file overriding default regression thresholds")
+    benchmark.add_argument("--output", help="JSON file where measurements are saved")
+    benchmark.set_defaults(handler=run_benchmark)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Run subcommand given on the command line.
+    :param argv: Command line arguments without program name, sys.argv is used if not set.
+    :return: Exit status.
+    """
+    args = get_parser().parse_args(argv)
+    logging.basicConfig(filename=args.log_file, level=logging.INFO, format="%(asctime)s:%(levelname)s:%(message)s")
+    # the provider is standard library only, fake_useragent is imported on the first request without cache
+    from sherdog.user_agent import configure_user_agents
+
+    configure_user_agents(rotation=args.user_agent_rotation, cache_path=args.user_agent_cache or None)
+    handler: Callable[[argparse.Namespace], int] = args.handler
+    return handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
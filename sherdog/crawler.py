@@ -0,0 +1,337 @@
+import datetime
+import email.utils
+import threading
+import time
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Generator, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+
+from sherdog.http_session import BACKOFF_FACTOR, RETRIES, RETRY_STATUSES
+from sherdog.metrics import get_metrics
+
+
+class HostRateLimiter(object):
+    """HostRateLimiter class - spaces out requests to the same host across all fetch workers."""
+
+    def __init__(self, requests_per_second: float = 0.0) -> None:
+        """
+        Initializes a HostRateLimiter instance.
+        :param requests_per_second: Maximal number of requests per host and second, 0 disables limiting.
+        """
+        self.interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self._next_slot: Dict[str, float] = dict()
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        """
+        Block calling thread until request to the host of a given URL is allowed.
+        :param url: URL which is going to be requested.
+        """
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class AdaptiveRateLimiter(object):
+    """AdaptiveRateLimiter class - AIMD controller of request rate and concurrency per host driven by server answers."""
+
+    # answers telling that the server is overloaded or throttles us
+    THROTTLE_STATUSES = (429, 503)
+
+    def __init__(
+        self,
+        requests_per_second: float = 4.0,
+        max_concurrency: int = 8,
+        min_requests_per_second: float = 0.2,
+        max_requests_per_second: float = 50.0,
+        increase: float = 0.5,
+        decrease: float = 0.5,
+        latency_target_seconds: float = 2.0,
+        latency_window: int = 100,
+        errors_are_congestion: bool = True,
+    ) -> None:
+        """
+        Initializes an AdaptiveRateLimiter instance.
+        :param requests_per_second: Initial number of requests per host and second.
+        :param max_concurrency: Maximal number of requests in flight per host, it should match number of workers.
+        :param min_requests_per_second: Rate is never decreased below this value.
+        :param max_requests_per_second: Rate is never increased above this value.
+        :param increase: Additive increase of rate per second of successful requests.
+        :param decrease: Multiplicative decrease of rate and concurrency on 429/5xx answers and errors.
+        :param latency_target_seconds: Rate is slightly decreased when 95th percentile of latency exceeds it.
+        :param latency_window: Number of last successful requests the latency percentile is computed from.
+        :param errors_are_congestion: Decrease rate on connection errors and timeouts, not wanted when they
+                                      are caused by slow proxies instead of the server.
+        """
+        self.requests_per_second = requests_per_second
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_requests_per_second = min_requests_per_second
+        self.max_requests_per_second = max_requests_per_second
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target_seconds = latency_target_seconds
+        self.latency_window = latency_window
+        self.errors_are_congestion = errors_are_congestion
+        self._hosts: Dict[str, Dict[str, Any]] = dict()
+        self._condition = threading.Condition()
+
+    def _get_host(self, url: str) -> Dict[str, Any]:
+        host = urlparse(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = {
+                "rate": self.requests_per_second,
+                "limit": float(self.max_concurrency),
+                "in_flight": 0,
+                "next_slot": 0.0,
+                "paused_until": 0.0,
+                "last_decrease": 0.0,
+                "latencies": deque(maxlen=self.latency_window),
+            }
+        return self._hosts[host]
+
+    def acquire(self, url: str) -> None:
+        """
+        Block calling thread until request to the host of a given URL is allowed, every acquire has to be
+        followed by release with the outcome of the request.
+        :param url: URL which is going to be requested.
+        """
+        with self._condition:
+            host = self._get_host(url)
+            while host["in_flight"] >= int(host["limit"]):
+                self._condition.wait()
+            host["in_flight"] += 1
+            now = time.monotonic()
+            slot = max(now, host["next_slot"], host["paused_until"])
+            host["next_slot"] = slot + 1.0 / host["rate"]
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def release(
+        self,
+        url: str,
+        status: Optional[int] = None,
+        latency_seconds: Optional[float] = None,
+        retry_after: Optional[float] = None,
+        error: Optional[BaseException] = None,
+    ) -> None:
+        """
+        Report outcome of request, rate is increased additively on success and decreased multiplicatively
+        on throttling, server errors and latency above the target.
+        :param url: Requested URL.
+        :param status: HTTP status of the answer, None if the request failed.
+        :param latency_seconds: Duration of the request.
+        :param retry_after: Seconds from Retry-After header, no request is sent to the host until they pass.
+        :param error: Exception raised by the request.
+        """
+        with self._condition:
+            host = self._get_host(url)
+            host["in_flight"] -= 1
+            now = time.monotonic()
+            if retry_after:
+                host["paused_until"] = max(host["paused_until"], now + retry_after)
+            if status is not None and (status in self.THROTTLE_STATUSES or status >= 500):
+                self._decrease(host, now, self.decrease, str(status))
+            elif error is not None:
+                if self.errors_are_congestion:
+                    self._decrease(host, now, self.decrease, type(error).__name__)
+            else:
+                if latency_seconds is not None:
+                    host["latencies"].append(latency_seconds)
+                if self._get_latency_percentile(host, 0.95) > self.latency_target_seconds:
+                    self._decrease(host, now, (1.0 + self.decrease) / 2, "latency")
+                else:
+                    # rate grows by increase per second, concurrency by one per window of successful requests
+                    host["rate"] = min(self.max_requests_per_second, host["rate"] + self.increase / host["rate"])
+                    host["limit"] = min(float(self.max_concurrency), host["limit"] + 1.0 / host["limit"])
+            self._condition.notify_all()
+
+    def _decrease(self, host: Dict[str, Any], now: float, factor: float, reason: str) -> None:
+        # burst of failures of requests sent before the last decrease is a reaction to the same congestion
+        if now - host["last_decrease"] < max(1.0 / host["rate"], self._get_latency_percentile(host, 0.5), 1.0):
+            return
+        host["last_decrease"] = now
+        host["rate"] = max(self.min_requests_per_second, host["rate"] * factor)
+        host["limit"] = max(1.0, host["limit"] * factor)
+        get_metrics().inc("throttle_decreases_total", reason=reason)
+
+    @staticmethod
+    def _get_latency_percentile(host: Dict[str, Any], q: float) -> float:
+        latencies = host["latencies"]
+        # too few samples say nothing about the server
+        if len(latencies) < 10:
+            return 0.0
+        return sorted(latencies)[min(len(latencies) - 1, int(q * len(latencies)))]
+
+    def get_rate(self, url: str) -> Tuple[float, int]:
+        """
+        Get current limits of the host of a given URL.
+        :param url: URL of the host.
+        :return: Tuple with requests per second and maximal number of requests in flight.
+        """
+        with self._condition:
+            host = self._get_host(url)
+            return host["rate"], int(host["limit"])
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """
+        Parse Retry-After header given either in seconds or as HTTP date.
+        :param value: Value of the header.
+        :return: Number of seconds to wait or None if the header is missing or invalid.
+        """
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_date = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, (retry_date - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+
+    def throttle(self, session: Any, retries: int = RETRIES) -> "ThrottledSession":
+        return ThrottledSession(session, self, retries=retries)
+
+
+class ThrottledSession(object):
+    """ThrottledSession class - session wrapper sending every request through adaptive rate limiter."""
+
+    def __init__(
+        self,
+        session: Any,
+        rate_limiter: AdaptiveRateLimiter,
+        retries: int = RETRIES,
+        backoff_factor: float = BACKOFF_FACTOR,
+    ) -> None:
+        """
+        Initializes a ThrottledSession instance.
+        :param session: Wrapped session, it should be built with retries=0, so every throttled answer reaches
+                        the rate limiter instead of being retried inside the session.
+        :param rate_limiter: Rate limiter every request, including retries, goes through.
+        :param retries: Number of retries of failed requests and 429/5xx answers.
+        :param backoff_factor: Base of exponential backoff between retries of answers without Retry-After header.
+        """
+        self.session = session
+        self.rate_limiter = rate_limiter
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+
+    def get(self, url: str, **kwargs: Any) -> Any:
+        return self._request("get", url, **kwargs)
+
+    def head(self, url: str, **kwargs: Any) -> Any:
+        return self._request("head", url, **kwargs)
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> Any:
+        for attempt in range(self.retries + 1):
+            self.rate_limiter.acquire(url)
+            start = time.monotonic()
+            try:
+                response = getattr(self.session, method)(url, **kwargs)
+            except Exception as error:
+                self.rate_limiter.release(url, error=error)
+                if attempt == self.retries:
+                    raise
+                reason = type(error).__name__
+                retry_after = None
+            else:
+                retry_after = AdaptiveRateLimiter.parse_retry_after(response.headers.get("Retry-After"))
+                self.rate_limiter.release(
+                    url,
+                    status=response.status_code,
+                    latency_seconds=time.monotonic() - start,
+                    retry_after=retry_after,
+                )
+                if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                    return response
+                reason = str(response.status_code)
+                response.close()
+            get_metrics().inc("retries_total", reason=reason)
+            # Retry-After pauses the host in the rate limiter, the slot is not held while waiting
+            if retry_after is None:
+                time.sleep(self.backoff_factor * 2**attempt)
+
+    def __getattr__(self, name: str) -> Any:
+        # proxies, close and other attributes of the wrapped session
+        return getattr(self.session, name)
+
+
+class TimedSession(object):
+    """TimedSession class - session wrapper summing time the wrapped session spent sending requests."""
+
+    def __init__(self, session: Any) -> None:
+        self.session = session
+        self.elapsed_seconds = 0.0
+
+    def get(self, url: str, **kwargs: Any) -> Any:
+        return self._request("get", url, **kwargs)
+
+    def head(self, url: str, **kwargs: Any) -> Any:
+        return self._request("head", url, **kwargs)
+
+    def _request(self, method: str, url: str, **kwargs: Any) -> Any:
+        start = time.monotonic()
+        try:
+            return getattr(self.session, method)(url, **kwargs)
+        finally:
+            self.elapsed_seconds += time.monotonic() - start
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+
+class Crawler(object):
+    """Crawler class - downloads pages concurrently and hands them over to the parse stage in index order."""
+
+    def __init__(self, fetch: Callable[[int], Any], concurrency: int = 8, prefetch: Optional[int] = None) -> None:
+        """
+        Initializes a Crawler instance.
+        :param fetch: Function downloading page for a given index, it is called from worker threads.
+        :param concurrency: Number of requests in flight.
+        :param prefetch: Number of downloaded pages waiting for the parse stage, twice the concurrency by default.
+        """
+        self.fetch = fetch
+        self.concurrency = max(1, concurrency)
+        self.prefetch = max(self.concurrency, prefetch or 2 * self.concurrency)
+
+    @staticmethod
+    def _collect(pending: Tuple[int, "Future[Any]"]) -> Tuple[int, Any, Optional[BaseException]]:
+        index, future = pending
+        error = future.exception()
+        if error is not None:
+            return index, None, error
+        return index, future.result(), None
+
+    def crawl(self, indexes: Iterable[int]) -> Generator[Tuple[int, Any, Optional[BaseException]], None, None]:
+        """
+        Download pages for given indexes and yield them in the same order as the indexes were given,
+        so the output of the crawl stays deterministic no matter which request finishes first.
+        :param indexes: Indexes of pages to download.
+        :return: Generator of (index, fetched page, exception raised by fetch or None) tuples, closing it cancels
+                 pages that were not yielded yet.
+        """
+        pending: Deque[Tuple[int, "Future[Any]"]] = deque()
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            for index in indexes:
+                pending.append((index, executor.submit(self.fetch, index)))
+                if len(pending) >= self.prefetch:
+                    yield self._collect(pending.popleft())
+            while pending:
+                yield self._collect(pending.popleft())
+        finally:
+            for _, future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
@@ -0,0 +1,208 @@
+import datetime
+import re
+
+from bs4 import BeautifulSoup
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from sherdog.fight import Fight
+from sherdog.http_session import get_base_url, get_session
+from sherdog.user_agent import get_user_agent
+
+
+class Event(object):
+    """Event class - reads fighters and the whole fight card of an event from its Sherdog page."""
+
+    # event pages do not distinguish professional bouts from the other ones
+    FIGHT_TYPE = "PRO"
+
+    # <a href="/fighter/Kamaru-Usman-38413">Kamaru Usman</a>
+    FIGHTER_HREF_RE = re.compile(r"/fighter/[^/?#]*-(\d+)$")
+
+    @staticmethod
+    def get_url(href: str) -> str:
+        """
+        Build absolute URL of event page from href stored in events file.
+        :param href: Relative or absolute URL of event page.
+        :return: Absolute URL of event page.
+        """
+        if href.startswith("http"):
+            return href
+        return f"{get_base_url()}{href}"
+
+    @staticmethod
+    def download_page(href: str, session: Optional[Any] = None) -> Optional[bytes]:
+        """
+        Download raw event page without parsing it.
+        :param href: Relative or absolute URL of event page.
+        :param session: Session used for the request, shared keep-alive session is used if not set.
+        :return: Page content or None if the event does not exist.
+        :raises HTTPError: Server answered by other error (e.g. 429 or 5xx left after retries).
+        """
+        event_page = (session or get_session()).get(Event.get_url(href), headers={"User-Agent": get_user_agent()})
+        if event_page.status_code == 404:
+            return None
+        event_page.raise_for_status()
+        return event_page.content
+
+    @staticmethod
+    def get_fighter_indexes(page_content: Union[bytes, str]) -> List[int]:
+        """
+        Get indexes of all fighters linked from event page.
+        :param page_content: Raw content of event page.
+        :return: Unique fighter indexes in order of their first appearance.
+        """
+        soup_obj = BeautifulSoup(page_content, features="html.parser")
+        fighter_indexes = list()
+        for link in soup_obj.find_all("a", href=Event.FIGHTER_HREF_RE):
+            href_match = Event.FIGHTER_HREF_RE.search(str(link.get("href", "")))
+            if not href_match:
+                continue
+            fighter_index = int(href_match.group(1))
+            if fighter_index not in fighter_indexes:
+                fighter_indexes.append(fighter_index)
+        return fighter_indexes
+
+    @staticmethod
+    def get_fights(page_content: Union[bytes, str], event_href: str) -> List[Fight]:
+        """
+        Get all fights of event card, one row per bout seen from the side listed first (the winner, if any).
+        Unlike fights from fighter pages, weight class and title fight are filled.
+        :param page_content: Raw content of event page.
+        :param event_href: Relative or absolute URL of event page, event index is taken from it.
+        :return: Unique fights of the card, the main event first.
+        """
+        soup_obj = BeautifulSoup(page_content, features="html.parser")
+        event_index = int(event_href.rstrip("/").split("-")[-1])
+        date = Event.get_date(soup_obj)
+        fights = list()
+        seen_bouts: Set[Tuple[int, int]] = set()
+        main_event_el = soup_obj.find("div", class_="fight_card")
+        fight_values = [Event._get_main_event_values(main_event_el)] if main_event_el else list()
+        fight_values += [Event._get_row_values(tr) for tr in soup_obj.find_all("tr", itemprop="subEvent")]
+        for values in fight_values:
+            if values is None:
+                continue
+            fighter_a_index = Event._get_fighter_index(values["fighter_a_href"])
+            fighter_b_index = Event._get_fighter_index(values["fighter_b_href"])
+            # the same bout can be listed twice (e.g. main event both on top and in the table)
+            bout = (min(fighter_a_index, fighter_b_index), max(fighter_a_index, fighter_b_index))
+            if bout in seen_bouts:
+                continue
+            seen_bouts.add(bout)
+            fight = Fight.get_fight_from_values(
+                result=values["result"],
+                opponent_href=values["fighter_b_href"],
+                event_href=event_href,
+                date_text=None,
+                win_by_text=values["win_by"],
+                referee_text=values["referee"],
+                round_text=values["round"],
+                time_text=values["time"],
+            )
+            fight.fighter_a_index = fighter_a_index
+            fight.event_index = event_index
+            fight.date = date
+            fight.weight_class = values["weight_class"]
+            fight.title_fight = values["title_fight"]
+            fight.fight_type = Event.FIGHT_TYPE
+            fights.append(fight)
+        return fights
+
+    @staticmethod
+    def get_date(soup_obj: Any) -> Optional[str]:
+        """
+        Get date of event in the format of Fight.date.
+        :param soup_obj: Parsed event page.
+        :return: ISO date time of midnight of the event day or None if the page does not contain it.
+        """
+        start_date_el = soup_obj.find("meta", itemprop="startDate")
+        if not start_date_el or not start_date_el.get("content"):
+            return None
+        try:
+            # <meta itemprop="startDate" content="2020-07-11T00:00:00-04:00">
+            return datetime.datetime.strptime(start_date_el["content"][:10], "%Y-%m-%d").isoformat()
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _get_fighter_index(href: str) -> int:
+        return int(href.rstrip("/").split("-")[-1])
+
+    @staticmethod
+    def _get_fighter_href(element: Any) -> Optional[str]:
+        link = element.find("a", href=Event.FIGHTER_HREF_RE)
+        return link["href"] if link else None
+
+    @staticmethod
+    def _get_result(element: Any) -> Optional[str]:
+        result_el = element.find("span", class_="final_result")
+        return result_el.get_text().strip() if result_el else None
+
+    @staticmethod
+    def _get_common_values(element: Any) -> Dict[str, Any]:
+        weight_class_el = element.find("span", class_="weight_class")
+        title_fight_el = element.find(class_="title_fight")
+        return {
+            "weight_class": (weight_class_el.get_text().strip() or None) if weight_class_el else None,
+            "title_fight": title_fight_el is not None,
+        }
+
+    @staticmethod
+    def _get_row_values(tr: Any) -> Optional[Dict[str, Any]]:
+        # <tr itemprop="subEvent"><td>match</td><td itemprop="performer">...</td><td>weight class</td>
+        # <td itemprop="performer">...</td><td>KO (Punch)<br><span class="sub_line">referee</span></td>
+        # <td>round</td><td>time</td></tr>
+        performers = tr.find_all("td", itemprop="performer")
+        if len(performers) != 2:
+            return None
+        tds = tr.find_all("td", recursive=False)
+        method_tds = tds[tds.index(performers[1]) + 1:]
+        fighter_a_href = Event._get_fighter_href(performers[0])
+        fighter_b_href = Event._get_fighter_href(performers[1])
+        if len(method_tds) < 3 or not fighter_a_href or not fighter_b_href:
+            return None
+        method_td, round_td, time_td = method_tds[:3]
+        referee_el = method_td.find("span", class_="sub_line")
+        win_by_el = method_td.find("b")
+        if win_by_el:
+            win_by = win_by_el.get_text()
+        else:
+            win_by = method_td.find(string=True, recursive=False) or ""
+        return {
+            "fighter_a_href": fighter_a_href,
+            "fighter_b_href": fighter_b_href,
+            "result": Event._get_result(performers[0]),
+            "win_by": win_by.strip(),
+            "referee": referee_el.get_text().strip() if referee_el else None,
+            "round": round_td.get_text().strip(),
+            "time": time_td.get_text().strip(),
+            **Event._get_common_values(tr),
+        }
+
+    @staticmethod
+    def _get_main_event_values(fight_card_el: Any) -> Optional[Dict[str, Any]]:
+        # main event is shown apart from the table: <div class="fighter left_side">, <div class="fighter right_side">
+        # and <table class="resume"><tr><td><em>Method</em>KO (Punch)</td>...<td><em>Time</em>4:12</td></tr></table>
+        left_el = fight_card_el.find("div", class_="left_side")
+        right_el = fight_card_el.find("div", class_="right_side")
+        if not left_el or not right_el:
+            return None
+        fighter_a_href = Event._get_fighter_href(left_el)
+        fighter_b_href = Event._get_fighter_href(right_el)
+        if not fighter_a_href or not fighter_b_href:
+            return None
+        resume = dict()
+        for td in fight_card_el.select("table.resume td"):
+            label_el = td.find("em")
+            if label_el:
+                resume[label_el.get_text().strip().lower()] = td.get_text()[len(label_el.get_text()):].strip()
+        return {
+            "fighter_a_href": fighter_a_href,
+            "fighter_b_href": fighter_b_href,
+            "result": Event._get_result(left_el),
+            "win_by": resume.get("method", ""),
+            "referee": resume.get("referee") or None,
+            "round": resume.get("round", "0"),
+            "time": resume.get("time", ""),
+            **Event._get_common_values(fight_card_el),
+        }
@@ -0,0 +1,240 @@
+"""
+Pluggable extraction backends turning raw fighter page into Fighter with its fights.
+All backends have to produce identical Fighter.to_dict() and Fight.to_dict() output.
+"""
+from bs4 import BeautifulSoup
+from typing import Any, Dict, List, Optional, Union
+
+from sherdog.fight import Fight
+from sherdog.fighter import Fighter
+from sherdog.metrics import get_metrics
+
+try:
+    from bs4.filter import SoupStrainer
+except ImportError:
+    # beautifulsoup4 before 4.13
+    from bs4.element import SoupStrainer  # type: ignore[attr-defined]
+
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:
+    etree = None
+    lxml_html = None
+
+
+class SoupExtractor(object):
+    """SoupExtractor class - extracts fighter with BeautifulSoup and html.parser, the reference backend."""
+
+    name = "soup"
+
+    def extract(self, page_content: Union[bytes, str], fighter_index: int) -> Fighter:
+        """
+        Build Fighter together with his fights from raw fighter page.
+        :param page_content: Raw content of fighter page.
+        :param fighter_index: Sherdog index of fighter.
+        :return: Fighter instance with filled fights.
+        """
+        metrics = get_metrics()
+        with metrics.time("parse"):
+            soup_obj = BeautifulSoup(page_content, features="html.parser")
+        with metrics.time("extract"):
+            return Fighter.from_html(soup_obj, fighter_index=fighter_index)
+
+
+class _RegionStrainer(SoupStrainer):
+    """_RegionStrainer class - keeps only page regions read by Fighter.from_html, the rest is never built."""
+
+    # tag name and classes of regions outside of sections, any of the classes selects the region
+    CLASS_REGIONS = {
+        "div": {"latest_features", "bio-holder", "association-class"},
+        "span": {"fn", "nickname", "locality"},
+    }
+
+    def _is_region(self, name: str, attrs: Any) -> bool:
+        if name == "section":
+            return True
+        attrs = dict(attrs or dict())
+        if name == "strong":
+            return attrs.get("itemprop") == "nationality"
+        if name not in self.CLASS_REGIONS:
+            return False
+        classes = attrs.get("class") or ""
+        if isinstance(classes, str):
+            classes = classes.split()
+        return not self.CLASS_REGIONS[name].isdisjoint(classes)
+
+    def search_tag(self, markup_name: Any = None, markup_attrs: Any = None) -> Any:
+        # called by beautifulsoup4 before 4.13
+        return self._is_region(markup_name, markup_attrs)
+
+    def allow_tag_creation(self, nsprefix: Optional[str], name: str, attrs: Any) -> bool:
+        # called by beautifulsoup4 4.13 and newer
+        return self._is_region(name, attrs)
+
+    def allow_string_creation(self, string: str) -> bool:
+        # texts outside of kept regions are dropped, called by beautifulsoup4 4.13 and newer
+        return False
+
+
+class StrainedSoupExtractor(SoupExtractor):
+    """StrainedSoupExtractor class - extracts fighter with BeautifulSoup from bio, association and fight history
+    regions only, navigation, ads and news widgets are skipped by the tokenizer instead of being built into tree."""
+
+    name = "strainer"
+
+    def __init__(self) -> None:
+        self._strainer = _RegionStrainer()
+
+    def extract(self, page_content: Union[bytes, str], fighter_index: int) -> Fighter:
+        """
+        Build Fighter together with his fights from raw fighter page.
+        :param page_content: Raw content of fighter page.
+        :param fighter_index: Sherdog index of fighter.
+        :return: Fighter instance with filled fights.
+        """
+        metrics = get_metrics()
+        with metrics.time("parse"):
+            soup_obj = BeautifulSoup(page_content, features="html.parser", parse_only=self._strainer)
+        with metrics.time("extract"):
+            return Fighter.from_html(soup_obj, fighter_index=fighter_index)
+
+
+class LxmlExtractor(object):
+    """LxmlExtractor class - extracts fighter with precompiled lxml XPath expressions."""
+
+    name = "lxml"
+
+    def __init__(self) -> None:
+        """
+        Initializes a LxmlExtractor instance and compiles all used XPath expressions.
+        """
+        if etree is None:
+            raise ImportError("lxml extraction backend requires lxml package")
+        self._parser = etree.HTMLParser(encoding="utf-8")
+        self._text = self._xpath("string()")
+        self._section_title = self._xpath('//div[@class="tiled_bg latest_features"]')
+        self._fullname = self._xpath(self._class_expr("//span", "fn"))
+        self._nickname = self._xpath(self._class_expr("//span", "nickname"))
+        self._locality = self._xpath(self._class_expr("//span", "locality"))
+        self._nationality = self._xpath('//strong[@itemprop="nationality"]')
+        self._bio = self._xpath(self._class_expr("//div", "bio-holder"))
+        self._association = self._xpath(self._class_expr("//div", "association-class"))
+        self._member_of = self._xpath('.//span[@itemprop="memberOf"]')
+        self._weight_class = self._xpath('.//a[contains(@href, "/stats/fightfinder?weightclass")]')
+        self._sections = self._xpath("//section")
+        self._sub_line = self._xpath(self._class_expr(".//span", "sub_line"))
+        self._trs = self._xpath(".//tr")
+        self._tds = self._xpath(".//td")
+        self._a = self._xpath(".//a")
+        self._b = self._xpath(".//b")
+        self._span = self._xpath(".//span")
+
+    @staticmethod
+    def _xpath(expression: str) -> Any:
+        # smart strings keep reference to the whole tree, so they are turned off
+        return etree.XPath(expression, smart_strings=False)
+
+    @staticmethod
+    def _class_expr(path: str, class_name: str) -> str:
+        return f"{path}[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]"
+
+    def _first_text(self, elements: List[Any]) -> Optional[str]:
+        if not elements:
+            return None
+        return self._text(elements[0])
+
+    def extract(self, page_content: Union[bytes, str], fighter_index: int) -> Fighter:
+        """
+        Build Fighter together with his fights from raw fighter page.
+        :param page_content: Raw content of fighter page.
+        :param fighter_index: Sherdog index of fighter.
+        :return: Fighter instance with filled fights.
+        """
+        fighter = Fighter(fighter_index=fighter_index, url=Fighter.get_url(fighter_index))
+        fighter.fights = list()
+        metrics = get_metrics()
+        try:
+            with metrics.time("parse"):
+                if isinstance(page_content, str):
+                    tree = lxml_html.document_fromstring(page_content)
+                else:
+                    tree = lxml_html.document_fromstring(page_content, parser=self._parser)
+        except etree.ParserError:
+            fighter.valid = False
+            return fighter
+        with metrics.time("extract"):
+            return self._extract_tree(fighter, tree, fighter_index)
+
+    def _extract_tree(self, fighter: Fighter, tree: Any, fighter_index: int) -> Fighter:
+        # if page is not valid return Fighter with valid field == False otherwise continue
+        section_title_els = self._section_title(tree)
+        if not section_title_els or "ERROR 404" in self._text(section_title_els[0]):
+            fighter.valid = False
+            return fighter
+        self._fill_fighter(fighter, tree)
+        fighter.fights = self._get_fights(tree, fighter_index)
+        return fighter
+
+    def _fill_fighter(self, fighter: Fighter, tree: Any) -> None:
+        fighter.fullname = self._first_text(self._fullname(tree))
+        nickname = self._first_text(self._nickname(tree))
+        if nickname:
+            fighter.nickname = nickname.replace('"', "")
+        fighter.nationality = self._first_text(self._nationality(tree))
+        fighter.locality = self._first_text(self._locality(tree))
+
+        bio_els = self._bio(tree)
+        if bio_els:
+            personal_stats = fighter.parse_personal_stats([self._text(tr) for tr in self._trs(bio_els[0])])
+            fighter.birth_date, fighter.death_date, fighter.height_cm, fighter.weight_kg = personal_stats
+
+        association_el = self._association(tree)[0]
+        fighter.associations = [self._text(el) for el in self._member_of(association_el)]
+        fighter.weight_class = self._first_text(self._weight_class(association_el))
+        fighter.style = self._first_text(self._b(association_el))
+
+    def _get_fights(self, tree: Any, fighter_a_index: int) -> List[Fight]:
+        fights = list()
+        for section in self._sections(tree)[1:]:
+            section_text = self._text(section)
+            for fight_type in Fight.FIGHT_TYPES:
+                if fight_type not in section_text:
+                    continue
+                fight_type_str = fight_type.split("-")[-1].strip()
+                for tr in self._trs(section)[1:]:
+                    fight = self._get_fight_from_row(self._tds(tr))
+                    fight.fight_type = fight_type_str
+                    fight.fighter_a_index = fighter_a_index
+                    fights.append(fight)
+        return fights
+
+    def _get_fight_from_row(self, tds: List[Any]) -> Fight:
+        return Fight.get_fight_from_values(
+            result=self._text(tds[0]),
+            opponent_href=self._a(tds[1])[0].get("href"),
+            event_href=self._a(tds[2])[0].get("href"),
+            date_text=self._first_text(self._sub_line(tds[2])),
+            win_by_text=self._text(self._b(tds[3])[0]),
+            referee_text=self._text(self._span(tds[3])[0]),
+            round_text=self._text(tds[4]),
+            time_text=self._text(tds[5]),
+        )
+
+
+EXTRACTORS: Dict[str, Any] = {
+    SoupExtractor.name: SoupExtractor,
+    StrainedSoupExtractor.name: StrainedSoupExtractor,
+    LxmlExtractor.name: LxmlExtractor,
+}
+
+
+def get_extractor(name: str = SoupExtractor.name) -> Any:
+    """
+    Get extraction backend by its name.
+    :param name: Name of the backend (soup, strainer or lxml).
+    :return: Extractor instance.
+    """
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown extraction backend {name}, choose one of {sorted(EXTRACTORS)}")
+    return EXTRACTORS[name]()
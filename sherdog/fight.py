@@ -0,0 +1,192 @@
+from bs4 import BeautifulSoup
+from pprint import pformat
+from typing import Any, Optional, List, Dict, Union
+
+from sherdog.normalization import convert_to_seconds, normalize_fight_date
+from sherdog.serialization import dumps
+
+
+class Fight(object):
+    """Fight class - creates fight instance with data about the fight - winner, referee, etc."""
+
+    FIGHT_TYPES = ["FIGHT HISTORY - PRO", "FIGHT HISTORY - PRO EXHIBITION", "FIGHT HISTORY - AMATEUR"]
+
+    # millions of fights are kept in memory during analysis, so instances have no __dict__
+    __slots__ = (
+        "fighter_a_index",
+        "fighter_b_index",
+        "date",
+        "event_index",
+        "referee",
+        "general_decision",
+        "specific_decision",
+        "specific_time",
+        "round",
+        "title_fight",
+        "weight_class",
+        "fight_type",
+        "result",
+    )
+
+    def __init__(
+        self,
+        fighter_a_index: int = -1,
+        fighter_b_index: int = -1,
+        event_index: int = -1,
+        date: Optional[str] = None,
+        referee: Optional[str] = None,
+        general_decision: Optional[str] = None,
+        specific_decision: Optional[str] = None,
+        round: int = -1,
+        specific_time: int = -1,
+        title_fight: bool = False,
+        weight_class: Optional[str] = None,
+        fight_type: str = None,
+        result: Optional[str] = None,
+    ) -> None:
+
+        self.fighter_a_index = fighter_a_index
+        self.fighter_b_index = fighter_b_index
+        self.date = date
+        self.event_index = event_index
+        self.referee = referee
+        self.general_decision = general_decision
+        self.specific_decision = specific_decision
+        self.specific_time = specific_time
+        self.round = round
+        self.title_fight = title_fight
+        self.weight_class = weight_class
+        self.fight_type = fight_type
+        self.result = result
+
+    @staticmethod
+    def convert_to_seconds(str_time: str) -> int:
+        return convert_to_seconds(str_time)
+
+    @staticmethod
+    def get_fight_from_row(tds: List[Any]) -> Any:
+        date_str_el = tds[2].find("span", class_="sub_line")
+        return Fight.get_fight_from_values(
+            result=tds[0].get_text(),
+            # get opponent index from <a href="/fighter/Mabelly-Lima-187177">Mabelly Lima</a>
+            opponent_href=tds[1].a["href"],
+            event_href=tds[2].a["href"],
+            date_text=date_str_el.get_text() if date_str_el else None,
+            # get reason of fight stoppage from <td class="winby"><b>KO (Punches)</b><br/><span class="sub_line"></span></td>
+            win_by_text=tds[3].find("b").get_text(),
+            referee_text=tds[3].span.get_text(),
+            round_text=tds[4].get_text(),
+            time_text=tds[5].get_text(),
+        )
+
+    @staticmethod
+    def get_fight_from_values(
+        result: str,
+        opponent_href: str,
+        event_href: str,
+        date_text: Optional[str],
+        win_by_text: str,
+        referee_text: str,
+        round_text: str,
+        time_text: str,
+    ) -> Any:
+        """
+        Build Fight from texts of fight history row, shared by all extraction backends.
+        :return: Fight without fighter A index and fight type.
+        """
+        opponent_index = opponent_href.split("-")[-1]
+        event_index = event_href.split("-")[-1]
+        date_str = None
+        if date_text is not None:
+            try:
+                date_str = normalize_fight_date(date_text)
+            except ValueError:
+                print(f"Failed to get date of fights from {date_text}")
+        win_by = win_by_text.split("(")[0].strip()
+        win_by_specific_str = None
+        if "(" in win_by_text:
+            win_by_specific_str = win_by_text.split("(")[-1].replace(")", "").strip()
+        win_by_specific = win_by_specific_str
+        # <a href="/referee/Dan-Miragliotta-21">Dan Miragliotta</a>
+        referee = None
+        if referee_text:
+            referee = referee_text
+        round_ = int(round_text)
+        time = Fight.convert_to_seconds(time_text)
+
+        return Fight(
+            fighter_b_index=int(opponent_index),
+            date=date_str,
+            event_index=int(event_index),
+            referee=referee,
+            general_decision=win_by,
+            specific_decision=None if win_by_specific == "N/A" else win_by_specific,
+            round=-1 if round_ == "0" else int(round_),
+            specific_time=time,
+            result=result,
+        )
+
+    @staticmethod
+    def get_fights(soup_obj: Any, fighter_a_index: int) -> List[Any]:
+
+        fights = list()
+        section_els = soup_obj.find_all("section")[1:]
+        for section in section_els:
+            # section is classified by its text collected only once
+            section_text = section.get_text()
+            trs = None
+            for fight_type in Fight.FIGHT_TYPES:
+                if fight_type not in section_text:
+                    continue
+                fight_type_str = fight_type.split("-")[-1].strip()
+                if trs is None:
+                    trs = section.find_all("tr")[1:]
+                for tr in trs:
+                    tds = tr.find_all("td")
+                    fight = Fight.get_fight_from_row(tds)
+                    fight.fight_type = fight_type_str
+                    fight.fighter_a_index = fighter_a_index
+                    fights.append(fight)
+        return fights
+
+    @staticmethod
+    def from_html(page_content: Union[bytes, str], fighter_a_index: int) -> List[Any]:
+        """
+        Get fights from raw fighter page, no request is sent.
+        :param page_content: Raw content of fighter page.
+        :param fighter_a_index: Sherdog index of fighter owning the page.
+        :return: List of fights found in fight history tables.
+        """
+        soup_obj = BeautifulSoup(page_content, features="html.parser")
+        return Fight.get_fights(soup_obj=soup_obj, fighter_a_index=fighter_a_index)
+
+    def __repr__(self) -> str:
+        return pformat({slot: getattr(self, slot) for slot in self.__slots__}, indent=4, width=1)
+
+    def to_dict(self) -> Dict[str, Optional[Any]]:
+        """
+        Build Dictionary from Fight object.
+        :return: dictionary with parameters of Fight object.
+        """
+        return {
+            "fighterIndexA": self.fighter_a_index,
+            "fighterIndexB": self.fighter_b_index,
+            "eventIndex": self.event_index,
+            "date": self.date,
+            "weightClass": self.weight_class,
+            "fightType": self.fight_type,
+            "referee": self.referee,
+            "result": self.result,
+            "generalDecision": self.general_decision,
+            "specificDecision": self.specific_decision,
+            "specificTime": self.specific_time,
+            "round": self.round,
+            "titleFight": self.title_fight,
+        }
+
+    def to_json(self) -> bytes:
+        """
+        Serialize Fight object to JSON.
+        :return: UTF-8 encoded JSON of to_dict output.
+        """
+        return dumps(self.to_dict())
@@ -0,0 +1,306 @@
+"""
+Streaming deduplication of fights and on-disk lookup indexes. fights.jsonl holds every bout twice, once from
+each fighter's page with fighters swapped and result inverted. Both views are merged under a canonical bout key
+(lower fighter index, higher fighter index, event, round, time) in sqlite, so inputs of any size are processed
+with bounded memory and fighter, event and opponent lookups are served by indexes instead of full scans.
+
+python -m sherdog.fight_index data/fights.jsonl --index data/fights_index.sqlite --output data/bouts.jsonl
+"""
+import argparse
+import sqlite3
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sherdog.serialization import loads
+from sherdog.sinks import open_sink
+
+INVERTED_RESULTS = {"win": "loss", "loss": "win"}
+# bits of sides column, bout listed on page of the fighter with the lower or the higher index
+LOW_SIDE = 1
+HIGH_SIDE = 2
+
+BOUT_COLUMNS = (
+    "fighter_low",
+    "fighter_high",
+    "event_index",
+    "bout_round",
+    "specific_time",
+    "date",
+    "weight_class",
+    "fight_type",
+    "referee",
+    "result_low",
+    "general_decision",
+    "specific_decision",
+    "title_fight",
+)
+
+
+def get_bout_key(row: Dict[str, Any]) -> Tuple[int, int, int, int, int]:
+    """
+    Get canonical key of bout, both views of the same bout have the same key.
+    :param row: Dictionary returned by Fight.to_dict.
+    :return: Tuple of lower fighter index, higher fighter index, event index, round and time in seconds.
+    """
+    fighter_a, fighter_b = row["fighterIndexA"], row["fighterIndexB"]
+    return min(fighter_a, fighter_b), max(fighter_a, fighter_b), row["eventIndex"], row["round"], row["specificTime"]
+
+
+def invert_result(result: Optional[str]) -> Optional[str]:
+    if result is None:
+        return None
+    return INVERTED_RESULTS.get(result.lower(), result)
+
+
+def to_bout(row: Dict[str, Any]) -> Tuple[Any, ...]:
+    """
+    Convert fight row to canonical bout seen from the fighter with the lower index.
+    :param row: Dictionary returned by Fight.to_dict.
+    :return: Values of BOUT_COLUMNS.
+    """
+    result = row["result"]
+    if row["fighterIndexA"] > row["fighterIndexB"]:
+        result = invert_result(result)
+    return get_bout_key(row) + (
+        row["date"],
+        row["weightClass"],
+        row["fightType"],
+        row["referee"],
+        result,
+        row["generalDecision"],
+        row["specificDecision"],
+        int(bool(row["titleFight"])),
+    )
+
+
+class FightIndex(object):
+    """FightIndex class - sqlite store of deduplicated bouts with fighter, event and opponent lookups."""
+
+    def __init__(self, path: str = "data/fights_index.sqlite", cache_size_mb: int = 64) -> None:
+        """
+        Initializes a FightIndex instance, creates the sqlite database if it does not exist.
+        :param path: Path to the sqlite database.
+        :param cache_size_mb: Size of sqlite page cache, it bounds memory used while building the index.
+        """
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(f"PRAGMA cache_size=-{cache_size_mb * 1024}")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS bouts (
+                fighter_low INTEGER NOT NULL,
+                fighter_high INTEGER NOT NULL,
+                event_index INTEGER NOT NULL,
+                bout_round INTEGER NOT NULL,
+                specific_time INTEGER NOT NULL,
+                date TEXT,
+                weight_class TEXT,
+                fight_type TEXT,
+                referee TEXT,
+                result_low TEXT,
+                general_decision TEXT,
+                specific_decision TEXT,
+                title_fight INTEGER NOT NULL DEFAULT 0,
+                views INTEGER NOT NULL DEFAULT 1,
+                sides INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (fighter_low, fighter_high, event_index, bout_round, specific_time)
+            )
+            """
+        )
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS opponents (
+                fighter INTEGER NOT NULL,
+                opponent INTEGER NOT NULL,
+                bouts INTEGER NOT NULL,
+                PRIMARY KEY (fighter, opponent)
+            ) WITHOUT ROWID
+            """
+        )
+        if "sides" not in {row[1] for row in self._connection.execute("PRAGMA table_info(bouts)")}:
+            # views of indexes built before sides were tracked are counted again by the next build
+            self._connection.execute("ALTER TABLE bouts ADD COLUMN sides INTEGER NOT NULL DEFAULT 0")
+        self._connection.commit()
+
+    def add(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """
+        Merge fight rows into the index, fields missing in one view are taken from the other one.
+        Views are counted by sides the bout was listed from, so merging the same rows again does not change them.
+        :param rows: Dictionaries returned by Fight.to_dict.
+        :return: Number of added rows.
+        """
+        columns = BOUT_COLUMNS + ("sides",)
+        placeholders = ", ".join("?" for _ in columns)
+        bouts = [
+            to_bout(row) + (LOW_SIDE if row["fighterIndexA"] <= row["fighterIndexB"] else HIGH_SIDE,) for row in rows
+        ]
+        self._connection.executemany(
+            f"""
+            INSERT INTO bouts ({", ".join(columns)}) VALUES ({placeholders})
+            ON CONFLICT (fighter_low, fighter_high, event_index, bout_round, specific_time) DO UPDATE SET
+                date = COALESCE(bouts.date, excluded.date),
+                weight_class = COALESCE(bouts.weight_class, excluded.weight_class),
+                fight_type = COALESCE(bouts.fight_type, excluded.fight_type),
+                referee = COALESCE(bouts.referee, excluded.referee),
+                result_low = COALESCE(bouts.result_low, excluded.result_low),
+                general_decision = COALESCE(bouts.general_decision, excluded.general_decision),
+                specific_decision = COALESCE(bouts.specific_decision, excluded.specific_decision),
+                title_fight = MAX(bouts.title_fight, excluded.title_fight),
+                sides = bouts.sides | excluded.sides,
+                views = 1 + ((bouts.sides | excluded.sides) = {LOW_SIDE | HIGH_SIDE})
+            """,
+            bouts,
+        )
+        return len(bouts)
+
+    def build(self, fights_filename: str, batch_size: int = 10000) -> Dict[str, int]:
+        """
+        Merge JSONL file with fights into the index in a single streaming pass and rebuild lookup indexes.
+        :param fights_filename: JSONL file with fights, e.g. written by scrape_all_fighters or scrape_all_events.
+        :param batch_size: Number of rows merged in one transaction, it bounds memory of the pass.
+        :return: Dictionary with number of read rows and unique bouts.
+        """
+        read_rows = 0
+        with open(fights_filename, "rb") as fights_file:
+            batch: List[Dict[str, Any]] = list()
+            for line in fights_file:
+                if not line.strip():
+                    continue
+                batch.append(loads(line))
+                if len(batch) >= batch_size:
+                    read_rows += self.add(batch)
+                    self._connection.commit()
+                    batch = list()
+            read_rows += self.add(batch)
+        self._create_indexes()
+        self._connection.commit()
+        return {"rows": read_rows, "bouts": self.count()}
+
+    def _create_indexes(self) -> None:
+        # lookup indexes are built once after the load, keeping them up to date row by row is slower
+        self._connection.execute("CREATE INDEX IF NOT EXISTS bouts_fighter_high ON bouts (fighter_high)")
+        self._connection.execute("CREATE INDEX IF NOT EXISTS bouts_event ON bouts (event_index)")
+        self._connection.execute("DELETE FROM opponents")
+        for fighter_column, opponent_column in (("fighter_low", "fighter_high"), ("fighter_high", "fighter_low")):
+            self._connection.execute(
+                f"""
+                INSERT INTO opponents (fighter, opponent, bouts)
+                SELECT {fighter_column}, {opponent_column}, COUNT(*) FROM bouts
+                GROUP BY {fighter_column}, {opponent_column}
+                """
+            )
+
+    def count(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM bouts").fetchone()[0]
+
+    @staticmethod
+    def _to_row(values: Tuple[Any, ...], fighter_index: Optional[int] = None) -> Dict[str, Any]:
+        # row in Fight.to_dict format, seen from the given fighter or from the one with the lower index
+        bout = dict(zip(BOUT_COLUMNS, values))
+        fighter_a, fighter_b, result = bout["fighter_low"], bout["fighter_high"], bout["result_low"]
+        if fighter_index is not None and fighter_index == fighter_b:
+            fighter_a, fighter_b, result = fighter_b, fighter_a, invert_result(result)
+        return {
+            "fighterIndexA": fighter_a,
+            "fighterIndexB": fighter_b,
+            "eventIndex": bout["event_index"],
+            "date": bout["date"],
+            "weightClass": bout["weight_class"],
+            "fightType": bout["fight_type"],
+            "referee": bout["referee"],
+            "result": result,
+            "generalDecision": bout["general_decision"],
+            "specificDecision": bout["specific_decision"],
+            "specificTime": bout["specific_time"],
+            "round": bout["bout_round"],
+            "titleFight": bool(bout["title_fight"]),
+        }
+
+    def get_fighter_fights(self, fighter_index: int) -> List[Dict[str, Any]]:
+        """
+        Get all bouts of fighter.
+        :param fighter_index: Sherdog index of fighter.
+        :return: Rows in Fight.to_dict format with the fighter as fighter A, ordered by date.
+        """
+        columns = ", ".join(BOUT_COLUMNS)
+        rows = self._connection.execute(
+            f"""
+            SELECT {columns} FROM bouts WHERE fighter_low = ?
+            UNION ALL
+            SELECT {columns} FROM bouts WHERE fighter_high = ?
+            ORDER BY date
+            """,
+            (fighter_index, fighter_index),
+        ).fetchall()
+        return [self._to_row(row, fighter_index) for row in rows]
+
+    def get_event_fights(self, event_index: int) -> List[Dict[str, Any]]:
+        """
+        Get all bouts of event.
+        :param event_index: Sherdog index of event.
+        :return: Rows in Fight.to_dict format seen from the fighter with the lower index.
+        """
+        rows = self._connection.execute(
+            f"SELECT {', '.join(BOUT_COLUMNS)} FROM bouts WHERE event_index = ?", (event_index,)
+        ).fetchall()
+        return [self._to_row(row) for row in rows]
+
+    def get_opponents(self, fighter_index: int) -> Dict[int, int]:
+        """
+        Get neighbours of fighter in the opponent graph.
+        :param fighter_index: Sherdog index of fighter.
+        :return: Dictionary mapping opponent index to number of their bouts.
+        """
+        rows = self._connection.execute(
+            "SELECT opponent, bouts FROM opponents WHERE fighter = ?", (fighter_index,)
+        ).fetchall()
+        return dict(rows)
+
+    def iterate_bouts(self) -> Iterator[Dict[str, Any]]:
+        """
+        Stream all unique bouts in key order.
+        :return: Iterator of rows in Fight.to_dict format seen from the fighter with the lower index.
+        """
+        cursor = self._connection.execute(f"SELECT {', '.join(BOUT_COLUMNS)} FROM bouts")
+        for row in cursor:
+            yield self._to_row(row)
+
+    def export(self, path: str, batch_size: int = 10000) -> int:
+        """
+        Write unique bouts to a file, format is given by its extension (.jsonl, .csv or .parquet).
+        :param path: Output file.
+        :param batch_size: Number of rows passed to the sink at once.
+        :return: Number of written bouts.
+        """
+        written = 0
+        with open_sink(path, "fights") as sink:
+            batch = list()
+            for row in self.iterate_bouts():
+                batch.append(row)
+                if len(batch) >= batch_size:
+                    sink.write(batch)
+                    written += len(batch)
+                    batch = list()
+            sink.write(batch)
+            written += len(batch)
+        return written
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Deduplicate fights and build fighter, event and opponent indexes.")
+    parser.add_argument("fights", nargs="+", help="JSONL files with fights")
+    parser.add_argument("--index", default="data/fights_index.sqlite", help="sqlite database of the index")
+    parser.add_argument("--output", help="file where unique bouts are written (.jsonl, .csv or .parquet)")
+    args = parser.parse_args()
+
+    fight_index = FightIndex(args.index)
+    for fights_filename in args.fights:
+        print(f"Indexed {fights_filename}: {fight_index.build(fights_filename)}")
+    if args.output:
+        print(f"Written {fight_index.export(args.output)} bouts to {args.output}")
+    fight_index.close()
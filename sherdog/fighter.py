@@ -0,0 +1,359 @@
+import os
+
+from bs4 import BeautifulSoup
+from typing import Optional, Any, List, Iterable, Dict, Union
+
+from sherdog.fight import Fight
+from sherdog.http_session import get_base_url, get_session
+from sherdog.normalization import normalize_birth_date
+from sherdog.serialization import dumps
+from sherdog.user_agent import get_user_agent
+
+
+class Fighter(object):
+    """Fighter class - creates fighter instance based on fighter's Sherdog profile or a given parameters."""
+
+    DEFAULT_INDEX: int = -1
+
+    __slots__ = (
+        "fighter_index",
+        "url",
+        "fullname",
+        "nickname",
+        "birth_date",
+        "death_date",
+        "weight_kg",
+        "height_cm",
+        "locality",
+        "nationality",
+        "associations",
+        "weight_class",
+        "style",
+        "fights",
+        "soup_obj",
+        "valid",
+    )
+
+    def __init__(
+        self,
+        fighter_index: int = DEFAULT_INDEX,
+        proxy_session: Optional[Any] = None,
+        download: bool = False,
+        url: Optional[str] = None,
+        fullname: Optional[str] = None,
+        nickname: Optional[str] = None,
+        birth_date: Optional[Any] = None,
+        death_date: Optional[Any] = None,
+        weight_kg: Optional[str] = None,
+        height_cm: Optional[str] = None,
+        locality: Optional[str] = None,
+        nationality: Optional[str] = None,
+        associations: Optional[List[str]] = None,
+        weight_class: Optional[str] = None,
+        style: Optional[str] = None,
+        keep_soup: bool = False,
+    ) -> None:
+        """
+        Initializes a Fighter instance.
+        Downloaded fighter gets his fights extracted right away and the parse tree is dropped
+        unless keep_soup is set.
+        """
+        self.fighter_index = fighter_index
+        self.url = url
+        self.fullname = fullname
+        self.nickname = nickname
+        self.birth_date = birth_date
+        self.death_date = death_date
+        self.weight_kg = weight_kg
+        self.height_cm = height_cm
+        self.locality = locality
+        self.nationality = nationality
+        self.associations = associations
+        self.weight_class = weight_class
+        self.style = style
+        self.fights = None
+        self.soup_obj = None
+        self.valid = True
+        if download:
+            soup_obj = self.scrape_stats(proxy_session)
+            self.fights = list()
+            if self.valid:
+                self.fights = Fight.get_fights(soup_obj=soup_obj, fighter_a_index=self.fighter_index)
+            if keep_soup:
+                self.soup_obj = soup_obj
+
+    @staticmethod
+    def get_url(fighter_index: int) -> str:
+        """
+        Build URL of the Sherdog profile for a given fighter index.
+        :param fighter_index: Sherdog index of fighter.
+        :return: URL of fighter page.
+        """
+        return f"{get_base_url()}/fighter/index?id={fighter_index}"
+
+    @staticmethod
+    def download_page(
+        fighter_index: int, user_agent: Optional[str] = None, proxy_session: Optional[Any] = None
+    ) -> Optional[bytes]:
+        """
+        Download raw fighter page without parsing it.
+        :param fighter_index: Sherdog index of fighter.
+        :param user_agent: User-Agent header sent with the request, taken from process-wide provider if not set.
+        :param proxy_session: Session used for the request, shared keep-alive session is used if not set.
+        :return: Page content or None if the fighter does not exist.
+        :raises HTTPError: Server answered by other error (e.g. 429 or 5xx left after retries), so the fighter
+                           is retried instead of being recorded as missing.
+        """
+        url = Fighter.get_url(fighter_index)
+        user_agent = user_agent or get_user_agent()
+        if not proxy_session:
+            fighter_page = get_session().get(url, headers={"User-Agent": user_agent})
+        else:
+            fighter_page = proxy_session.get(url, headers={"User-Agent": user_agent})
+        if fighter_page.status_code == 404:
+            return None
+        fighter_page.raise_for_status()
+        return fighter_page.content
+
+    def scrape_stats(self, proxy_session: Any) -> Any:
+        """
+        Scrape all statistics about Fighter and fill fighter instance.
+        """
+        self.url = Fighter.get_url(self.fighter_index)
+        page_content = Fighter.download_page(self.fighter_index, proxy_session=proxy_session)
+        if page_content is None:
+            self.valid = False
+            return None
+        return self.parse_stats(page_content)
+
+    @classmethod
+    def from_html(cls, page_content: Union[bytes, str, BeautifulSoup], fighter_index: int = DEFAULT_INDEX) -> "Fighter":
+        """
+        Build Fighter together with his fights from raw fighter page, no request is sent.
+        :param page_content: Raw content of fighter page or its already parsed soup.
+        :param fighter_index: Sherdog index of fighter.
+        :return: Fighter instance with filled fights, valid field is False for missing fighter pages.
+        """
+        fighter = cls(fighter_index=fighter_index)
+        soup_obj = fighter.parse_stats(page_content)
+        fighter.fights = list()
+        if fighter.valid:
+            fighter.fights = Fight.get_fights(soup_obj=soup_obj, fighter_a_index=fighter_index)
+        return fighter
+
+    @classmethod
+    def from_file(cls, path: str, fighter_index: Optional[int] = None) -> "Fighter":
+        """
+        Build Fighter together with his fights from fighter page stored on disk.
+        :param path: Path to stored fighter page.
+        :param fighter_index: Sherdog index of fighter, taken from file name (e.g. 27944.html) if not set.
+        :return: Fighter instance with filled fights.
+        """
+        if fighter_index is None:
+            fighter_index = Fighter.get_index_from_path(path)
+        with open(path, "rb") as page_file:
+            return cls.from_html(page_file.read(), fighter_index=fighter_index)
+
+    @staticmethod
+    def get_index_from_path(path: str) -> int:
+        """
+        Get fighter index from name of stored fighter page (e.g. pages/27944.html -> 27944).
+        :param path: Path to stored fighter page.
+        :return: Fighter index or DEFAULT_INDEX if file name is not a number.
+        """
+        file_stem = os.path.splitext(os.path.basename(path))[0]
+        return int(file_stem) if file_stem.isdigit() else Fighter.DEFAULT_INDEX
+
+    def parse_stats(self, page_content: Union[bytes, str, BeautifulSoup]) -> Any:
+        """
+        Fill fighter instance from already downloaded fighter page.
+        :param page_content: Raw content of fighter page or its already parsed soup.
+        :return: Soup object representing Fighter page.
+        """
+        self.url = Fighter.get_url(self.fighter_index)
+        if isinstance(page_content, BeautifulSoup):
+            soup_obj = page_content
+        else:
+            soup_obj = BeautifulSoup(page_content, features="html.parser")
+        # if page is not valid return Fighter with valid field == False otherwise continue
+        section_title_el = soup_obj.find("div", class_="tiled_bg latest_features")
+        if not section_title_el:
+            self.valid = False
+            return soup_obj
+        if "ERROR 404" in section_title_el.get_text():
+            self.valid = False
+            return soup_obj
+        # fill up Fighter instance with data mentioned on Sherdog
+        self.fullname = self.get_attribute_by_class(soup_obj, "fn")
+        nickname_el = self.get_attribute_by_class(soup_obj, "nickname")
+        if nickname_el:
+            self.nickname = nickname_el.replace('"', "")
+        nationality_el = soup_obj.find("strong", itemprop="nationality")
+        nationality = None
+        if nationality_el:
+            nationality = nationality_el.get_text()
+        self.nationality = nationality
+        self.locality = self.get_attribute_by_class(soup_obj, "locality")
+        birth_date, death_date, height_cm, weight_kg = self.get_personal_stats(soup_obj)
+        self.birth_date = birth_date
+        self.death_date = death_date
+        self.weight_kg = weight_kg
+        self.height_cm = height_cm
+
+        # association block holds associations, weight class and style, look it up only once
+        association_el = soup_obj.find("div", class_="association-class")
+        self.associations = self.get_associations(soup_obj, association_el)
+        self.weight_class = self.get_weight_class(soup_obj, association_el)
+        self.style = self.get_style(soup_obj, association_el)
+
+        return soup_obj
+
+    def get_style(self, soup_obj: Any, association_el: Optional[Any] = None) -> Optional[str]:
+        """ "
+        Get style from Soup object.
+        :param soup_obj: Soup object representing Fighter page.
+        :param association_el: Already found association element, looked up in soup_obj if not set.
+        :return: Style of fighter if exists.
+        """
+        if association_el is None:
+            association_el = soup_obj.find("div", class_="association-class")
+        style_el = association_el.select_one("b")
+
+        if not style_el:
+            return None
+
+        return style_el.get_text()
+
+    def get_weight_class(self, soup_obj: Any, association_el: Optional[Any] = None) -> Optional[str]:
+        """ "
+        Get weight class from Soup object.
+        :param soup_obj: Soup object representing Fighter page.
+        :param association_el: Already found association element, looked up in soup_obj if not set.
+        :return: Weight-class of fighter if exists.
+        """
+        if association_el is None:
+            association_el = soup_obj.find("div", class_="association-class")
+        weight_class_el = association_el.select_one('a[href*="/stats/fightfinder?weightclass"]')
+
+        if not weight_class_el:
+            return None
+
+        return weight_class_el.get_text()
+
+    def get_associations(self, soup_obj: Any, association_el: Optional[Any] = None) -> List[str]:
+        """ "
+        Get associations from Soup object.
+        :param soup_obj: Soup object representing Fighter page.
+        :param association_el: Already found association element, looked up in soup_obj if not set.
+        :return: List of found associations.
+        """
+        if association_el is None:
+            association_el = soup_obj.find("div", class_="association-class")
+        associtions = list()
+        associtions_candidates = association_el.find_all("span", itemprop="memberOf")
+        for candidate in associtions_candidates:
+            associtions.append(candidate.get_text())
+        return associtions
+
+    def get_normalized_data(self, date_str: str) -> str:
+        """
+        Get ISO format date from date format used by Sherdog
+        Apr 18, 1973 -> 1973-04-18T00:00:00
+        :param date_str: date in Sherdog format
+        :return: date in ISO-1 format
+        """
+        return normalize_birth_date(date_str)
+
+    def get_personal_stats(self, soup_obj: Any) -> Iterable[Any]:
+        """
+        Get birth date, weight in kgs and height cms (in ugly and not error prune way)
+        :param date_str: Soup object representing Fighter page.
+        :return: Tuple with birth_date, death_date, height_cm, weight_cm values if exists otherwise with None
+        """
+        stats_table_el = soup_obj.find("div", class_="bio-holder")
+        if not stats_table_el:
+            return tuple([None, None, None, None])
+        return self.parse_personal_stats([tr.get_text() for tr in stats_table_el.find_all("tr")])
+
+    def parse_personal_stats(self, trs: List[str]) -> Iterable[Any]:
+        """
+        Get birth date, death date, height and weight from texts of bio table rows, shared by all extraction backends.
+        :param trs: Texts of rows of bio table.
+        :return: Tuple with birth_date, death_date, height_cm, weight_cm values if exists otherwise with None
+        """
+        """
+        all stats in format X / Y\n and I am interested in the second value
+        first processed row is about age / birth date
+        """
+        birth_date_str = trs[0]
+        birth_date = None
+        if "N/A" not in birth_date_str:
+            birth_date = self.get_normalized_data(birth_date_str.split("/")[-1].replace("\n", "").strip())
+        death_date = None
+        SHIFTED_INDEX = 1
+        if len(trs) == 4:
+            SHIFTED_INDEX = 2
+            death_date_str = trs[1].replace("DIED", "").split("/")[-1].replace("\n", "").strip()
+            death_date = self.get_normalized_data(death_date_str)
+        # second row is about height ' / height cm
+        height_str = trs[SHIFTED_INDEX]
+        height_cm = None
+        if "N/A" not in height_str:
+            height_cm = float(height_str.split("/")[-1].replace("\n", "").replace("cm", "").strip())
+        # third row is about weight lbs / height kg
+        weight_str = trs[SHIFTED_INDEX + 1]
+        weight_cm = None
+        if "N/A" not in weight_str:
+            weight_cm = float(weight_str.split("/")[-1].replace("\n", "").replace("kg", "").strip())
+        return tuple([birth_date, death_date, height_cm, weight_cm])
+
+    def get_attribute_by_class(self, soup_obj: Any, class_name: str) -> Optional[str]:
+        """
+        Collects and returns attribute from fighter info if exists.
+        :return: Fighter attribute or None.
+        """
+        attr_el = soup_obj.find("span", class_=class_name)
+        attr_val = None
+        if attr_el:
+            attr_val = attr_el.get_text()
+        return attr_val
+
+    def __repr__(self) -> str:
+        fighter_str = f"""
+-----------
+{self.fullname} "{self.nickname}" / index={self.fighter_index}
+{self.url}
+Birth day: {self.birth_date} | Nationality: {self.nationality} | Locality: {self.locality}
+Fighting at: {self.associations} | style: {self.style} | weight-class: {self.weight_class}
+Weighting: {self.weight_kg} kg with height: {self.height_cm} cm
+-----------
+        """
+        return fighter_str
+
+    def to_dict(self) -> Dict[str, Optional[Any]]:
+        """
+        Build Dictionary from Fighter object.
+        :return: dictionary with parameters of Figter object.
+        """
+        return {
+            "fullname": self.fullname,
+            "index": self.fighter_index,
+            "url": self.url,
+            "nickname": self.nickname,
+            "birthDate": self.birth_date,
+            "deathDate": self.death_date,
+            "nationality": self.nationality,
+            "locality": self.locality,
+            "weightKg": self.weight_kg,
+            "heightCm": self.height_cm,
+            "associations": self.associations,
+            "weight_class": self.weight_class,
+            "style": self.style,
+        }
+
+    def to_json(self) -> bytes:
+        """
+        Serialize Fighter object to JSON.
+        :return: UTF-8 encoded JSON of to_dict output.
+        """
+        return dumps(self.to_dict())
@@ -0,0 +1,239 @@
+"""
+Shared HTTP sessions with connection pooling, keep-alive and retries, so pages of the same host
+reuse already opened TCP+TLS connections instead of paying a new handshake per request.
+"""
+import os
+import threading
+import time
+
+import requests
+
+from requests.adapters import HTTPAdapter
+from typing import Any, Dict, Optional
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from sherdog.metrics import get_metrics
+
+POOL_SIZE = 32
+RETRIES = 3
+BACKOFF_FACTOR = 0.5
+# requests without explicit timeout would block a download worker forever on a hung connection
+TIMEOUT_SECONDS = 30.0
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+DEFAULT_BASE_URL = "https://www.sherdog.com"
+# environment variable is inherited by worker processes, so they scrape the same site
+BASE_URL_VARIABLE = "SHERDOG_BASE_URL"
+
+_shared_session: Optional[Any] = None
+_shared_session_lock = threading.Lock()
+
+
+class _CountingRetry(Retry):
+    """_CountingRetry class - urllib3 retry policy counting every retry in crawl metrics."""
+
+    def increment(
+        self,
+        method: Optional[str] = None,
+        url: Optional[str] = None,
+        response: Optional[Any] = None,
+        error: Optional[Exception] = None,
+        _pool: Optional[Any] = None,
+        _stacktrace: Optional[Any] = None,
+    ) -> "_CountingRetry":
+        reason = type(error).__name__ if error is not None else getattr(response, "status", "unknown")
+        get_metrics().inc("retries_total", reason=reason)
+        return super().increment(method, url, response, error, _pool, _stacktrace)
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self) -> None:
+        # DNS lookup and TCP handshake
+        start = time.perf_counter()
+        super().connect()
+        get_metrics().observe("connect", time.perf_counter() - start)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        # DNS lookup, TCP and TLS handshake
+        start = time.perf_counter()
+        super().connect()
+        get_metrics().observe("connect", time.perf_counter() - start)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """_TimedHTTPAdapter class - adapter reporting request latency and connect time of direct connections to metrics."""
+
+    def __init__(self, timeout: Optional[float] = TIMEOUT_SECONDS, **kwargs: Any) -> None:
+        # timeout used for requests sent without one
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _TimedHTTPConnectionPool, "https": _TimedHTTPSConnectionPool}
+
+    def send(self, request: Any, *args: Any, **kwargs: Any) -> Any:
+        # time to response headers including retries, body is read later by the session
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        start = time.perf_counter()
+        try:
+            return super().send(request, *args, **kwargs)
+        finally:
+            get_metrics().observe("request", time.perf_counter() - start)
+
+
+def _get_retry(retries: int, backoff_factor: float) -> Retry:
+    retry_kwargs: Dict[str, Any] = {
+        "total": retries,
+        "backoff_factor": backoff_factor,
+        "status_forcelist": RETRY_STATUSES,
+        "respect_retry_after_header": True,
+        "raise_on_status": False,
+    }
+    # urllib3 < 1.26 names the parameter method_whitelist
+    methods_parameter = "allowed_methods" if hasattr(Retry, "DEFAULT_ALLOWED_METHODS") else "method_whitelist"
+    retry_kwargs[methods_parameter] = frozenset(["GET", "HEAD"])
+    return _CountingRetry(**retry_kwargs)
+
+
+def build_session(
+    pool_size: int = POOL_SIZE,
+    retries: int = RETRIES,
+    backoff_factor: float = BACKOFF_FACTOR,
+    proxies: Optional[Dict[str, str]] = None,
+    trust_env: bool = True,
+    http2: bool = False,
+    timeout: float = TIMEOUT_SECONDS,
+) -> Any:
+    """
+    Build HTTP session keeping connections alive between requests.
+    :param pool_size: Maximal number of kept connections per host, should match number of download workers.
+    :param retries: Number of retries of failed connections and 429/5xx responses.
+    :param backoff_factor: Base of exponential backoff between retries in seconds, Retry-After header is respected.
+    :param proxies: Proxies used by the session, e.g. {"https": "1.2.3.4:8080"}.
+    :param trust_env: Read proxies and certificates settings from environment variables.
+    :param http2: Use HTTP/2 session, requires httpx package with http2 extra.
+    :param timeout: Connect and read timeout in seconds of requests sent without explicit timeout.
+    :return: Session with requests-like get method.
+    """
+    if http2:
+        return Http2Session(pool_size=pool_size, retries=retries, proxies=proxies, trust_env=trust_env, timeout=timeout)
+    session = requests.Session()
+    adapter = _TimedHTTPAdapter(
+        timeout=timeout,
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=_get_retry(retries, backoff_factor),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    if proxies:
+        session.proxies = proxies
+    session.trust_env = trust_env
+    return session
+
+
+def get_session() -> Any:
+    """
+    Get process-wide session shared by all scrapers, it is created on the first call.
+    :return: Shared session.
+    """
+    global _shared_session
+    if _shared_session is None:
+        with _shared_session_lock:
+            if _shared_session is None:
+                _shared_session = build_session()
+    return _shared_session
+
+
+def set_session(session: Any) -> None:
+    """
+    Replace process-wide session, e.g. with HTTP/2 one or with different pool size.
+    :param session: Session returned by build_session.
+    """
+    global _shared_session
+    with _shared_session_lock:
+        _shared_session = session
+
+
+def get_base_url() -> str:
+    """
+    Get base URL of scraped site, sherdog.com unless it is replaced e.g. by local stand-in server.
+    :return: Base URL without trailing slash.
+    """
+    return os.environ.get(BASE_URL_VARIABLE, DEFAULT_BASE_URL).rstrip("/")
+
+
+def set_base_url(base_url: str) -> None:
+    """
+    Replace base URL of scraped site for this process and processes started by it.
+    :param base_url: Base URL, e.g. http://127.0.0.1:8000.
+    """
+    os.environ[BASE_URL_VARIABLE] = base_url
+
+
+class Http2Session(object):
+    """Http2Session class - HTTP/2 session based on httpx with requests-like interface."""
+
+    def __init__(
+        self,
+        pool_size: int = POOL_SIZE,
+        retries: int = RETRIES,
+        proxies: Optional[Dict[str, str]] = None,
+        trust_env: bool = True,
+        timeout: float = TIMEOUT_SECONDS,
+    ) -> None:
+        """
+        Initializes a Http2Session instance.
+        :param pool_size: Maximal number of kept connections.
+        :param retries: Number of retries of failed connections.
+        :param proxies: Proxies used by the session, only https proxy is taken into account.
+        :param trust_env: Read proxies and certificates settings from environment variables.
+        :param timeout: Timeout in seconds of requests sent without explicit timeout.
+        """
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("HTTP/2 session requires httpx package installed with http2 extra")
+        proxy = (proxies or dict()).get("https")
+        self.timeout = timeout
+        # client ignores its own connection limits when a transport is given, the transport owns the pool
+        self._client = httpx.Client(
+            transport=httpx.HTTPTransport(
+                http2=True,
+                retries=retries,
+                proxy=f"http://{proxy}" if proxy else None,
+                limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            ),
+            timeout=timeout,
+            trust_env=trust_env,
+        )
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None, **_: Any) -> Any:
+        return self._to_requests_response(self._client.get(url, headers=headers, timeout=timeout or self.timeout))
+
+    def head(
+        self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None, **_: Any
+    ) -> Any:
+        return self._to_requests_response(self._client.head(url, headers=headers, timeout=timeout or self.timeout))
+
+    @staticmethod
+    def _to_requests_response(response: Any) -> Any:
+        # requests compatible flag used by scrapers
+        setattr(response, "ok", response.is_success)
+        return response
+
+    def close(self) -> None:
+        self._client.close()
@@ -0,0 +1,192 @@
+"""
+Incremental refresh of scraped fighters driven by new events. Only fighters appearing on cards of events
+newer than the last refresh are downloaded again and their rows replace the old ones in the dataset.
+Events file is expected to be kept current by scrape_all_organizations (ideally with PageStore, so only
+changed organization pages are downloaded).
+"""
+import datetime
+import json
+import os
+import traceback
+
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from sherdog.crawler import Crawler, HostRateLimiter
+from sherdog.event import Event
+from sherdog.extractors import get_extractor
+from sherdog.fighter import Fighter
+from sherdog.http_session import build_session
+from sherdog.serialization import to_jsonl
+
+
+def load_state(state_path: str) -> Dict[str, Any]:
+    """
+    Load state of the last refresh.
+    :param state_path: JSON file with refresh state.
+    :return: Dictionary with last_event_date, last_event_indexes (events of that date which were refreshed) and
+             failed_fighters (fighters retried by the next refresh) keys, empty for the first run.
+    """
+    if not os.path.exists(state_path):
+        return dict()
+    with open(state_path) as state_file:
+        return json.load(state_file)
+
+
+def save_state(state_path: str, state: Dict[str, Any]) -> None:
+    temporary_path = f"{state_path}.tmp"
+    with open(temporary_path, "w") as state_file:
+        json.dump(state, state_file)
+    os.replace(temporary_path, state_path)
+
+
+def find_new_events(
+    events_filename: str,
+    since: Optional[str],
+    until: Optional[str] = None,
+    seen_indexes: Iterable[int] = (),
+) -> List[Dict[str, Any]]:
+    """
+    Find events which took place on a given date or later, events announced for the future are left out.
+    :param events_filename: JSONL file with events written by scrape_all_organizations.
+    :param since: ISO date (YYYY-MM-DD) of the first returned event, all events are returned if not set.
+    :param until: ISO date of the last returned event, today by default.
+    :param seen_indexes: Indexes of events which are left out, e.g. events of the since date refreshed before,
+                         so events of that date published later are still found.
+    :return: List of unique events ordered by date.
+    """
+    seen_indexes = set(seen_indexes)
+    until = until or datetime.date.today().isoformat()
+    events: Dict[int, Dict[str, Any]] = dict()
+    with open(events_filename) as events_file:
+        for line in events_file:
+            if not line.strip():
+                continue
+            event = json.loads(line)
+            event_date = event["fight_date"][:10]
+            if event["event_index"] in seen_indexes:
+                continue
+            if (since is None or event_date >= since) and event_date <= until:
+                events[event["event_index"]] = event
+    return sorted(events.values(), key=lambda event: event["fight_date"])
+
+
+def merge_rows(filename: str, index_key: str, updated_indexes: Set[int], rows: List[Dict[str, Any]]) -> None:
+    """
+    Replace rows of updated fighters in JSONL file, the file is streamed so it does not have to fit in memory.
+    :param filename: JSONL file with fighters or fights.
+    :param index_key: Key holding fighter index of a row (index for fighters, fighterIndexA for fights).
+    :param updated_indexes: Indexes of refreshed fighters, their old rows are dropped.
+    :param rows: New rows of refreshed fighters.
+    """
+    temporary_path = f"{filename}.tmp"
+    with open(temporary_path, "wb") as merged_file:
+        if os.path.exists(filename):
+            with open(filename, "rb") as existing_file:
+                for line in existing_file:
+                    if line.strip() and json.loads(line)[index_key] not in updated_indexes:
+                        merged_file.write(line if line.endswith(b"\n") else line + b"\n")
+        merged_file.write(to_jsonl(rows))
+    os.replace(temporary_path, filename)
+
+
+def refresh_from_events(
+    events_filename: str,
+    fighters_filename: str,
+    fights_filename: str,
+    state_path: str = "data/refresh_state.json",
+    since: Optional[str] = None,
+    concurrency: int = 8,
+    backend: str = "soup",
+    requests_per_second: float = 4.0,
+) -> Dict[str, int]:
+    """
+    Re-scrape fighters from cards of events newer than the last refresh and merge them into the dataset.
+    Fighters whose download or extraction failed are saved in the state and retried by the next refresh.
+    :param events_filename: JSONL file with events written by scrape_all_organizations.
+    :param fighters_filename: JSONL file with fighters, updated in place.
+    :param fights_filename: JSONL file with fights, updated in place.
+    :param state_path: JSON file where date of the last refreshed event and failed fighters are kept.
+    :param since: ISO date overriding date of the last refreshed event, events of this date are refreshed again.
+    :param concurrency: Number of requests in flight.
+    :param backend: Extraction backend used for parsing fighter pages (soup, strainer or lxml).
+    :param requests_per_second: Maximal number of requests sent to sherdog.com per second, 0 disables limiting.
+    :return: Dictionary with numbers of refreshed events, fighters and fights.
+    """
+    state = load_state(state_path)
+    if since:
+        events = find_new_events(events_filename, since)
+    else:
+        events = find_new_events(
+            events_filename, state.get("last_event_date"), seen_indexes=state.get("last_event_indexes", list())
+        )
+    print(f"Found {len(events)} new events")
+    session = build_session(pool_size=concurrency)
+    rate_limiter = HostRateLimiter(requests_per_second)
+
+    def download_event(position: int) -> Optional[bytes]:
+        url = Event.get_url(events[position]["url"])
+        rate_limiter.wait(url)
+        return Event.download_page(url, session)
+
+    def download_fighter(fighter_index: int) -> Optional[bytes]:
+        rate_limiter.wait(Fighter.get_url(fighter_index))
+        return Fighter.download_page(fighter_index, proxy_session=session)
+
+    # fighters failed by the previous refresh are tried again
+    fighter_indexes: List[int] = list(state.get("failed_fighters", list()))
+    event_crawler = Crawler(download_event, concurrency)
+    for position, page_content, error in event_crawler.crawl(range(len(events))):
+        if error is not None:
+            # events from the day of failed one are refreshed again by the next run, state is not moved past them
+            print(f"Download of event {events[position]['event_index']} failed: {error!r}")
+            failed_date = events[position]["fight_date"][:10]
+            events = [event for event in events[:position] if event["fight_date"][:10] < failed_date]
+            break
+        if page_content is None:
+            # deleted event would block every later refresh if it held the state back
+            print(f"Event {events[position]['event_index']} was not found, it is skipped")
+            continue
+        for fighter_index in Event.get_fighter_indexes(page_content):
+            if fighter_index not in fighter_indexes:
+                fighter_indexes.append(fighter_index)
+    print(f"Found {len(fighter_indexes)} fighters on new events")
+
+    extractor = get_extractor(backend)
+    fighter_rows: List[Dict[str, Any]] = list()
+    fight_rows: List[Dict[str, Any]] = list()
+    updated_indexes: Set[int] = set()
+    failed_indexes: List[int] = list()
+    fighter_crawler = Crawler(download_fighter, concurrency)
+    for fighter_index, page_content, error in fighter_crawler.crawl(fighter_indexes):
+        if error is not None:
+            print(f"Download of fighter {fighter_index} failed, it is retried by the next refresh: {error!r}")
+            failed_indexes.append(fighter_index)
+            continue
+        if page_content is None:
+            print(f"Fighter {fighter_index} was not found, old rows are kept")
+            continue
+        try:
+            fighter_obj = extractor.extract(page_content, fighter_index)
+        except Exception:
+            print(f"Scrapping of fighter {fighter_index} failed, it is retried by the next refresh:")
+            print(traceback.format_exc())
+            failed_indexes.append(fighter_index)
+            continue
+        if not fighter_obj.valid:
+            continue
+        updated_indexes.add(fighter_index)
+        fighter_rows.append(fighter_obj.to_dict())
+        fight_rows.extend(fight.to_dict() for fight in fighter_obj.fights)
+
+    merge_rows(fighters_filename, "index", updated_indexes, fighter_rows)
+    merge_rows(fights_filename, "fighterIndexA", updated_indexes, fight_rows)
+    if events:
+        last_event_date = events[-1]["fight_date"][:10]
+        last_event_indexes = {event["event_index"] for event in events if event["fight_date"][:10] == last_event_date}
+        if not since and state.get("last_event_date") == last_event_date:
+            last_event_indexes.update(state.get("last_event_indexes", list()))
+        state["last_event_date"] = last_event_date
+        state["last_event_indexes"] = sorted(last_event_indexes)
+    state["failed_fighters"] = failed_indexes
+    save_state(state_path, state)
+    return {"events": len(events), "fighters": len(fighter_rows), "fights": len(fight_rows)}
@@ -0,0 +1,253 @@
+"""
+Crawl metrics shared by all scrapers of a process: timing histograms of crawl stages (connect, request, download,
+parse, extract, serialize), throughput and error, retry and proxy counters. Metrics are exposed either as Prometheus
+text on a local HTTP endpoint or as JSON file dumped periodically.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+STAGES = ("connect", "request", "download", "parse", "extract", "serialize")
+# upper bounds of histogram buckets in seconds
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PREFIX = "sherdog"
+
+CounterKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+class Histogram(object):
+    """Histogram class - bucketed distribution of durations, quantiles are estimated from buckets."""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS) -> None:
+        self.buckets = buckets
+        # the last bucket counts values above the highest bound
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate quantile by linear interpolation inside the bucket containing it.
+        :param q: Quantile from 0 to 1, e.g. 0.99.
+        :return: Estimated value in seconds or None if nothing was observed.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for position, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[position - 1] if position else 0.0
+                if position == len(self.buckets):
+                    return lower
+                return lower + (self.buckets[position] - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+
+class Metrics(object):
+    """Metrics class - thread-safe registry of counters and stage histograms."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[CounterKey, float] = dict()
+        self._histograms: Dict[str, Histogram] = {stage: Histogram() for stage in STAGES}
+        self.started = time.monotonic()
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """
+        Increase counter.
+        :param name: Name of counter without prefix, e.g. errors_total.
+        :param value: Increment.
+        :param labels: Labels of counter, e.g. type="ConnectionError".
+        """
+        key = (name, tuple(sorted((label, str(label_value)) for label, label_value in labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            if stage not in self._histograms:
+                self._histograms[stage] = Histogram()
+            self._histograms[stage].observe(seconds)
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """
+        Measure duration of the with block as one observation of a stage.
+        :param stage: Name of crawl stage, e.g. download.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def record_page(self, size: int) -> None:
+        self.inc("pages_total")
+        self.inc("bytes_total", size)
+
+    def record_error(self, error: BaseException, stage: str) -> None:
+        self.inc("errors_total", type=type(error).__name__, stage=stage)
+
+    def get_counter(self, name: str, **labels: Any) -> float:
+        """
+        Get value of counter, counters of all label values are summed if labels are not set.
+        :param name: Name of counter without prefix.
+        :param labels: Labels of counter.
+        :return: Value of counter.
+        """
+        with self._lock:
+            if labels:
+                key = (name, tuple(sorted((label, str(label_value)) for label, label_value in labels.items())))
+                return self._counters.get(key, 0)
+            return sum(value for (counter_name, _), value in self._counters.items() if counter_name == name)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters = dict()
+            self._histograms = {stage: Histogram() for stage in STAGES}
+            self.started = time.monotonic()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Snapshot of all metrics.
+        :return: Dictionary with throughput, counters and stage statistics (count, total seconds, p50, p90, p99).
+        """
+        uptime = max(time.monotonic() - self.started, 1e-9)
+        counters = dict()
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                label_str = ",".join(f"{label}={label_value}" for label, label_value in labels)
+                counters[f"{name}{{{label_str}}}" if label_str else name] = value
+            stages = {
+                stage: {
+                    "count": histogram.count,
+                    "seconds": histogram.sum,
+                    "p50": histogram.quantile(0.5),
+                    "p90": histogram.quantile(0.9),
+                    "p99": histogram.quantile(0.99),
+                }
+                for stage, histogram in self._histograms.items()
+            }
+        return {
+            "uptime_seconds": uptime,
+            "pages_per_second": counters.get("pages_total", 0) / uptime,
+            "bytes_per_second": counters.get("bytes_total", 0) / uptime,
+            "counters": counters,
+            "stages": stages,
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Render metrics in Prometheus text exposition format.
+        :return: Text served on /metrics endpoint.
+        """
+        lines: List[str] = list()
+        uptime = time.monotonic() - self.started
+        lines.append(f"# TYPE {PREFIX}_uptime_seconds gauge")
+        lines.append(f"{PREFIX}_uptime_seconds {uptime:.3f}")
+        with self._lock:
+            typed = set()
+            for (name, labels), value in sorted(self._counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {PREFIX}_{name} counter")
+                    typed.add(name)
+                lines.append(f"{PREFIX}_{name}{self._format_labels(labels)} {value}")
+            lines.append(f"# TYPE {PREFIX}_stage_seconds histogram")
+            for stage, histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                    bucket_labels = self._format_labels((("le", le), ("stage", stage)))
+                    lines.append(f"{PREFIX}_stage_seconds_bucket{bucket_labels} {cumulative}")
+                stage_label = self._format_labels((("stage", stage),))
+                lines.append(f"{PREFIX}_stage_seconds_sum{stage_label} {histogram.sum:.6f}")
+                lines.append(f"{PREFIX}_stage_seconds_count{stage_label} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+        if not labels:
+            return ""
+        escaped = (
+            (label, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for label, value in labels
+        )
+        return "{" + ",".join(f'{label}="{value}"' for label, value in escaped) + "}"
+
+    def dump_json(self, path: str) -> None:
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w") as metrics_file:
+            json.dump(self.to_dict(), metrics_file, indent=2)
+        os.replace(temporary_path, path)
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """
+    Get process-wide metrics registry shared by all scrapers.
+    :return: Metrics instance.
+    """
+    return _metrics
+
+
+def start_json_dump(path: str, interval_seconds: float = 60.0) -> threading.Event:
+    """
+    Dump metrics to JSON file periodically from a background thread.
+    :param path: JSON file rewritten on every dump.
+    :param interval_seconds: Time between dumps.
+    :return: Event stopping the dumps when set.
+    """
+    stop_event = threading.Event()
+
+    def dump_forever() -> None:
+        while not stop_event.wait(interval_seconds):
+            _metrics.dump_json(path)
+
+    threading.Thread(target=dump_forever, name="metrics-dump", daemon=True).start()
+    return stop_event
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] == "/metrics.json":
+            body = json.dumps(_metrics.to_dict()).encode("utf-8")
+            content_type = "application/json"
+        else:
+            body = _metrics.to_prometheus().encode("utf-8")
+            content_type = "text/plain; version=0.0.4"
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_: Any) -> None:
+        # scraping of metrics would flood the crawl output
+        pass
+
+
+def serve_metrics(port: int = 9108, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serve metrics from a background thread, Prometheus text on /metrics and JSON on /metrics.json.
+    :param port: Port of metrics endpoint.
+    :param host: Interface the endpoint listens on.
+    :return: Running server, call its shutdown method to stop it.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -0,0 +1,103 @@
+"""
+Cached normalization of dates and times found on Sherdog pages, shared by Fight and Fighter. The same few
+thousand dates repeat across millions of fight rows, so every distinct text is parsed once and the ISO value
+is served from an LRU cache afterwards. Texts are split and looked up in a precompiled month table instead of
+datetime.strptime, which compiles and matches a locale dependent regular expression on every call. Texts the
+fast path does not understand fall back to strptime, so results and raised errors stay the same.
+"""
+import datetime
+
+from functools import lru_cache
+from typing import Dict, Optional
+
+# distinct fight dates and birth dates of all fighters fit into the cache
+DATE_CACHE_SIZE = 65536
+TIME_CACHE_SIZE = 4096
+
+FIGHT_DATE_FORMAT = "%b / %d / %Y"
+BIRTH_DATE_FORMAT = "%b %d, %Y"
+
+MONTHS: Dict[str, int] = {
+    month: number
+    for number, name in enumerate(
+        ("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"), start=1
+    )
+    for month in (name, name.capitalize(), name.upper())
+}
+
+
+def _to_iso(day_text: str, month_text: str, year_text: str) -> Optional[str]:
+    # None means the text is left to strptime
+    month = MONTHS.get(month_text)
+    # isdigit accepts superscripts and other digits int() rejects, they are left to strptime as well
+    if month is None or not all(text.isascii() and text.isdecimal() for text in (day_text, year_text)):
+        return None
+    if len(year_text) != 4:
+        return None
+    day = int(day_text)
+    year = int(year_text)
+    try:
+        datetime.date(year, month, day)
+    except ValueError:
+        return None
+    return f"{year:04d}-{month:02d}-{day:02d}T00:00:00"
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def normalize_fight_date(date_text: str) -> str:
+    """
+    Get ISO format date from date format of fight history tables.
+    Apr / 18 / 1973 -> 1973-04-18T00:00:00
+    :param date_text: Date in Sherdog fight history format.
+    :return: Date in ISO format.
+    :raises ValueError: If the text is not a date.
+    """
+    parts = date_text.split(" / ")
+    iso_date = _to_iso(parts[1], parts[0], parts[2]) if len(parts) == 3 else None
+    if iso_date is None:
+        return datetime.datetime.strptime(date_text, FIGHT_DATE_FORMAT).isoformat()
+    return iso_date
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def normalize_birth_date(date_text: str) -> str:
+    """
+    Get ISO format date from date format of fighter bio table.
+    Apr 18, 1973 -> 1973-04-18T00:00:00
+    :param date_text: Date in Sherdog bio format.
+    :return: Date in ISO format.
+    :raises ValueError: If the text is not a date.
+    """
+    parts = date_text.split(" ")
+    iso_date = None
+    if len(parts) == 3 and parts[1].endswith(","):
+        iso_date = _to_iso(parts[1][:-1], parts[0], parts[2])
+    if iso_date is None:
+        return datetime.datetime.strptime(date_text, BIRTH_DATE_FORMAT).isoformat()
+    return iso_date
+
+
+@lru_cache(maxsize=TIME_CACHE_SIZE)
+def convert_to_seconds(time_text: str) -> int:
+    """
+    Get duration in seconds from minutes:seconds format.
+    4:59 -> 299
+    :param time_text: Time of fight end in its last round.
+    :return: Number of seconds or -1 if the time is not known (N/A).
+    """
+    try:
+        minutes_seconds_arr = time_text.split(":")
+        if len(minutes_seconds_arr) < 2:
+            return -1
+        seconds = int(minutes_seconds_arr[0]) * 60
+        seconds += int(minutes_seconds_arr[1])
+    except ValueError:
+        # N/A
+        return -1
+    return seconds
+
+
+def clear_caches() -> None:
+    normalize_fight_date.cache_clear()
+    normalize_birth_date.cache_clear()
+    convert_to_seconds.cache_clear()
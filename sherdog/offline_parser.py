@@ -0,0 +1,62 @@
+"""
+Parsing of archived fighter pages without any network access.
+Pages are parsed in a process pool so all cores are used, independent of the downloading part.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from sherdog.extractors import get_extractor
+from sherdog.fighter import Fighter
+
+ParsedFighter = Tuple[Optional[Dict[str, Optional[Any]]], List[Dict[str, Optional[Any]]]]
+
+
+def parse_fighter_page(page_content: Union[bytes, str], fighter_index: int, backend: str = "soup") -> ParsedFighter:
+    """
+    Parse fighter and fights from raw fighter page.
+    :param page_content: Raw content of fighter page.
+    :param fighter_index: Sherdog index of fighter.
+    :param backend: Name of extraction backend (soup, strainer or lxml).
+    :return: Tuple with fighter dictionary (None for invalid page) and list of fight dictionaries.
+    """
+    return _to_dicts(_get_extractor(backend).extract(page_content, fighter_index))
+
+
+def parse_fighter_file(path: str, backend: str = "soup") -> ParsedFighter:
+    """
+    Parse fighter and fights from fighter page stored on disk, fighter index is taken from the file name.
+    :param path: Path to stored fighter page.
+    :param backend: Name of extraction backend (soup, strainer or lxml).
+    :return: Tuple with fighter dictionary (None for invalid page) and list of fight dictionaries.
+    """
+    with open(path, "rb") as page_file:
+        return parse_fighter_page(page_file.read(), Fighter.get_index_from_path(path), backend=backend)
+
+
+def parse_fighter_files(
+    paths: Iterable[str], processes: Optional[int] = None, chunksize: int = 16, backend: str = "soup"
+) -> Iterator[ParsedFighter]:
+    """
+    Parse stored fighter pages in a pool of processes.
+    :param paths: Paths to stored fighter pages.
+    :param processes: Number of worker processes, number of CPUs by default.
+    :param chunksize: Number of pages sent to a worker process at once.
+    :param backend: Name of extraction backend (soup, strainer or lxml).
+    :return: Iterator of parsed fighters in the same order as given paths.
+    """
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        for parsed in executor.map(partial(parse_fighter_file, backend=backend), paths, chunksize=chunksize):
+            yield parsed
+
+
+@lru_cache(maxsize=None)
+def _get_extractor(backend: str) -> Any:
+    # extractors are stateless, one instance per process is enough
+    return get_extractor(backend)
+
+
+def _to_dicts(fighter: Fighter) -> ParsedFighter:
+    if not fighter.valid:
+        return None, list()
+    return fighter.to_dict(), [fight.to_dict() for fight in fighter.fights or list()]
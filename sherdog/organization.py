@@ -0,0 +1,86 @@
+import re
+
+from bs4 import BeautifulSoup
+from typing import Any, Dict, List, Optional, Union
+
+from sherdog.http_session import get_base_url
+
+# number of events listed on one page of recent events
+EVENTS_PER_PAGE = 100
+
+
+class Organization(object):
+    """Organization class - reads organization name and its events from pages of its recent events."""
+
+    # <a href="/organizations/Ultimate-Fighting-Championship-UFC-2/recent-events/3">3</a>
+    PAGE_HREF_RE = re.compile(r"/recent-events/(\d+)/?$")
+
+    @staticmethod
+    def get_url(organization_index: int, page: int = 1) -> str:
+        """
+        Build URL of a page of organization's recent events, Sherdog resolves the organization by index only.
+        :param organization_index: Sherdog index of organization.
+        :param page: Page of recent events, starting from 1.
+        :return: URL of the page.
+        """
+        organization_path = f"/organizations/Ultimate-Fighting-Championship-UFC-{organization_index}"
+        return f"{get_base_url()}{organization_path}/recent-events/{page}"
+
+    @staticmethod
+    def parse_page(
+        page_content: Union[bytes, str, None], organization_index: int, with_events: bool = True
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Parse a page of organization's recent events.
+        :param page_content: Raw content of the page.
+        :param organization_index: Sherdog index of organization, it is stored with every event.
+        :param with_events: Extract event rows, only their number is counted otherwise.
+        :return: Dictionary with fullname of organization, number of listed rows, events and the highest page
+                 linked by pagination (None if the page has no pagination) or None for missing organization.
+        """
+        soup_obj = BeautifulSoup(page_content or b"", features="html.parser")
+        section_title_el = soup_obj.find("div", class_="tiled_bg latest_features")
+        if not section_title_el or "ERROR 404" in section_title_el.get_text():
+            return None
+        section_el = soup_obj.find("section")
+        recent_event_el = soup_obj.find("div", id="recent_tab")
+        if section_el is None or recent_event_el is None:
+            return None
+        organization_fullname = section_el.find_all("div", itemprop="name")[0].get_text()
+        trs = recent_event_el.find_all("tr")[1:]
+        return {
+            "fullname": organization_fullname,
+            "rows": len(trs),
+            "events": [Organization.get_event(tr, organization_index) for tr in trs] if with_events else list(),
+            "last_page": Organization.get_last_page(soup_obj),
+        }
+
+    @staticmethod
+    def get_event(tr: Any, organization_index: int) -> Dict[str, Any]:
+        fight_date = tr.find("meta", itemprop="startDate").get("content", "")
+        url = tr.find("a", itemprop="url").get("href", "")
+        event_index = int(url.split("-")[-1])
+        event_name = tr.find("span", itemprop="name").get_text()
+        location = tr.find("td", itemprop="location").get_text().strip()
+        return {
+            "fight_date": fight_date,
+            "url": url,
+            "event_name": event_name,
+            "location": location,
+            "event_index": event_index,
+            "organization_index": organization_index,
+        }
+
+    @staticmethod
+    def get_last_page(soup_obj: Any) -> Optional[int]:
+        """
+        Get the highest page of recent events linked from the page, pagination may show only nearby pages.
+        :param soup_obj: Parsed page of recent events.
+        :return: Number of the page or None if the page has no pagination links.
+        """
+        pages: List[int] = list()
+        for link in soup_obj.find_all("a", href=Organization.PAGE_HREF_RE):
+            page_match = Organization.PAGE_HREF_RE.search(str(link.get("href", "")))
+            if page_match:
+                pages.append(int(page_match.group(1)))
+        return max(pages) if pages else None
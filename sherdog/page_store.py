@@ -0,0 +1,178 @@
+import datetime
+import hashlib
+import sqlite3
+import threading
+import zlib
+
+from typing import Any, Dict, Optional, Tuple
+
+from sherdog.http_session import get_session
+
+
+class PageStore(object):
+    """PageStore class - local archive of downloaded pages keyed by URL with content-addressed compressed bodies."""
+
+    def __init__(self, path: str = "data/pages.sqlite") -> None:
+        """
+        Initializes a PageStore instance, creates the sqlite database if it does not exist.
+        :param path: Path to the sqlite database.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS blobs (sha256 TEXT PRIMARY KEY, content BLOB NOT NULL)")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                sha256 TEXT NOT NULL REFERENCES blobs(sha256),
+                status INTEGER NOT NULL,
+                fetched_at TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                extracted INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(pages)")}
+        if "extracted" not in columns:
+            # archives created before extraction was tracked, their pages are extracted again once
+            self._connection.execute("ALTER TABLE pages ADD COLUMN extracted INTEGER NOT NULL DEFAULT 0")
+        self._connection.commit()
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Get stored page with its metadata.
+        :param url: URL of the page.
+        :return: Dictionary with content, status, fetched_at, etag, last_modified and extracted keys or None if not
+                 stored.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                """
+                SELECT blobs.content, pages.status, pages.fetched_at, pages.etag, pages.last_modified, pages.extracted
+                FROM pages JOIN blobs ON blobs.sha256 = pages.sha256
+                WHERE pages.url = ?
+                """,
+                (url,),
+            ).fetchone()
+        if not row:
+            return None
+        return {
+            "content": zlib.decompress(row[0]),
+            "status": row[1],
+            "fetched_at": row[2],
+            "etag": row[3],
+            "last_modified": row[4],
+            "extracted": bool(row[5]),
+        }
+
+    def put(
+        self,
+        url: str,
+        content: bytes,
+        status: int = 200,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> bool:
+        """
+        Store downloaded page, identical bodies are stored only once. Page with a new content is not extracted yet.
+        :param url: URL of the page.
+        :param content: Raw content of the page.
+        :param status: HTTP status of the response.
+        :param etag: ETag header of the response.
+        :param last_modified: Last-Modified header of the response.
+        :return: True if the content differs from the previously stored version of the page.
+        """
+        sha256 = hashlib.sha256(content).hexdigest()
+        with self._lock:
+            previous = self._connection.execute(
+                "SELECT sha256, extracted FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            changed = not previous or previous[0] != sha256
+            self._connection.execute(
+                "INSERT OR IGNORE INTO blobs (sha256, content) VALUES (?, ?)", (sha256, zlib.compress(content))
+            )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO pages (url, sha256, status, fetched_at, etag, last_modified, extracted) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, sha256, status, self._now(), etag, last_modified, 0 if changed else previous[1]),
+            )
+            self._connection.commit()
+        return changed
+
+    def touch(self, url: str) -> None:
+        """
+        Update fetch time of a page which was not modified since the last download.
+        :param url: URL of the page.
+        """
+        with self._lock:
+            self._connection.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (self._now(), url))
+            self._connection.commit()
+
+    def mark_extracted(self, url: str) -> None:
+        """
+        Record that rows of the stored page were written, only such pages are reported as unchanged by fetch.
+        Scrapers call it after their output is flushed, so a failed extraction or a crash before the rows are on disk
+        makes the page extracted again by the next run.
+        :param url: URL of the page.
+        """
+        with self._lock:
+            self._connection.execute("UPDATE pages SET extracted = 1 WHERE url = ?", (url,))
+            self._connection.commit()
+
+    @staticmethod
+    def conditional_headers(stored_page: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Build headers of conditional request for a stored page.
+        :param stored_page: Stored page returned by get method.
+        :return: Dictionary with If-None-Match and If-Modified-Since headers if known.
+        """
+        headers: Dict[str, str] = dict()
+        if not stored_page:
+            return headers
+        if stored_page["etag"]:
+            headers["If-None-Match"] = stored_page["etag"]
+        if stored_page["last_modified"]:
+            headers["If-Modified-Since"] = stored_page["last_modified"]
+        return headers
+
+    def fetch(
+        self, url: str, session: Optional[Any] = None, headers: Optional[Dict[str, str]] = None
+    ) -> Tuple[Optional[bytes], bool]:
+        """
+        Download page with conditional request and keep the archive up to date.
+        :param url: URL of the page.
+        :param session: Session used for the request, shared keep-alive session is used if not set.
+        :param headers: Additional headers of the request.
+        :return: Tuple with page content (None if the page does not exist) and flag which is False when the page
+                 did not change since the last download and it was already extracted.
+        :raises HTTPError: Server answered by other error (e.g. 429 or 5xx left after retries).
+        """
+        stored_page = self.get(url)
+        request_headers = dict(headers or dict())
+        request_headers.update(self.conditional_headers(stored_page))
+        response = (session or get_session()).get(url, headers=request_headers)
+        if response.status_code == 304 and stored_page:
+            self.touch(url)
+            return stored_page["content"], not stored_page["extracted"]
+        if response.status_code == 404:
+            return None, True
+        response.raise_for_status()
+        changed = self.put(
+            url,
+            response.content,
+            status=response.status_code,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return response.content, changed or not (stored_page and stored_page["extracted"])
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.datetime.utcnow().replace(microsecond=0).isoformat()
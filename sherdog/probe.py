@@ -0,0 +1,143 @@
+"""
+Cheap liveness probing of fighter and organization indexes. Known live and dead indexes are kept
+in a persisted bitmap, so full crawls spend requests and parsing only on real pages.
+"""
+import os
+import re
+import threading
+
+from typing import Any, Callable, Dict, Optional
+
+from sherdog.http_session import get_session
+from sherdog.user_agent import get_user_agent
+
+
+class LivenessMap(object):
+    """LivenessMap class - persisted bitmap with 2 bits per index: unknown, live or dead."""
+
+    UNKNOWN = 0
+    LIVE = 1
+    DEAD = 2
+
+    def __init__(self, path: Optional[str] = None, save_every: int = 1000) -> None:
+        """
+        Initializes a LivenessMap instance, the bitmap is loaded from path if it exists.
+        :param path: File where the bitmap is persisted, it is kept only in memory if not set.
+        :param save_every: Number of changes after which the bitmap is saved.
+        """
+        self.path = path
+        self.save_every = save_every
+        self._bits = bytearray()
+        self._changes = 0
+        self._lock = threading.Lock()
+        # saves are started by worker threads, they must not write the same temporary file at once
+        self._save_lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path, "rb") as bitmap_file:
+                self._bits = bytearray(bitmap_file.read())
+
+    def get(self, index: int) -> int:
+        """
+        Get known state of index.
+        :param index: Fighter or organization index.
+        :return: UNKNOWN, LIVE or DEAD.
+        """
+        byte_index, shift = divmod(index, 4)
+        with self._lock:
+            if byte_index >= len(self._bits):
+                return self.UNKNOWN
+            return (self._bits[byte_index] >> (2 * shift)) & 0b11
+
+    def is_dead(self, index: int) -> bool:
+        return self.get(index) == self.DEAD
+
+    def set_live(self, index: int) -> None:
+        self._set(index, self.LIVE)
+
+    def set_dead(self, index: int) -> None:
+        self._set(index, self.DEAD)
+
+    def counts(self) -> Dict[str, int]:
+        """
+        Count indexes by their state.
+        :return: Dictionary with numbers of live and dead indexes.
+        """
+        live = dead = 0
+        with self._lock:
+            for byte in self._bits:
+                for shift in range(0, 8, 2):
+                    state = (byte >> shift) & 0b11
+                    live += state == self.LIVE
+                    dead += state == self.DEAD
+        return {"live": live, "dead": dead}
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        with self._save_lock:
+            with self._lock:
+                data = bytes(self._bits)
+                self._changes = 0
+            temporary_path = f"{self.path}.tmp"
+            with open(temporary_path, "wb") as bitmap_file:
+                bitmap_file.write(data)
+            os.replace(temporary_path, self.path)
+
+    def _set(self, index: int, state: int) -> None:
+        byte_index, shift = divmod(index, 4)
+        with self._lock:
+            if byte_index >= len(self._bits):
+                self._bits.extend(bytes(byte_index + 1 - len(self._bits)))
+            previous = self._bits[byte_index]
+            self._bits[byte_index] = (previous & ~(0b11 << (2 * shift))) | (state << (2 * shift))
+            if previous != self._bits[byte_index]:
+                self._changes += 1
+            should_save = self._changes >= self.save_every
+        if should_save:
+            self.save()
+
+
+# canonical URL of organization page, the slug before index is ignored by Sherdog
+ORGANIZATION_LOCATION_RE = re.compile(r"-(\d+)(?:/recent-events/\d+)?/?$")
+
+
+def _probe_page(url: str, is_same_page: Callable[[str], bool], session: Optional[Any]) -> int:
+    response = (session or get_session()).head(url, headers={"User-Agent": get_user_agent()}, allow_redirects=False)
+    if response.status_code in (404, 410):
+        return LivenessMap.DEAD
+    if 300 <= response.status_code < 400:
+        if is_same_page(response.headers.get("Location", "")):
+            return LivenessMap.LIVE
+        return LivenessMap.DEAD
+    return LivenessMap.UNKNOWN
+
+
+def probe_fighter(fighter_index: int, url: str, session: Optional[Any] = None) -> int:
+    """
+    Probe fighter page with HEAD request without following redirects, nothing is downloaded nor parsed.
+    Existing profile redirects to its canonical URL ending with the fighter index, missing one answers 404
+    or redirects elsewhere. Plain 200 answer does not tell anything, the page has to be downloaded then.
+    :param fighter_index: Sherdog index of fighter.
+    :param url: URL of fighter page.
+    :param session: Session used for the request, shared keep-alive session is used if not set.
+    :return: LivenessMap.LIVE, LivenessMap.DEAD or LivenessMap.UNKNOWN.
+    """
+    return _probe_page(url, lambda location: location.rstrip("/").endswith(f"-{fighter_index}"), session)
+
+
+def probe_organization(organization_index: int, url: str, session: Optional[Any] = None) -> int:
+    """
+    Probe the first page of organization's recent events with HEAD request, nothing is downloaded nor parsed.
+    Missing organization answers 404, existing one may redirect to its canonical name with the same index.
+    Plain 200 answer does not tell anything, it may be an error page, the page has to be downloaded then.
+    :param organization_index: Sherdog index of organization.
+    :param url: URL of the first page of recent events.
+    :param session: Session used for the request, shared keep-alive session is used if not set.
+    :return: LivenessMap.LIVE, LivenessMap.DEAD or LivenessMap.UNKNOWN.
+    """
+
+    def is_same_organization(location: str) -> bool:
+        location_match = ORGANIZATION_LOCATION_RE.search(location)
+        return location_match is not None and int(location_match.group(1)) == organization_index
+
+    return _probe_page(url, is_same_organization, session)
@@ -0,0 +1,281 @@
+import random
+import threading
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Deque, Iterable, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from sherdog.crawler import AdaptiveRateLimiter
+from sherdog.http_session import RETRIES, build_session, get_session
+from sherdog.metrics import get_metrics
+
+
+class Proxies:
+
+    PROXY_TIMEOUT_SECONDS = 0.75
+    VALIDATION_WORKERS = 32
+
+    def __init__(self, rate_limiter: Optional[Any] = None) -> None:
+        """
+        Initializes a Proxies instance.
+        :param rate_limiter: AdaptiveRateLimiter pacing validation requests, so the IP echo service
+                             is not flooded by concurrent validations.
+        """
+        self.rate_limiter = rate_limiter
+
+    def _get_free_proxies(self) -> Deque[Dict[str, Any]]:
+        url = "https://free-proxy-list.net/"
+        # get the HTTP response and construct soup object
+        soup = BeautifulSoup(get_session().get(url).content, "html.parser")
+        proxies: Deque[Dict[str, Any]] = deque()
+        for row in soup.find("div", class_="table-responsive").find_all("tr")[1:]:
+            tds = row.find_all("td")
+            try:
+                ip = tds[0].text.strip()
+                port = tds[1].text.strip()
+                country_code = tds[2].text.strip()
+                google = True if tds[5].text.strip() == "yes" else False
+                https_available = True if tds[6].text.strip() == "yes" else False
+                host = f"{ip}:{port}"
+                proxies.append(
+                    {
+                        "url": host,
+                        "country_code": country_code,
+                        "google_available": google,
+                        "https_available": https_available,
+                    }
+                )
+            except IndexError:
+                continue
+        return proxies
+
+    def _get_session(self, proxy: str):
+        # construct an HTTP session used only for validation, slow proxy is not worth retrying
+        session = build_session(pool_size=1, retries=0, proxies={"http": proxy, "https": proxy}, trust_env=False)
+        if self.rate_limiter:
+            return self.rate_limiter.throttle(session, retries=0)
+        return session
+
+    def _get_https_session(self, proxy: str, trust_env=False, retries: int = RETRIES):
+        # construct a keep-alive HTTP session used for scraping through the proxy
+        return build_session(retries=retries, proxies={"https": proxy}, trust_env=trust_env)
+
+    def _test_session(self, proxy_session, proxy_url: str) -> Tuple[bool, float]:
+        proxy_url = proxy_url.split(":")[0]
+        response = proxy_session.get("http://icanhazip.com", timeout=self.PROXY_TIMEOUT_SECONDS)
+        # time from sending the request to its answer, waiting for the rate limiter is not included
+        request_time = response.elapsed.total_seconds()
+        response_text: str = response.text.strip()
+        if proxy_url == response_text:
+            return (True, request_time)
+        return (False, request_time)
+
+    def _validate_proxy(self, proxy_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        proxy_url = proxy_data["url"]
+        proxy_session = self._get_session(proxy_url)
+        try:
+            is_valid, request_time = self._test_session(proxy_session, proxy_url)
+        except Exception as error:
+            print(f"Proxy {proxy_url} failed validation: {error!r}")
+            get_metrics().inc("proxy_validations_total", result="error")
+            return None
+        finally:
+            proxy_session.close()
+        get_metrics().inc("proxy_validations_total", result="valid" if is_valid else "invalid")
+        if not is_valid:
+            return None
+        proxy_data["is_valid"] = is_valid
+        proxy_data["request_time"] = request_time
+        return proxy_data
+
+    def _get_only_valid_proxies(self, proxies_data: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # every validation waits up to PROXY_TIMEOUT_SECONDS, so proxies are tested concurrently
+        with ThreadPoolExecutor(max_workers=self.VALIDATION_WORKERS) as executor:
+            validated = list(executor.map(self._validate_proxy, proxies_data))
+        return [proxy_data for proxy_data in validated if proxy_data]
+
+    def get_proxy(self) -> Any:
+        print("Get FREE proxies")
+        proxies_data = self._get_free_proxies()
+        print(f"Got {len(proxies_data)} FREE proxies")
+
+        print("Get valid FREE proxies")
+        valid_proxies = self._get_only_valid_proxies(proxies_data)
+        print(f"Got {len(valid_proxies)} valid FREE proxies")
+
+        print("Sort proxies by speed")
+        sorted_proxies_by_speed = sorted(valid_proxies, key=lambda item: item["request_time"], reverse=False)
+        print("Get only HTTPS proxies")
+        sorted_proxies_by_speed_https = [proxy for proxy in sorted_proxies_by_speed if proxy["https_available"]]
+        if len(sorted_proxies_by_speed_https) == 0:
+            raise Exception("No proxy found!")
+        print(f"Got {len(sorted_proxies_by_speed_https)} HTTPS proxies")
+
+        print("Get the fastest HTTPS proxy and use it")
+        proxy_session = self._get_https_session(sorted_proxies_by_speed_https[0]["url"], trust_env=False)
+        return proxy_session
+
+
+class ProxyPool(object):
+    """ProxyPool class - long-lived pool of validated proxies scored by latency and error rate of real traffic."""
+
+    LATENCY_SMOOTHING = 0.2
+    MIN_REQUESTS_FOR_EVICTION = 5
+
+    def __init__(
+        self,
+        proxies: Optional[Proxies] = None,
+        max_error_rate: float = 0.5,
+        max_consecutive_errors: int = 3,
+        revalidate_interval_seconds: float = 300.0,
+        strategy: str = "weighted",
+        retries: int = RETRIES,
+    ) -> None:
+        """
+        Initializes a ProxyPool instance, the pool is empty until refresh or start is called.
+        :param proxies: Source of free proxies and their validation.
+        :param max_error_rate: Proxy is evicted when its error rate exceeds this value.
+        :param max_consecutive_errors: Proxy is evicted after this many errors in a row.
+        :param revalidate_interval_seconds: Period of background refresh of the pool.
+        :param strategy: Assignment of proxies to requests, either weighted (by score) or round-robin.
+        :param retries: Number of retries of requests sent through proxies, 0 when their sessions are wrapped
+                        by adaptive rate limiter, which retries throttled answers itself.
+        """
+        if strategy not in ("weighted", "round-robin"):
+            raise ValueError(f"Unknown proxy assignment strategy {strategy}")
+        # timeouts of validation are caused by slow proxies, only answers of the echo service slow it down
+        self.proxies = proxies or Proxies(
+            rate_limiter=AdaptiveRateLimiter(
+                requests_per_second=32.0, max_concurrency=Proxies.VALIDATION_WORKERS, errors_are_congestion=False
+            )
+        )
+        self.max_error_rate = max_error_rate
+        self.max_consecutive_errors = max_consecutive_errors
+        self.revalidate_interval_seconds = revalidate_interval_seconds
+        self.strategy = strategy
+        self.retries = retries
+        self._pool: Dict[str, Dict[str, Any]] = dict()
+        self._round_robin_position = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pool)
+
+    def refresh(self) -> int:
+        """
+        Download free proxies and validate them concurrently together with proxies already in the pool.
+        Valid HTTPS proxies are added, proxies of the pool which failed validation are evicted
+        and the remaining ones keep their statistics.
+        :return: Number of proxies in the pool.
+        """
+        proxies_data = self.proxies._get_free_proxies()
+        listed_urls = {proxy_data["url"] for proxy_data in proxies_data}
+        with self._lock:
+            for proxy_url in self._pool:
+                if proxy_url not in listed_urls:
+                    proxies_data.append({"url": proxy_url, "https_available": True})
+        valid_proxies = self.proxies._get_only_valid_proxies(proxies_data)
+        valid_urls = {proxy_data["url"] for proxy_data in valid_proxies}
+        with self._lock:
+            evicted = [self._pool.pop(proxy_url) for proxy_url in list(self._pool) if proxy_url not in valid_urls]
+            for proxy_data in valid_proxies:
+                if not proxy_data["https_available"] or proxy_data["url"] in self._pool:
+                    continue
+                session = self.proxies._get_https_session(proxy_data["url"], trust_env=False, retries=self.retries)
+                self._pool[proxy_data["url"]] = {
+                    "url": proxy_data["url"],
+                    "session": session,
+                    "latency": proxy_data["request_time"],
+                    "requests": 0,
+                    "errors": 0,
+                    "consecutive_errors": 0,
+                }
+            pool_size = len(self._pool)
+        for proxy in evicted:
+            proxy["session"].close()
+        print(f"Proxy pool contains {pool_size} proxies")
+        return pool_size
+
+    def start(self) -> None:
+        """
+        Fill the pool and keep refreshing it in a background thread.
+        """
+        self.refresh()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._revalidate_forever, name="proxy-pool", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def acquire(self) -> Optional[Dict[str, Any]]:
+        """
+        Choose proxy for the next request, the method is safe to call from several worker threads.
+        :return: Dictionary with url and session keys or None if the pool is empty.
+        """
+        with self._lock:
+            candidates = list(self._pool.values())
+            if not candidates:
+                return None
+            if self.strategy == "round-robin":
+                self._round_robin_position = (self._round_robin_position + 1) % len(candidates)
+                return candidates[self._round_robin_position]
+            weights = [1.0 / self.get_score(proxy) for proxy in candidates]
+        return random.choices(candidates, weights=weights)[0]
+
+    def report(self, proxy_url: str, success: bool, latency_seconds: Optional[float] = None) -> None:
+        """
+        Update statistics of proxy with the outcome of real request, failing proxies are evicted.
+        :param proxy_url: URL of used proxy.
+        :param success: False if the request through the proxy failed.
+        :param latency_seconds: Duration of successful request.
+        """
+        get_metrics().inc("proxy_requests_total", result="success" if success else "failure")
+        evicted = None
+        with self._lock:
+            proxy = self._pool.get(proxy_url)
+            if not proxy:
+                return
+            proxy["requests"] += 1
+            if success:
+                proxy["consecutive_errors"] = 0
+                if latency_seconds is not None:
+                    proxy["latency"] += self.LATENCY_SMOOTHING * (latency_seconds - proxy["latency"])
+                return
+            proxy["errors"] += 1
+            proxy["consecutive_errors"] += 1
+            error_rate = proxy["errors"] / proxy["requests"]
+            if proxy["consecutive_errors"] >= self.max_consecutive_errors or (
+                proxy["requests"] >= self.MIN_REQUESTS_FOR_EVICTION and error_rate > self.max_error_rate
+            ):
+                print(f"Evict proxy {proxy_url} with error rate {error_rate:.2f}")
+                get_metrics().inc("proxy_evictions_total")
+                evicted = self._pool.pop(proxy_url)
+        # connections of evicted proxy are closed, requests still running through it finish on their own connection
+        if evicted:
+            evicted["session"].close()
+
+    @staticmethod
+    def get_score(proxy: Dict[str, Any]) -> float:
+        """
+        Score of proxy, lower is better - smoothed latency penalized by error rate.
+        :param proxy: Proxy from the pool.
+        :return: Score of proxy.
+        """
+        success_rate = 1.0 - proxy["errors"] / proxy["requests"] if proxy["requests"] else 1.0
+        return max(proxy["latency"], 0.001) / max(success_rate, 0.05)
+
+    def _revalidate_forever(self) -> None:
+        while not self._stop_event.wait(self.revalidate_interval_seconds):
+            try:
+                self.refresh()
+            except Exception as error:
+                print(f"Refresh of proxy pool failed: {error!r}")
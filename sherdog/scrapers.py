@@ -0,0 +1,589 @@
+"""
+Crawl functions scraping fighters, organizations and events from Sherdog. Forked from https://github.com/Montanaz0r
+"""
+import cProfile
+import logging
+import pstats
+import sys
+import traceback
+
+from functools import partial
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from sherdog.checkpoint import CrawlLedger
+from sherdog.crawler import AdaptiveRateLimiter, Crawler, HostRateLimiter, TimedSession
+from sherdog.event import Event
+from sherdog.extractors import get_extractor
+from sherdog.fighter import Fighter
+from sherdog.http_session import RETRIES, RETRY_STATUSES, build_session, get_session
+from sherdog.incremental import find_new_events
+from sherdog.metrics import get_metrics
+from sherdog.organization import EVENTS_PER_PAGE, Organization
+from sherdog.page_store import PageStore
+from sherdog.probe import LivenessMap, probe_fighter, probe_organization
+from sherdog.proxy import Proxies, ProxyPool
+from sherdog.sinks import open_sink
+from sherdog.user_agent import get_user_agent
+
+import requests
+
+
+def get_crawl_indexes(
+    start_index: int, end_index: int, ledger: Optional[CrawlLedger] = None, shard: int = 0, shards: int = 1
+) -> List[int]:
+    """
+    Get indexes crawled by this process.
+    :param start_index: first index of the range
+    :param end_index: last index of the range (inclusive)
+    :param ledger: crawl ledger, indexes which were already finished are left out
+    :param shard: shard crawled by this process, from 0 to shards - 1
+    :param shards: number of shards the range is split to
+    :return: list of indexes in ascending order
+    """
+    if ledger:
+        return list(ledger.pending(start_index, end_index, shard=shard, shards=shards))
+    return list(range(start_index + (shard - start_index) % shards, end_index + 1, shards))
+
+
+def iterate_organization_pages(
+    organization_index: int, fetch: Callable[[str], Tuple[Optional[bytes], bool]], concurrency: int = 4
+) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """
+    Download and parse pages of organization's recent events. The first page tells whether the organization exists
+    and, by its pagination, how many pages it has; the remaining pages are downloaded concurrently and yielded in page
+    order as soon as they are parsed. Pages beyond the last known one are requested speculatively, at most
+    concurrency pages ahead, until a page which is not full is found.
+    :param organization_index: Sherdog index of organization
+    :param fetch: function downloading URL, it returns page content and whether the page changed since the last run
+    :param concurrency: number of requests in flight
+    :return: iterator of (page, page parsed by Organization.parse_page) tuples, the first page is None for
+             missing organization, parsed pages tell by their changed key whether the page changed since the last run
+    """
+    metrics = get_metrics()
+
+    def fetch_page(page: int) -> Optional[Dict[str, Any]]:
+        page_content, changed = fetch(Organization.get_url(organization_index, page))
+        with metrics.time("parse"):
+            # events of pages unchanged since the last run are not written again
+            parsed_page = Organization.parse_page(page_content, organization_index, with_events=changed)
+        if parsed_page is not None:
+            parsed_page["changed"] = changed
+        return parsed_page
+
+    first_page = fetch_page(1)
+    yield 1, first_page
+    if first_page is None or first_page["rows"] < EVENTS_PER_PAGE:
+        return
+    last_page = first_page["last_page"]
+    crawler = Crawler(fetch_page, concurrency=concurrency, prefetch=concurrency)
+    page = 2
+    while True:
+        # pagination may link only nearby pages, so at least concurrency pages are requested ahead
+        pages = range(page, max(page + crawler.concurrency, (last_page or 0) + 1))
+        crawl = crawler.crawl(pages)
+        try:
+            for page_number, parsed_page, error in crawl:
+                if error is not None:
+                    raise error
+                if parsed_page is None:
+                    # organization with exactly full pages ends with missing page
+                    return
+                yield page_number, parsed_page
+                if parsed_page["rows"] < EVENTS_PER_PAGE:
+                    return
+                if parsed_page["last_page"] is not None:
+                    last_page = max(last_page or 0, parsed_page["last_page"])
+        finally:
+            # pages requested beyond the last one are cancelled
+            crawl.close()
+        page = pages.stop
+
+
+def scrape_all_organizations(
+    organization_filename: str,
+    events_filename: str,
+    page_store: Optional[PageStore] = None,
+    start_index: int = 17000,
+    end_index: int = 20000,
+    ledger: Optional[CrawlLedger] = None,
+    shard: int = 0,
+    shards: int = 1,
+    liveness: Optional[LivenessMap] = None,
+    rate_limiter: Optional[AdaptiveRateLimiter] = None,
+    concurrency: int = 4,
+    requests_per_second: float = 0.0,
+    probe: bool = False,
+) -> None:
+    """
+    Scrapes all organizations and their recent events from Sherdog's database.
+    Pages of recent events of one organization are downloaded concurrently and their events are written
+    in page order as they arrive, so large organizations do not dominate the crawl time.
+    :param organization_filename: file where organizations are appended, format is given by extension
+    :param events_filename: file where events are appended, format is given by extension
+    :param page_store: archive of downloaded pages, events of pages unchanged since the last run are not written again
+    :param start_index: first scraped organization index
+    :param end_index: last scraped organization index (inclusive)
+    :param ledger: crawl ledger, organizations finished by previous runs are not scraped again
+    :param shard: shard scraped by this process, from 0 to shards - 1
+    :param shards: number of shards the index range is split to
+    :param liveness: bitmap of known live and dead organization indexes, dead ones are not requested at all
+    :param rate_limiter: adaptive rate limiter slowing the crawl down when sherdog.com throttles it,
+                         throttled organizations are retried instead of being skipped
+    :param concurrency: number of pages of one organization requested at once
+    :param requests_per_second: maximal number of requests sent to sherdog.com per second, 0 disables limiting
+    :param probe: probe indexes of unknown liveness with HEAD request before downloading them, requires liveness
+    :return: None
+    """
+    # throttled answers are retried by the rate limited session, so the limiter sees every one of them
+    session = rate_limiter.throttle(build_session(pool_size=concurrency, retries=0)) if rate_limiter else get_session()
+    host_rate_limiter = HostRateLimiter(requests_per_second)
+    organization_indexes = get_crawl_indexes(start_index, end_index, ledger, shard, shards)
+    if liveness:
+        organization_indexes = [index for index in organization_indexes if not liveness.is_dead(index)]
+    metrics = get_metrics()
+
+    def fetch(url: str, organization_index: int) -> Tuple[Optional[bytes], bool]:
+        host_rate_limiter.wait(url)
+        with metrics.time("download"):
+            if page_store:
+                page_content, changed = page_store.fetch(url, session)
+            else:
+                response = session.get(url)
+                if response.status_code in RETRY_STATUSES:
+                    # throttled answer is not a missing organization
+                    response.raise_for_status()
+                page_content, changed = response.content, True
+        metrics.record_page(len(page_content or b""))
+        return page_content, not skip_unchanged(ledger, organization_index, changed)
+
+    position = 0
+    fail_cnt = 0
+    with open_sink(organization_filename, "organizations") as organization_file:
+        with open_sink(events_filename, "events") as events_file:
+            check_resumable(ledger, organization_file, events_file)
+            # when downloading specific fighter fails more then 5 times interrupt scrapping
+            while (position < len(organization_indexes)) and (fail_cnt <= 900):
+                organization_index = organization_indexes[position]
+                try:
+                    if probe and liveness and liveness.get(organization_index) == LivenessMap.UNKNOWN:
+                        first_page_url = Organization.get_url(organization_index)
+                        host_rate_limiter.wait(first_page_url)
+                        if probe_organization(organization_index, first_page_url, session) == LivenessMap.DEAD:
+                            liveness.set_dead(organization_index)
+                            if ledger:
+                                ledger.mark_skipped(organization_index)
+                            position += 1
+                            continue
+                    invalid = True
+                    # organization row is written with its first page, so it is on disk when the page is unchanged
+                    first_page_changed = False
+                    pages = list()
+                    for page, parsed_page in iterate_organization_pages(
+                        organization_index, partial(fetch, organization_index=organization_index), concurrency
+                    ):
+                        pages.append(page)
+                        if parsed_page is None:
+                            break
+                        if page == 1:
+                            first_page_changed = parsed_page["changed"]
+                        invalid = False
+                        organization_fullname = parsed_page["fullname"]
+                        with metrics.time("serialize"):
+                            events_file.write(parsed_page["events"])
+                    if not invalid:
+                        if first_page_changed:
+                            # save fighter and fights to selected JSONs
+                            with metrics.time("serialize"):
+                                organization_file.write(
+                                    [{"organization_index": organization_index, "fullname": organization_fullname}]
+                                )
+                        print(f"Processed organization with the index = {organization_index}")
+                    for page in pages:
+                        page_url = Organization.get_url(organization_index, page)
+                        mark_extracted(page_store, page_url, organization_file, events_file)
+                    if liveness and invalid:
+                        liveness.set_dead(organization_index)
+                    elif liveness:
+                        liveness.set_live(organization_index)
+                    if ledger:
+                        # rows have to be on disk before the index is marked as finished
+                        organization_file.flush()
+                        events_file.flush()
+                        if invalid:
+                            ledger.mark_skipped(organization_index)
+                        else:
+                            ledger.mark_done(organization_index)
+                    position += 1
+                except Exception as error:
+                    print(
+                        f"Scrapping of document {organization_index} failed with the following message:\n{traceback.format_exc()}"
+                    )
+                    metrics.record_error(error, "organization")
+                    if ledger:
+                        ledger.mark_failed(organization_index, traceback.format_exc())
+                    # find different working proxy
+                    proxy_session = None
+                    # rate limiter already slowed down, so throttled organization is tried again
+                    throttled = rate_limiter is not None and isinstance(error, requests.HTTPError)
+                    if fail_cnt % 3 == 0 and not throttled:
+                        print(f"Skip fighter with index {organization_index}")
+                        position += 1
+                    fail_cnt += 1
+    if liveness:
+        liveness.save()
+
+
+def scrape_all_fighters(
+    scrape_fighters_cnt: int,
+    fighters_filename: str,
+    fights_filename: str,
+    start_index: int = 472993,
+    end_index: int = 500000,
+    ledger: Optional[CrawlLedger] = None,
+    shard: int = 0,
+    shards: int = 1,
+) -> None:
+    """
+    Scrapes information about all fighters in Sherdog's database and saves them into csv or json file.
+    :param filetype: string with either 'csv' or 'json' as a type of file where results will be stored
+    :param start_index: first scraped fighter index
+    :param end_index: last scraped fighter index (inclusive)
+    :param ledger: crawl ledger, fighters finished by previous runs are not scraped again
+    :param shard: shard scraped by this process, from 0 to shards - 1
+    :param shards: number of shards the index range is split to
+    :return: None
+    """
+    # proxies = Proxies()
+    # proxy_session = proxies.get_proxy()
+    proxy_session = None
+    fighter_indexes = get_crawl_indexes(start_index, end_index, ledger, shard, shards)
+    metrics = get_metrics()
+    position = 0
+    fail_cnt = 0
+    with open_sink(fighters_filename, "fighters") as fighter_file:
+        with open_sink(fights_filename, "fights") as fights_file:
+            check_resumable(ledger, fighter_file, fights_file)
+            # when downloading specific fighter fails more then 5 times interrupt scrapping
+            while (position < len(fighter_indexes)) and (fail_cnt <= 900):
+                fighter_index = fighter_indexes[position]
+                try:
+                    # get fighter on a given index
+                    fighter_obj = Fighter(proxy_session=proxy_session, fighter_index=fighter_index, download=True)
+                    if fighter_obj.valid:
+                        # save fighter and fights to selected JSONs
+                        with metrics.time("serialize"):
+                            fighter_file.write([fighter_obj.to_dict()])
+                            fights_file.write(fight.to_dict() for fight in fighter_obj.fights)
+                    if ledger:
+                        mark_fighter_finished(ledger, fighter_obj, fighter_file, fights_file)
+                    fail_cnt = 0
+                    position += 1
+                    print(f"Processed fighter with the index = {fighter_index}")
+                except Exception as error:
+                    print(
+                        f"Scrapping of document {fighter_index} failed with the following message:\n{traceback.format_exc()}"
+                    )
+                    metrics.record_error(error, "fighter")
+                    if ledger:
+                        ledger.mark_failed(fighter_index, traceback.format_exc())
+                    # find different working proxy
+                    proxy_session = None
+                    if fail_cnt % 3 == 0:
+                        print(f"Skip fighter with index {fighter_index}")
+                        position += 1
+                    fail_cnt += 1
+
+
+def check_resumable(ledger: Optional[CrawlLedger], *sinks: Any) -> None:
+    """
+    Crawl ledger marks indexes as finished only when their rows are on disk, so all outputs have to be appendable.
+    :param ledger: crawl ledger or None
+    :param sinks: opened output sinks
+    :return: None
+    """
+    if ledger and not all(sink.resumable for sink in sinks):
+        raise ValueError("Crawl with ledger has to write JSONL, CSV or sqlite output, convert it to Parquet afterwards")
+
+
+def skip_unchanged(ledger: Optional[CrawlLedger], index: int, changed: bool) -> bool:
+    """
+    Decide whether a page unchanged since the last run is skipped. Page store reports a page as unchanged only when
+    its rows were written before, with a crawl ledger the index has to be done as well, otherwise the stored page is
+    extracted again (e.g. the previous run failed to extract it or wrote its rows to a different output).
+    :param ledger: crawl ledger or None
+    :param index: index of the page
+    :param changed: flag returned by PageStore.fetch
+    :return: True if the page does not have to be extracted
+    """
+    if changed:
+        return False
+    if not ledger:
+        return True
+    state = ledger.get_state(index)
+    return state is not None and state["state"] == CrawlLedger.DONE
+
+
+def mark_extracted(page_store: Optional[PageStore], url: str, *sinks: Any) -> None:
+    """
+    Record in page archive that rows of a page are on disk, so the page is skipped by later runs while it is unchanged.
+    Outputs which are not resumable (Parquet) are rewritten by every run, their pages are always extracted again.
+    :param page_store: archive of downloaded pages or None
+    :param url: URL of the page
+    :param sinks: opened output sinks the rows were written to
+    :return: None
+    """
+    if not page_store or not all(sink.resumable for sink in sinks):
+        return
+    for sink in sinks:
+        sink.flush()
+    page_store.mark_extracted(url)
+
+
+def mark_fighter_finished(ledger: CrawlLedger, fighter_obj: Fighter, fighter_file: Any, fights_file: Any) -> None:
+    """
+    Record scraped fighter in crawl ledger, rows have to be on disk before the index is marked as finished.
+    :param ledger: crawl ledger
+    :param fighter_obj: scraped fighter
+    :param fighter_file: opened fighters sink
+    :param fights_file: opened fights sink
+    :return: None
+    """
+    fighter_file.flush()
+    fights_file.flush()
+    if fighter_obj.valid:
+        ledger.mark_done(fighter_obj.fighter_index)
+    else:
+        ledger.mark_skipped(fighter_obj.fighter_index)
+
+
+def scrape_all_fighters_concurrently(
+    fighters_filename: str,
+    fights_filename: str,
+    start_index: int = 472993,
+    end_index: int = 500000,
+    concurrency: int = 8,
+    requests_per_second: float = 4.0,
+    page_store: Optional[PageStore] = None,
+    backend: str = "soup",
+    ledger: Optional[CrawlLedger] = None,
+    shard: int = 0,
+    shards: int = 1,
+    proxy_pool: Optional[ProxyPool] = None,
+    http2: bool = False,
+    liveness: Optional[LivenessMap] = None,
+    probe: bool = False,
+    adaptive: bool = False,
+) -> None:
+    """
+    Scrapes information about all fighters in Sherdog's database with several downloads in flight.
+    Pages are downloaded by worker threads and parsed in the calling thread in index order,
+    so fighters and fights are written in the same order as by scrape_all_fighters.
+    :param fighters_filename: file where fighters are appended, format is given by extension (.jsonl, .csv, .parquet)
+    :param fights_filename: file where fights are appended, format is given by extension (.jsonl, .csv, .parquet)
+    :param start_index: first scraped fighter index
+    :param end_index: last scraped fighter index (inclusive)
+    :param concurrency: number of requests in flight
+    :param requests_per_second: maximal number of requests sent to sherdog.com per second, 0 disables limiting
+    :param page_store: archive of downloaded pages, pages unchanged since the last run are skipped
+    :param backend: extraction backend used for parsing pages (soup, strainer or lxml)
+    :param ledger: crawl ledger, fighters finished by previous runs are not scraped again
+    :param shard: shard scraped by this process, from 0 to shards - 1
+    :param shards: number of shards the index range is split to
+    :param proxy_pool: pool of proxies shared by download workers, requests are sent directly if not set
+    :param http2: send direct requests over HTTP/2, requires httpx package
+    :param liveness: bitmap of known live and dead fighter indexes, dead ones are not requested at all
+    :param probe: probe indexes of unknown liveness with HEAD request before downloading them, requires liveness
+    :param adaptive: adapt rate and concurrency to 429/5xx answers, Retry-After headers and latency,
+                     requests_per_second is used as the initial rate then
+    :return: None
+    """
+    # keep-alive connection pool sized for all download workers
+    # throttled answers are retried by the rate limited session, so the limiter sees every one of them
+    direct_session = build_session(pool_size=concurrency, retries=0 if adaptive else RETRIES, http2=http2)
+    adaptive_limiter = None
+    if adaptive:
+        adaptive_limiter = AdaptiveRateLimiter(requests_per_second or 4.0, max_concurrency=concurrency)
+        direct_session = adaptive_limiter.throttle(direct_session)
+    rate_limiter = HostRateLimiter(0.0 if adaptive else requests_per_second)
+    extractor = get_extractor(backend)
+    metrics = get_metrics()
+
+    def download(fighter_index: int, session: Optional[Any]) -> Tuple[Optional[bytes], bool]:
+        if probe and liveness and liveness.get(fighter_index) == LivenessMap.UNKNOWN:
+            if probe_fighter(fighter_index, Fighter.get_url(fighter_index), session) == LivenessMap.DEAD:
+                liveness.set_dead(fighter_index)
+                return None, True
+        if page_store:
+            return page_store.fetch(Fighter.get_url(fighter_index), session, headers={"User-Agent": get_user_agent()})
+        return Fighter.download_page(fighter_index, proxy_session=session), True
+
+    def download_through_proxy(
+        fighter_index: int, proxy: Dict[str, Any], proxy_pool: ProxyPool
+    ) -> Tuple[Optional[bytes], bool]:
+        # proxy latency counts only requests, not the wait of adaptive rate limiter
+        timed_session = TimedSession(proxy["session"])
+        try:
+            fetched = download(
+                fighter_index, adaptive_limiter.throttle(timed_session) if adaptive_limiter else timed_session
+            )
+        except Exception:
+            proxy_pool.report(proxy["url"], success=False)
+            raise
+        proxy_pool.report(proxy["url"], success=True, latency_seconds=timed_session.elapsed_seconds)
+        return fetched
+
+    def fetch(fighter_index: int) -> Tuple[Optional[bytes], bool]:
+        rate_limiter.wait(Fighter.get_url(fighter_index))
+        # requests go directly once all proxies of the pool were evicted
+        proxy = proxy_pool.acquire() if proxy_pool else None
+        with metrics.time("download"):
+            if proxy and proxy_pool:
+                fetched = download_through_proxy(fighter_index, proxy, proxy_pool)
+            else:
+                fetched = download(fighter_index, direct_session)
+        metrics.record_page(len(fetched[0] or b""))
+        return fetched
+
+    crawler = Crawler(fetch, concurrency=concurrency)
+    with open_sink(fighters_filename, "fighters") as fighter_file:
+        with open_sink(fights_filename, "fights") as fights_file:
+            check_resumable(ledger, fighter_file, fights_file)
+            fighter_indexes = get_crawl_indexes(start_index, end_index, ledger, shard, shards)
+            if liveness:
+                fighter_indexes = [index for index in fighter_indexes if not liveness.is_dead(index)]
+            for fighter_index, fetched, download_error in crawler.crawl(fighter_indexes):
+                if download_error is not None:
+                    print(
+                        f"Download of document {fighter_index} failed with the following message:\n{download_error!r}"
+                    )
+                    logging.error(f"Download of fighter {fighter_index} failed: {download_error!r}")
+                    metrics.record_error(download_error, "download")
+                    if ledger:
+                        ledger.mark_failed(fighter_index, repr(download_error))
+                    continue
+                page_content, changed = fetched
+                if page_content is None:
+                    # missing page, the most common dead index
+                    if liveness:
+                        liveness.set_dead(fighter_index)
+                    if ledger:
+                        ledger.mark_skipped(fighter_index)
+                    continue
+                if skip_unchanged(ledger, fighter_index, changed):
+                    # unchanged page was already written by a previous run
+                    continue
+                try:
+                    fighter_obj = extractor.extract(page_content, fighter_index)
+                    if fighter_obj.valid:
+                        with metrics.time("serialize"):
+                            fighter_file.write([fighter_obj.to_dict()])
+                            fights_file.write(fight.to_dict() for fight in fighter_obj.fights)
+                    if ledger:
+                        mark_fighter_finished(ledger, fighter_obj, fighter_file, fights_file)
+                    mark_extracted(page_store, Fighter.get_url(fighter_index), fighter_file, fights_file)
+                    if liveness and fighter_obj.valid:
+                        liveness.set_live(fighter_index)
+                    elif liveness:
+                        liveness.set_dead(fighter_index)
+                    print(f"Processed fighter with the index = {fighter_index}")
+                except Exception as error:
+                    print(
+                        f"Scrapping of document {fighter_index} failed with the following message:\n{traceback.format_exc()}"
+                    )
+                    metrics.record_error(error, "extract")
+                    if ledger:
+                        ledger.mark_failed(fighter_index, traceback.format_exc())
+    if liveness:
+        liveness.save()
+
+
+def scrape_all_events(
+    events_filename: str,
+    fights_filename: str,
+    since: Optional[str] = None,
+    concurrency: int = 8,
+    requests_per_second: float = 4.0,
+    page_store: Optional[PageStore] = None,
+    ledger: Optional[CrawlLedger] = None,
+) -> None:
+    """
+    Scrapes whole fight cards of events written by scrape_all_organizations, every bout is downloaded once
+    (instead of once from each fighter's page) and its weight class and title fight are filled.
+    :param events_filename: JSONL file with events written by scrape_all_organizations
+    :param fights_filename: file where fights are appended, format is given by extension (.jsonl, .csv, .parquet)
+    :param since: ISO date (YYYY-MM-DD), only later events are scraped, all past events if not set
+    :param concurrency: number of requests in flight
+    :param requests_per_second: maximal number of requests sent to sherdog.com per second, 0 disables limiting
+    :param page_store: archive of downloaded pages, events unchanged since the last run are skipped
+    :param ledger: crawl ledger of events kind, events finished by previous runs are not scraped again
+    :return: None
+    """
+    events = find_new_events(events_filename, since)
+    if ledger:
+        pending_indexes = set(ledger.filter_pending(event["event_index"] for event in events))
+        events = [event for event in events if event["event_index"] in pending_indexes]
+    print(f"Scraping {len(events)} events")
+    session = build_session(pool_size=concurrency)
+    rate_limiter = HostRateLimiter(requests_per_second)
+    metrics = get_metrics()
+
+    def fetch(position: int) -> Tuple[Optional[bytes], bool]:
+        url = Event.get_url(events[position]["url"])
+        rate_limiter.wait(url)
+        with metrics.time("download"):
+            if page_store:
+                fetched = page_store.fetch(url, session, headers={"User-Agent": get_user_agent()})
+            else:
+                fetched = Event.download_page(url, session), True
+        metrics.record_page(len(fetched[0] or b""))
+        return fetched
+
+    crawler = Crawler(fetch, concurrency=concurrency)
+    with open_sink(fights_filename, "fights") as fights_file:
+        check_resumable(ledger, fights_file)
+        for position, fetched, download_error in crawler.crawl(range(len(events))):
+            event_index = events[position]["event_index"]
+            if download_error is not None:
+                print(f"Download of event {event_index} failed with the following message:\n{download_error!r}")
+                metrics.record_error(download_error, "download")
+                if ledger:
+                    ledger.mark_failed(event_index, repr(download_error))
+                continue
+            page_content, changed = fetched
+            if page_content is None:
+                if ledger:
+                    ledger.mark_skipped(event_index)
+                continue
+            if skip_unchanged(ledger, event_index, changed):
+                # unchanged card was already written by a previous run
+                continue
+            try:
+                with metrics.time("extract"):
+                    fights = Event.get_fights(page_content, events[position]["url"])
+                with metrics.time("serialize"):
+                    fights_file.write(fight.to_dict() for fight in fights)
+                if ledger:
+                    fights_file.flush()
+                    ledger.mark_done(event_index)
+                mark_extracted(page_store, Event.get_url(events[position]["url"]), fights_file)
+                print(f"Processed event with the index = {event_index}, {len(fights)} fights")
+            except Exception as error:
+                print(f"Scrapping of event {event_index} failed with the following message:\n{traceback.format_exc()}")
+                metrics.record_error(error, "extract")
+                if ledger:
+                    ledger.mark_failed(event_index, traceback.format_exc())
+
+
+def run_profiled(profile_filename: str, function: Any, *args: Any, **kwargs: Any) -> Any:
+    """
+    Run crawl under cProfile, stats are saved for snakeviz or pstats and the hottest functions are printed.
+    :param profile_filename: file where profile stats are saved
+    :param function: crawl function
+    :return: return value of the crawl function
+    """
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function, *args, **kwargs)
+    finally:
+        profiler.dump_stats(profile_filename)
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats("cumulative").print_stats(30)
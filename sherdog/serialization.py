@@ -0,0 +1,63 @@
+"""
+Fast JSON lines serialization of scraped rows. orjson is used when installed, otherwise the standard json module.
+"""
+import io
+import json
+
+from types import ModuleType
+from typing import Any, Dict, Iterable, Optional
+
+orjson: Optional[ModuleType]
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(row: Dict[str, Optional[Any]]) -> bytes:
+    """
+    Serialize one row to JSON.
+    :param row: Dictionary returned by to_dict method.
+    :return: UTF-8 encoded JSON.
+    """
+    if orjson is not None:
+        return orjson.dumps(row)
+    return json.dumps(row).encode("utf-8")
+
+
+def loads(line: bytes) -> Any:
+    """
+    Deserialize one JSON line.
+    :param line: UTF-8 encoded JSON.
+    :return: Deserialized row.
+    """
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+def to_jsonl(rows: Iterable[Dict[str, Optional[Any]]]) -> bytes:
+    """
+    Serialize rows to JSON lines in one buffer, so they can be written by a single write call.
+    :param rows: Dictionaries returned by to_dict method.
+    :return: UTF-8 encoded JSON lines, each terminated by a new line.
+    """
+    if orjson is not None:
+        option = orjson.OPT_APPEND_NEWLINE
+        return b"".join(orjson.dumps(row, option=option) for row in rows)
+    return "".join(json.dumps(row) + "\n" for row in rows).encode("utf-8")
+
+
+def write_jsonl(file: Any, rows: Iterable[Dict[str, Optional[Any]]]) -> None:
+    """
+    Append rows to opened JSON lines file.
+    :param file: File opened either in text or in binary mode.
+    :param rows: Dictionaries returned by to_dict method.
+    """
+    data = to_jsonl(rows)
+    if not data:
+        return
+    if isinstance(file, io.TextIOBase):
+        file.write(data.decode("utf-8"))
+    else:
+        file.write(data)
@@ -0,0 +1,446 @@
+"""
+Multi-process crawl runner. Index range is split to chunks kept in a sqlite work queue, worker processes lease
+chunks from the queue, crawl them with the threaded crawl of scrapers module and write every chunk to its own
+output shard. Parsing with BeautifulSoup holds the GIL, so one process uses one core no matter how many
+downloads are in flight - workers spread parsing over all cores, or over more machines sharing the queue file.
+Merge step joins the shards in index order to the final JSONL, CSV or Parquet files.
+
+python -m sherdog.sharded_crawl fighters 1 500000 --workers 8 --output data/fighters.parquet data/fights.parquet
+"""
+import argparse
+import contextlib
+import glob
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sherdog.checkpoint import CrawlLedger
+from sherdog.serialization import loads
+from sherdog.sinks import open_sink
+from sherdog.user_agent import configure_user_agents, get_user_agent
+
+# outputs of crawl kinds as (crawl function argument, kind of rows) pairs
+OUTPUTS: Dict[str, List[Tuple[str, str]]] = {
+    "fighters": [("fighters_filename", "fighters"), ("fights_filename", "fights")],
+    "organizations": [("organization_filename", "organizations"), ("events_filename", "events")],
+}
+# lease of a chunk is renewed by its worker while the chunk is crawled, so it expires only for a dead worker
+LEASE_SECONDS = 300.0
+
+
+class WorkQueue(object):
+    """WorkQueue class - sqlite queue of index chunks leased by crawl workers of one or more machines."""
+
+    PENDING = "pending"
+    LEASED = "leased"
+    DONE = "done"
+
+    def __init__(self, path: str = "data/work_queue.sqlite", kind: str = "fighters") -> None:
+        """
+        Initializes a WorkQueue instance, creates the sqlite database if it does not exist.
+        :param path: Path to the sqlite database, it has to be on a file system with working locks when shared.
+        :param kind: Kind of crawled pages (fighters or organizations).
+        """
+        self.path = path
+        self.kind = kind
+        # transactions are opened explicitly, so leasing a chunk is atomic across processes
+        self._connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS chunks (
+                kind TEXT NOT NULL,
+                start_index INTEGER NOT NULL,
+                end_index INTEGER NOT NULL,
+                state TEXT NOT NULL,
+                worker TEXT,
+                leased_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (kind, start_index)
+            )
+            """
+        )
+
+    def enqueue_range(self, start_index: int, end_index: int, chunk_size: int = 1000) -> int:
+        """
+        Split index range to chunks and add them to the queue, already known chunks are kept as they are.
+        :param start_index: First index of the range.
+        :param end_index: Last index of the range (inclusive).
+        :param chunk_size: Number of indexes of one chunk.
+        :return: Number of added chunks.
+        """
+        chunks = [
+            (self.kind, chunk_start, min(chunk_start + chunk_size - 1, end_index), self.PENDING)
+            for chunk_start in range(start_index, end_index + 1, chunk_size)
+        ]
+        cursor = self._connection.executemany(
+            "INSERT OR IGNORE INTO chunks (kind, start_index, end_index, state) VALUES (?, ?, ?, ?)", chunks
+        )
+        return cursor.rowcount
+
+    def lease(self, worker: str, lease_seconds: float = LEASE_SECONDS) -> Optional[Tuple[int, int]]:
+        """
+        Lease the lowest pending chunk, chunks of crashed workers are leased again when their lease expires.
+        :param worker: Identifier of the worker.
+        :param lease_seconds: Time the chunk is reserved for the worker unless the lease is renewed.
+        :return: Tuple with first and last index of the chunk or None if there is no work left.
+        """
+        now = time.time()
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = self._connection.execute(
+                """
+                SELECT start_index, end_index FROM chunks
+                WHERE kind = ? AND (state = ? OR (state = ? AND leased_until < ?))
+                ORDER BY start_index LIMIT 1
+                """,
+                (self.kind, self.PENDING, self.LEASED, now),
+            ).fetchone()
+            if row:
+                self._connection.execute(
+                    """
+                    UPDATE chunks SET state = ?, worker = ?, leased_until = ?, attempts = attempts + 1
+                    WHERE kind = ? AND start_index = ?
+                    """,
+                    (self.LEASED, worker, now + lease_seconds, self.kind, row[0]),
+                )
+            self._connection.execute("COMMIT")
+        except Exception:
+            self._connection.execute("ROLLBACK")
+            raise
+        return (row[0], row[1]) if row else None
+
+    def renew(self, start_index: int, worker: str, lease_seconds: float = LEASE_SECONDS) -> bool:
+        """
+        Extend lease of a chunk which is still being crawled.
+        :param start_index: First index of the chunk.
+        :param worker: Identifier of the worker holding the lease.
+        :param lease_seconds: Time the chunk is reserved for the worker from now.
+        :return: False if the worker does not hold the lease anymore, e.g. it expired and the chunk was leased again.
+        """
+        cursor = self._connection.execute(
+            "UPDATE chunks SET leased_until = ? WHERE kind = ? AND start_index = ? AND state = ? AND worker = ?",
+            (time.time() + lease_seconds, self.kind, start_index, self.LEASED, worker),
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, start_index: int, worker: str) -> bool:
+        return self._set_state(start_index, worker, self.DONE)
+
+    def release(self, start_index: int, worker: str) -> bool:
+        # chunk of a failed worker is returned to the queue right away
+        return self._set_state(start_index, worker, self.PENDING)
+
+    def _set_state(self, start_index: int, worker: str, state: str) -> bool:
+        # stale worker whose chunk was leased again by another one must not change its state
+        cursor = self._connection.execute(
+            """
+            UPDATE chunks SET state = ?, leased_until = NULL
+            WHERE kind = ? AND start_index = ? AND state = ? AND worker = ?
+            """,
+            (state, self.kind, start_index, self.LEASED, worker),
+        )
+        return cursor.rowcount == 1
+
+    def get_chunks(self) -> List[Tuple[int, int, str]]:
+        """
+        Get all chunks of the queue kind.
+        :return: List of (first index, last index, state) tuples ordered by first index.
+        """
+        return self._connection.execute(
+            "SELECT start_index, end_index, state FROM chunks WHERE kind = ? ORDER BY start_index", (self.kind,)
+        ).fetchall()
+
+    def summary(self) -> Dict[str, int]:
+        counts = {self.PENDING: 0, self.LEASED: 0, self.DONE: 0}
+        for _, _, state in self.get_chunks():
+            counts[state] += 1
+        return counts
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+def get_shard_path(output_directory: str, name: str, start_index: int, end_index: int) -> str:
+    """
+    Get path of output shard of a chunk, shard of re-leased chunk is appended to by the next worker.
+    :param output_directory: Directory with shards.
+    :param name: Kind of rows written to the shard (e.g. fights).
+    :param start_index: First index of the chunk.
+    :param end_index: Last index of the chunk.
+    :return: Path to JSONL shard.
+    """
+    return os.path.join(output_directory, name, f"{start_index:09d}-{end_index:09d}.jsonl")
+
+
+@contextlib.contextmanager
+def renewed_lease(
+    queue_path: str, kind: str, worker: str, start_index: int, lease_seconds: float = LEASE_SECONDS
+) -> Iterator[None]:
+    """
+    Keep renewing lease of a chunk from a background thread until the block ends, so a chunk crawled for longer
+    than the lease is not leased again by another worker.
+    :param queue_path: Path to the sqlite work queue.
+    :param kind: Kind of crawled pages (fighters or organizations).
+    :param worker: Identifier of the worker holding the lease.
+    :param start_index: First index of the leased chunk.
+    :param lease_seconds: Duration of the lease, it is renewed three times per its duration.
+    """
+    stop_event = threading.Event()
+
+    def renew_forever() -> None:
+        # sqlite connection cannot be shared with the crawling thread
+        queue = WorkQueue(queue_path, kind)
+        try:
+            while not stop_event.wait(lease_seconds / 3):
+                if not queue.renew(start_index, worker, lease_seconds):
+                    logging.warning(f"Worker {worker} lost lease of {kind} chunk starting at {start_index}")
+                    return
+        finally:
+            queue.close()
+
+    thread = threading.Thread(target=renew_forever, name=f"lease-{start_index}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop_event.set()
+        thread.join()
+
+
+def run_worker(
+    kind: str,
+    worker: str,
+    queue_path: str,
+    ledger_path: str,
+    output_directory: str,
+    crawl_kwargs: Optional[Dict[str, Any]] = None,
+    quiet: bool = True,
+    lease_seconds: float = LEASE_SECONDS,
+    user_agents: Optional[Dict[str, Any]] = None,
+) -> int:
+    """
+    Crawl chunks leased from the work queue until it is empty.
+    :param kind: Kind of crawled pages (fighters or organizations).
+    :param worker: Identifier of the worker.
+    :param queue_path: Path to the sqlite work queue.
+    :param ledger_path: Path to the crawl ledger shared by all workers, partially crawled chunks are resumed.
+    :param output_directory: Directory where output shards are written.
+    :param crawl_kwargs: Additional arguments of the crawl function (e.g. concurrency, backend).
+    :param quiet: Do not print progress of every crawled index.
+    :param lease_seconds: Duration of chunk leases, they are renewed while the worker crawls the chunk.
+    :param user_agents: Arguments of configure_user_agents (e.g. rotation, cache_path) applied in the worker.
+    :return: Number of crawled chunks.
+    """
+    if user_agents:
+        configure_user_agents(**user_agents)
+    # crawl functions are imported in the worker process only
+    from sherdog.scrapers import scrape_all_fighters_concurrently, scrape_all_organizations
+
+    crawl_function = scrape_all_fighters_concurrently if kind == "fighters" else scrape_all_organizations
+    queue = WorkQueue(queue_path, kind)
+    ledger = CrawlLedger(ledger_path, kind)
+    crawled_chunks = 0
+    with open(os.devnull, "w") as devnull:
+        while True:
+            chunk = queue.lease(worker, lease_seconds)
+            if chunk is None:
+                break
+            start_index, end_index = chunk
+            outputs: Dict[str, Any] = dict()
+            for argument, name in OUTPUTS[kind]:
+                outputs[argument] = get_shard_path(output_directory, name, start_index, end_index)
+                os.makedirs(os.path.dirname(outputs[argument]), exist_ok=True)
+            try:
+                with renewed_lease(queue_path, kind, worker, start_index, lease_seconds):
+                    with contextlib.redirect_stdout(devnull) if quiet else contextlib.nullcontext():
+                        crawl_function(
+                            start_index=start_index,
+                            end_index=end_index,
+                            ledger=ledger,
+                            **outputs,
+                            **(crawl_kwargs or {}),
+                        )
+            except Exception:
+                queue.release(start_index, worker)
+                raise
+            if not queue.complete(start_index, worker):
+                print(f"Worker {worker} lost lease of {kind} {start_index}-{end_index}, it is kept by another worker")
+                continue
+            crawled_chunks += 1
+            print(f"Worker {worker} crawled {kind} {start_index}-{end_index}")
+    ledger.close()
+    queue.close()
+    return crawled_chunks
+
+
+def merge_shards(output_directory: str, name: str, target_path: str, batch_size: int = 10000) -> int:
+    """
+    Join output shards in index order to one file, format is given by its extension (.jsonl, .csv or .parquet).
+    :param output_directory: Directory with shards.
+    :param name: Kind of rows (fighters, fights, organizations or events).
+    :param target_path: Output file.
+    :param batch_size: Number of rows passed to the sink at once.
+    :return: Number of merged rows.
+    """
+    shard_paths = sorted(glob.glob(os.path.join(output_directory, name, "*.jsonl")))
+    merged = 0
+    if target_path.endswith((".jsonl", ".json")):
+        # JSON lines shards are copied without parsing
+        with open(target_path, "wb") as target_file:
+            for shard_path in shard_paths:
+                with open(shard_path, "rb") as shard_file:
+                    for line in shard_file:
+                        if line.strip():
+                            target_file.write(line if line.endswith(b"\n") else line + b"\n")
+                            merged += 1
+        return merged
+    if os.path.exists(target_path):
+        os.remove(target_path)
+    with open_sink(target_path, name) as sink:
+        batch = list()
+        for shard_path in shard_paths:
+            with open(shard_path, "rb") as shard_file:
+                for line in shard_file:
+                    if not line.strip():
+                        continue
+                    batch.append(loads(line))
+                    if len(batch) >= batch_size:
+                        sink.write(batch)
+                        merged += len(batch)
+                        batch = list()
+        sink.write(batch)
+        merged += len(batch)
+    return merged
+
+
+def split_crawl_kwargs(crawl_kwargs: Dict[str, Any], workers: int) -> Dict[str, Any]:
+    """
+    Split rate limit and concurrency of the whole crawl among workers, sherdog.com sees requests of all of them.
+    :param crawl_kwargs: Arguments of the crawl function, requests_per_second is 4 and concurrency 8 if not given.
+    :param workers: Number of worker processes.
+    :return: Arguments of the crawl function of one worker.
+    """
+    worker_kwargs = dict(crawl_kwargs)
+    worker_kwargs["requests_per_second"] = crawl_kwargs.get("requests_per_second", 4.0) / workers
+    worker_kwargs["concurrency"] = max(1, crawl_kwargs.get("concurrency", 8) // workers)
+    return worker_kwargs
+
+
+def run_sharded_crawl(
+    kind: str,
+    start_index: int,
+    end_index: int,
+    targets: List[str],
+    workers: Optional[int] = None,
+    chunk_size: int = 1000,
+    work_directory: str = "data/sharded",
+    crawl_kwargs: Optional[Dict[str, Any]] = None,
+    user_agents: Optional[Dict[str, Any]] = None,
+) -> Dict[str, int]:
+    """
+    Crawl index range with several worker processes and merge their shards. Interrupted crawl is resumed
+    by running it again with the same work directory.
+    :param kind: Kind of crawled pages (fighters or organizations).
+    :param start_index: First index of the range.
+    :param end_index: Last index of the range (inclusive).
+    :param targets: Final output files, fighters and fights or organizations and events.
+    :param workers: Number of worker processes, number of cores by default.
+    :param chunk_size: Number of indexes leased by a worker at once.
+    :param work_directory: Directory with the work queue, the crawl ledger and output shards.
+    :param crawl_kwargs: Additional arguments of the crawl function, rate limit and concurrency are split
+                         among workers.
+    :param user_agents: Arguments of configure_user_agents (e.g. rotation, cache_path) applied in all workers.
+    :return: Dictionary with number of merged rows per output.
+    """
+    if kind not in OUTPUTS:
+        raise ValueError(f"Unknown crawl kind {kind}, choose one of {sorted(OUTPUTS)}")
+    if len(targets) != len(OUTPUTS[kind]):
+        raise ValueError(f"Crawl of {kind} writes {len(OUTPUTS[kind])} outputs, got {len(targets)} targets")
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(work_directory, exist_ok=True)
+    queue_path = os.path.join(work_directory, "work_queue.sqlite")
+    ledger_path = os.path.join(work_directory, "crawl.sqlite")
+    queue = WorkQueue(queue_path, kind)
+    queue.enqueue_range(start_index, end_index, chunk_size)
+
+    worker_kwargs = split_crawl_kwargs(crawl_kwargs or dict(), workers)
+    if user_agents and user_agents.get("cache_path"):
+        # user agents are loaded and cached once here, spawned workers only read the cache
+        configure_user_agents(**user_agents)
+        get_user_agent()
+    context = multiprocessing.get_context("spawn")
+    processes = [
+        context.Process(
+            target=run_worker,
+            args=(kind, f"{socket.gethostname()}-{os.getpid()}-{worker}", queue_path, ledger_path, work_directory),
+            kwargs={"crawl_kwargs": worker_kwargs, "user_agents": user_agents},
+        )
+        for worker in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    print(f"Work queue of {kind}: {queue.summary()}")
+    queue.close()
+    return {
+        name: merge_shards(work_directory, name, target_path)
+        for (_, name), target_path in zip(OUTPUTS[kind], targets)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crawl Sherdog with several worker processes.")
+    parser.add_argument("kind", choices=sorted(OUTPUTS))
+    parser.add_argument("start_index", type=int)
+    parser.add_argument("end_index", type=int)
+    parser.add_argument("--output", nargs=2, required=True, metavar="FILE", help="fighters and fights files "
+                        "or organizations and events files (.jsonl, .csv or .parquet)")
+    parser.add_argument("--workers", type=int, help="number of worker processes, number of cores by default")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--work-directory", default="data/sharded")
+    parser.add_argument("--concurrency", type=int, default=8, help="requests in flight shared by all workers")
+    parser.add_argument("--requests-per-second", type=float, default=4.0, help="rate limit shared by all workers")
+    parser.add_argument("--backend", default="soup", choices=["soup", "strainer", "lxml"])
+    parser.add_argument("--user-agent-cache", default="data/user_agents.json", metavar="FILE",
+                        help="JSON cache of user agents shared by workers, empty string disables it")
+    parser.add_argument("--user-agent-rotation", default="random", choices=["random", "round-robin", "fixed"])
+    parser.add_argument("--worker-only", action="store_true", help="only crawl chunks of an existing work queue, "
+                        "used to add workers of other machines sharing the work directory, "
+                        "--concurrency and --requests-per-second then apply to this worker alone")
+    args = parser.parse_args()
+
+    kwargs: Dict[str, Any] = {"concurrency": args.concurrency, "requests_per_second": args.requests_per_second}
+    if args.kind == "fighters":
+        kwargs["backend"] = args.backend
+    user_agents = {"rotation": args.user_agent_rotation, "cache_path": args.user_agent_cache or None}
+    if args.worker_only:
+        run_worker(
+            args.kind,
+            f"{socket.gethostname()}-{os.getpid()}",
+            os.path.join(args.work_directory, "work_queue.sqlite"),
+            os.path.join(args.work_directory, "crawl.sqlite"),
+            args.work_directory,
+            crawl_kwargs=kwargs,
+            user_agents=user_agents,
+        )
+    else:
+        merged_rows = run_sharded_crawl(
+            args.kind,
+            args.start_index,
+            args.end_index,
+            targets=args.output,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            work_directory=args.work_directory,
+            crawl_kwargs=kwargs,
+            user_agents=user_agents,
+        )
+        print(f"Merged rows: {merged_rows}")
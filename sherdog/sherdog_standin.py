@@ -0,0 +1,448 @@
+"""
+Local stand-in of sherdog.com for offline benchmarks and experiments. Pages are served from a recorded corpus
+directory (fighters/<index>.html, organizations/<index>-<page>.html, events/<index>.html) and missing ones are
+generated from a deterministic synthetic world, where fighter, event and organization pages agree with each other.
+Latency, missing pages (404) and throttling (429) can be injected.
+
+python -m sherdog.sherdog_standin --port 8000 --latency 0.05 --not-found-rate 0.2 --throttle-rate 0.01
+SHERDOG_BASE_URL=http://127.0.0.1:8000 python sherdog-parser.py
+"""
+import argparse
+import datetime
+import hashlib
+import os
+import random
+import re
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+# differences of indexes of fighters meeting in a bout, every pair is one bout at most
+BOUT_DELTAS = (1, 2, 3, 5, 8, 13, 21, 34)
+# bouts of fighters with the lower index in the same span take place on the same event
+EVENT_SPAN = 40
+BOUT_DENSITY = 0.5
+EVENTS_PER_ORGANIZATION = 30
+# every LARGE_ORGANIZATION_EVERY-th organization is a large promotion with several pages of recent events
+LARGE_ORGANIZATION_EVERY = 50
+LARGE_ORGANIZATION_EVENTS = 730
+EVENTS_PER_PAGE = 100
+# pagination of recent events links only pages near the current one
+PAGINATION_WINDOW = 3
+FIRST_EVENT_DATE = datetime.date(1990, 1, 1)
+WEIGHT_CLASSES = ("Flyweight", "Bantamweight", "Featherweight", "Lightweight", "Welterweight", "Middleweight")
+METHODS = (("KO", "Punches"), ("TKO", "Elbows"), ("Submission", "Rear-Naked Choke"), ("Decision", "Unanimous"))
+REFEREES = ("Herb Dean", "Marc Goddard", "Jason Herzog", "Dan Miragliotta")
+STYLES = ("Wrestling", "Boxing", "Brazilian Jiu-Jitsu", "Muay Thai")
+# every MISSING_BIO_EVERY-th fighter page has no bio table and every DIED_EVERY-th fighter has a death date
+MISSING_BIO_EVERY = 25
+DIED_EVERY = 30
+
+FIGHTER_PATH_RE = re.compile(r"^/fighter/(?:index|[^/]*-(\d+))$")
+ORGANIZATION_PATH_RE = re.compile(r"^/organizations/[^/]*-(\d+)(?:/recent-events/(\d+))?$")
+EVENT_PATH_RE = re.compile(r"^/events/[^/]*-(\d+)$")
+
+NOT_FOUND_PAGE = (
+    '<html><head><meta charset="utf-8"><title>Sherdog</title></head><body>'
+    '<div class="tiled_bg latest_features"><h1>ERROR 404 - Page not found</h1></div></body></html>'
+)
+
+
+def _fraction(*key: Any) -> float:
+    # deterministic pseudo-random number in [0, 1) for a given key, independent of request order
+    digest = hashlib.blake2b(repr(key).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+
+def _choice(options: Tuple[Any, ...], *key: Any) -> Any:
+    return options[int(_fraction(*key) * len(options))]
+
+
+class SyntheticWorld(object):
+    """SyntheticWorld class - deterministic fighters, events and organizations generated from their indexes."""
+
+    def __init__(self, seed: int = 0, not_found_rate: float = 0.0) -> None:
+        """
+        Initializes a SyntheticWorld instance.
+        :param seed: Seed of generated data, the same seed always gives the same pages.
+        :param not_found_rate: Share of fighter and organization indexes without a page.
+        """
+        self.seed = seed
+        self.not_found_rate = not_found_rate
+
+    def exists(self, kind: str, index: int) -> bool:
+        return _fraction(self.seed, "missing", kind, index) >= self.not_found_rate
+
+    def get_bouts(self, fighter_index: int) -> List[Tuple[int, int]]:
+        """
+        Get bouts of fighter as (fighter index with the lower index, delta) pairs.
+        :param fighter_index: Index of fighter.
+        :return: List of bouts ordered from the newest one.
+        """
+        bouts = list()
+        for delta in BOUT_DELTAS:
+            for low in (fighter_index, fighter_index - delta):
+                if low > 0 and self._has_bout(low, delta):
+                    bouts.append((low, delta))
+        return sorted(bouts, key=self.get_event_index, reverse=True)
+
+    def _has_bout(self, low: int, delta: int) -> bool:
+        if not (self.exists("fighter", low) and self.exists("fighter", low + delta)):
+            return False
+        return _fraction(self.seed, "bout", low, delta) < BOUT_DENSITY
+
+    @staticmethod
+    def get_event_index(bout: Tuple[int, int]) -> int:
+        low, delta = bout
+        return (low // EVENT_SPAN) * len(BOUT_DELTAS) + BOUT_DELTAS.index(delta) + 1
+
+    def get_event_bouts(self, event_index: int) -> List[Tuple[int, int]]:
+        """
+        Get bouts of event, the inverse of get_event_index.
+        :param event_index: Index of event.
+        :return: List of bouts, the main event is the last one.
+        """
+        span, delta_position = divmod(event_index - 1, len(BOUT_DELTAS))
+        delta = BOUT_DELTAS[delta_position]
+        lows = range(max(1, span * EVENT_SPAN), (span + 1) * EVENT_SPAN)
+        return [(low, delta) for low in lows if self._has_bout(low, delta)]
+
+    @staticmethod
+    def get_event_date(event_index: int) -> datetime.date:
+        # one span of fighters per day, so newer events of a fighter have newer dates
+        return FIRST_EVENT_DATE + datetime.timedelta(days=(event_index - 1) // len(BOUT_DELTAS))
+
+    def get_bout_details(self, bout: Tuple[int, int]) -> Dict[str, Any]:
+        low, delta = bout
+        general, specific = _choice(METHODS, self.seed, "method", bout)
+        bout_round = 3 if general == "Decision" else 1 + int(_fraction(self.seed, "round", bout) * 3)
+        seconds = 300 if general == "Decision" else 1 + int(_fraction(self.seed, "time", bout) * 299)
+        return {
+            "winner": low if _fraction(self.seed, "winner", bout) < 0.5 else low + delta,
+            "method": f"{general} ({specific})",
+            "referee": _choice(REFEREES, self.seed, "referee", bout),
+            "round": bout_round,
+            "time": f"{seconds // 60}:{seconds % 60:02d}",
+            "weight_class": _choice(WEIGHT_CLASSES, self.seed, "weight", low // EVENT_SPAN, delta),
+            "title_fight": _fraction(self.seed, "title", bout) < 0.05,
+        }
+
+    @staticmethod
+    def get_fighter_href(fighter_index: int) -> str:
+        return f"/fighter/Synthetic-Fighter-{fighter_index}"
+
+    @staticmethod
+    def get_event_href(event_index: int) -> str:
+        return f"/events/Synthetic-Event-{event_index}"
+
+    def fighter_page(self, fighter_index: int) -> Optional[str]:
+        if not self.exists("fighter", fighter_index):
+            return None
+        birth_date = datetime.date(1970, 1, 1) + datetime.timedelta(days=fighter_index % 9000)
+        rows = list()
+        for bout in self.get_bouts(fighter_index):
+            low, delta = bout
+            details = self.get_bout_details(bout)
+            opponent = low + delta if low == fighter_index else low
+            event_index = self.get_event_index(bout)
+            rows.append(
+                f'<tr><td><span class="final_result">{"win" if details["winner"] == fighter_index else "loss"}'
+                f'</span></td><td><a href="{self.get_fighter_href(opponent)}">Fighter {opponent}</a></td>'
+                f'<td><a href="{self.get_event_href(event_index)}">Synthetic Event {event_index}</a><br>'
+                f'<span class="sub_line">{self.get_event_date(event_index).strftime("%b / %d / %Y")}</span></td>'
+                f'<td><b>{details["method"]}</b><br><span class="sub_line">{details["referee"]}</span></td>'
+                f'<td>{details["round"]}</td><td>{details["time"]}</td></tr>'
+            )
+        weight_class = _choice(WEIGHT_CLASSES, self.seed, "fighter_weight", fighter_index)
+        bio = ""
+        if fighter_index % MISSING_BIO_EVERY != 0:
+            died = ""
+            if fighter_index % DIED_EVERY == 0:
+                death_date = birth_date + datetime.timedelta(days=15000)
+                died = f'<tr><td>DIED</td><td>41 / {death_date.strftime("%b %d, %Y")}</td></tr>'
+            bio = (
+                '<div class="bio-holder"><table>'
+                f'<tr><td>AGE</td><td>30 / {birth_date.strftime("%b %d, %Y")}</td></tr>{died}'
+                "<tr><td>HEIGHT</td><td>6'0\" / 182.88 cm</td></tr>"
+                "<tr><td>WEIGHT</td><td>170 lbs / 77.11 kg</td></tr>"
+                "</table></div>"
+            )
+        return (
+            '<html><head><meta charset="utf-8"><title>Sherdog</title></head><body>'
+            '<div class="tiled_bg latest_features"><h1>Fighter Profile</h1></div>'
+            f'<section><h1><span class="fn">Fighter {fighter_index}</span> '
+            f'<span class="nickname">"Number {fighter_index}"</span></h1>'
+            '<strong itemprop="nationality">Czech Republic</strong><span class="locality">Prague</span>'
+            f"{bio}"
+            '<div class="association-class"><span itemprop="memberOf"><a href="/x">Synthetic Gym</a></span>'
+            f'<a href="/stats/fightfinder?weightclass={weight_class}">{weight_class}</a> '
+            f'<b>{_choice(STYLES, self.seed, "style", fighter_index)}</b></div></section>'
+            '<section><div class="module_header"><h2>FIGHT HISTORY - PRO</h2></div><table>'
+            "<tr><td>Result</td><td>Fighter</td><td>Event</td><td>Method/Referee</td><td>R</td><td>Time</td></tr>"
+            f'{"".join(rows)}</table></section></body></html>'
+        )
+
+    def organization_page(self, organization_index: int, page: int = 1) -> Optional[str]:
+        if not self.exists("organization", organization_index):
+            return None
+        events_count = EVENTS_PER_ORGANIZATION
+        if organization_index % LARGE_ORGANIZATION_EVERY == 0:
+            events_count = LARGE_ORGANIZATION_EVENTS
+        # organizations take turns in hosting events
+        event_indexes = [organization_index + k * 1000 for k in range(events_count)]
+        page_events = event_indexes[(page - 1) * EVENTS_PER_PAGE:page * EVENTS_PER_PAGE]
+        pages_count = (events_count + EVENTS_PER_PAGE - 1) // EVENTS_PER_PAGE
+        pagination = "".join(
+            f'<a href="/organizations/Synthetic-Organization-{organization_index}/recent-events/{linked}">{linked}</a>'
+            for linked in range(max(1, page - PAGINATION_WINDOW), min(pages_count, page + PAGINATION_WINDOW) + 1)
+            if linked != page
+        )
+        rows = "".join(
+            f'<tr><td><meta itemprop="startDate" content="{self.get_event_date(event_index).isoformat()}T00:00:00">'
+            f'</td><td><a itemprop="url" href="{self.get_event_href(event_index)}">'
+            f'<span itemprop="name">Synthetic Event {event_index}</span></a></td>'
+            f'<td itemprop="location">Synthetic Arena {event_index % 50}</td></tr>'
+            for event_index in sorted(page_events, reverse=True)
+        )
+        return (
+            '<html><head><meta charset="utf-8"><title>Sherdog</title></head><body>'
+            '<div class="tiled_bg latest_features"><h1>Organization</h1></div>'
+            f'<section><div itemprop="name">Synthetic Organization {organization_index}</div></section>'
+            f'<div id="recent_tab"><table><tr><td>Date</td><td>Event</td><td>Location</td></tr>{rows}</table></div>'
+            f'<div class="footer"><span class="pagination">{pagination}</span></div></body></html>'
+        )
+
+    def event_page(self, event_index: int) -> Optional[str]:
+        bouts = self.get_event_bouts(event_index)
+        if not bouts:
+            return None
+        event_date = self.get_event_date(event_index)
+        fights = list()
+        for bout in bouts:
+            low, delta = bout
+            details = self.get_bout_details(bout)
+            # winner is listed on the left side as on sherdog.com
+            fighter_indexes = (low, low + delta) if details["winner"] == low else (low + delta, low)
+            fights.append((fighter_indexes, details))
+        main_event_indexes, main_event = fights.pop()
+        main_sides = "".join(
+            f'<div class="fighter {side}"><a itemprop="url" href="{self.get_fighter_href(fighter_index)}">'
+            f'<span itemprop="name">Fighter {fighter_index}</span></a>'
+            f'<span class="final_result {result}">{result}</span></div>'
+            for side, fighter_index, result in zip(("left_side", "right_side"), main_event_indexes, ("win", "loss"))
+        )
+        main_title = '<span class="title_fight">Title Bout</span>' if main_event["title_fight"] else ""
+        rows = list()
+        for match, (fighter_indexes, details) in enumerate(reversed(fights), start=2):
+            sides = [
+                f'<td itemprop="performer"><a itemprop="url" href="{self.get_fighter_href(fighter_index)}">'
+                f'<span itemprop="name">Fighter {fighter_index}</span></a>'
+                f'<span class="final_result {result}">{result}</span></td>'
+                for fighter_index, result in zip(fighter_indexes, ("win", "loss"))
+            ]
+            title = '<span class="title_fight">Title Bout</span>' if details["title_fight"] else ""
+            rows.append(
+                f'<tr itemprop="subEvent"><td>{match}</td>{sides[0]}'
+                f'<td class="vs"><span class="weight_class">{details["weight_class"]}</span>{title}</td>{sides[1]}'
+                f'<td>{details["method"]}<br><span class="sub_line">{details["referee"]}</span></td>'
+                f'<td>{details["round"]}</td><td>{details["time"]}</td></tr>'
+            )
+        return (
+            '<html><head><meta charset="utf-8"><title>Sherdog</title></head><body>'
+            '<div class="tiled_bg latest_features"><h1>Event</h1></div>'
+            f'<div class="event_detail"><h1><span itemprop="name">Synthetic Event {event_index}</span></h1>'
+            f'<meta itemprop="startDate" content="{event_date.isoformat()}T00:00:00"></div>'
+            f'<div class="module fight_card"><div class="fight">{main_sides}'
+            f'<div class="versus"><span class="weight_class">{main_event["weight_class"]}</span>{main_title}</div>'
+            '</div><div class="footer"><table class="resume"><tr><td><em>Match</em>1</td>'
+            f'<td><em>Method</em>{main_event["method"]}</td><td><em>Referee</em>{main_event["referee"]}</td>'
+            f'<td><em>Round</em>{main_event["round"]}</td><td><em>Time</em>{main_event["time"]}</td></tr></table>'
+            '</div></div><div class="module event_match"><table>'
+            "<tr><td>Match</td><td>Fighter</td><td></td><td>Fighter</td>"
+            "<td>Method/Referee</td><td>R</td><td>Time</td></tr>"
+            f'{"".join(rows)}</table></div></body></html>'
+        )
+
+
+class StandInServer(object):
+    """StandInServer class - local HTTP server imitating sherdog.com with injectable latency, 404s and 429s."""
+
+    def __init__(
+        self,
+        corpus_directory: Optional[str] = None,
+        latency_seconds: float = 0.0,
+        latency_jitter_seconds: float = 0.0,
+        not_found_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after_seconds: int = 1,
+        seed: int = 0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """
+        Initializes a StandInServer instance, call start to serve pages.
+        :param corpus_directory: Directory with recorded pages, synthetic pages are served for the rest.
+        :param latency_seconds: Delay of every answer.
+        :param latency_jitter_seconds: Random delay added to latency, from 0 to this value.
+        :param not_found_rate: Share of synthetic fighters and organizations answered by 404 page.
+        :param throttle_rate: Share of requests answered by 429 with Retry-After header.
+        :param retry_after_seconds: Value of Retry-After header of 429 answers.
+        :param seed: Seed of synthetic pages and injected failures.
+        :param host: Interface the server listens on.
+        :param port: Port of the server, random free port is used if 0.
+        """
+        self.corpus_directory = corpus_directory
+        self.latency_seconds = latency_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.throttle_rate = throttle_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.host = host
+        self.world = SyntheticWorld(seed=seed, not_found_rate=not_found_rate)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = dict()
+        self._server = ThreadingHTTPServer((host, port), self._get_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self._server.server_port}"
+
+    def start(self) -> "StandInServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="sherdog-standin", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *_: Any) -> None:
+        self.stop()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get counts of served answers.
+        :return: Dictionary with number of requests, answers by status (e.g. status_200) and sent bytes.
+        """
+        with self._lock:
+            return dict(self._stats)
+
+    def _count(self, status: int, size: int) -> None:
+        with self._lock:
+            for key, value in (("requests", 1), (f"status_{status}", 1), ("bytes", size)):
+                self._stats[key] = self._stats.get(key, 0) + value
+
+    def _read_recorded(self, kind: str, name: str) -> Optional[bytes]:
+        if not self.corpus_directory:
+            return None
+        path = os.path.join(self.corpus_directory, kind, f"{name}.html")
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as page_file:
+            return page_file.read()
+
+    def get_page(self, url: str) -> Tuple[int, bytes]:
+        """
+        Find page for a requested URL, recorded pages take precedence over synthetic ones.
+        :param url: Path with query of the request.
+        :return: Tuple with HTTP status and page content.
+        """
+        parsed_url = urlparse(url)
+        page: Optional[bytes] = None
+        content: Optional[str] = None
+        fighter_match = FIGHTER_PATH_RE.match(parsed_url.path)
+        organization_match = ORGANIZATION_PATH_RE.match(parsed_url.path)
+        event_match = EVENT_PATH_RE.match(parsed_url.path)
+        if fighter_match:
+            index = fighter_match.group(1) or parse_qs(parsed_url.query).get("id", ["0"])[0]
+            page = self._read_recorded("fighters", index)
+            if page is None and index.isdigit():
+                content = self.world.fighter_page(int(index))
+        elif organization_match:
+            index, page_number = organization_match.group(1), organization_match.group(2) or "1"
+            page = self._read_recorded("organizations", f"{index}-{page_number}")
+            if page is None:
+                content = self.world.organization_page(int(index), int(page_number))
+        elif event_match:
+            page = self._read_recorded("events", event_match.group(1))
+            if page is None:
+                content = self.world.event_page(int(event_match.group(1)))
+        if content is not None:
+            page = content.encode("utf-8")
+        if page is None:
+            return 404, NOT_FOUND_PAGE.encode("utf-8")
+        return 200, page
+
+    def _get_handler(self) -> Any:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _answer(self, send_body: bool) -> None:
+                with server._lock:
+                    delay = server.latency_seconds + server._random.random() * server.latency_jitter_seconds
+                    throttled = server._random.random() < server.throttle_rate
+                if delay:
+                    time.sleep(delay)
+                headers = {"Content-Type": "text/html; charset=utf-8"}
+                if throttled:
+                    status, page = 429, b"Too Many Requests"
+                    headers["Retry-After"] = str(server.retry_after_seconds)
+                else:
+                    status, page = server.get_page(self.path)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(page)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(page)
+                server._count(status, len(page) if send_body else 0)
+
+            def do_GET(self) -> None:
+                self._answer(send_body=True)
+
+            def do_HEAD(self) -> None:
+                self._answer(send_body=False)
+
+            def log_message(self, *_: Any) -> None:
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve local stand-in of sherdog.com.")
+    parser.add_argument("--corpus", help="directory with recorded fighters/, organizations/ and events/ pages")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0, help="delay of every answer in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random delay added to latency in seconds")
+    parser.add_argument("--not-found-rate", type=float, default=0.0, help="share of missing fighters/organizations")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests answered by 429")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    standin = StandInServer(
+        corpus_directory=args.corpus,
+        latency_seconds=args.latency,
+        latency_jitter_seconds=args.jitter,
+        not_found_rate=args.not_found_rate,
+        throttle_rate=args.throttle_rate,
+        seed=args.seed,
+        port=args.port,
+    )
+    print(f"Serving stand-in of sherdog.com on {standin.base_url}, set SHERDOG_BASE_URL={standin.base_url}")
+    try:
+        standin.start()
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        standin.stop()
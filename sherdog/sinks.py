@@ -0,0 +1,334 @@
+"""
+Output sinks of scraped rows. Sink is chosen by extension of the output file:
+.jsonl (line-delimited JSON), .csv, .parquet (columnar, requires pyarrow) and .sqlite (indexed store).
+"""
+import csv
+import datetime
+import json
+import os
+
+from typing import Any, Callable, Dict, IO, Iterable, List, Optional, Tuple
+
+from sherdog.serialization import to_jsonl
+from sherdog.store import Store
+
+# pyarrow takes longer to import than the whole crawler, so it is imported by the first Parquet sink
+pyarrow: Any = None
+
+
+def _import_pyarrow() -> Any:
+    global pyarrow
+    if pyarrow is None:
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Parquet output requires pyarrow package")
+    return pyarrow
+
+
+# column name and type of rows returned by to_dict methods and written by organization crawl
+SCHEMAS: Dict[str, List[Tuple[str, str]]] = {
+    "fights": [
+        ("fighterIndexA", "int64"),
+        ("fighterIndexB", "int64"),
+        ("eventIndex", "int64"),
+        ("date", "timestamp"),
+        ("weightClass", "string"),
+        ("fightType", "string"),
+        ("referee", "string"),
+        ("result", "string"),
+        ("generalDecision", "string"),
+        ("specificDecision", "string"),
+        ("specificTime", "int32"),
+        ("round", "int16"),
+        ("titleFight", "bool"),
+    ],
+    "fighters": [
+        ("fullname", "string"),
+        ("index", "int64"),
+        ("url", "string"),
+        ("nickname", "string"),
+        ("birthDate", "timestamp"),
+        ("deathDate", "timestamp"),
+        ("nationality", "string"),
+        ("locality", "string"),
+        ("weightKg", "float64"),
+        ("heightCm", "float64"),
+        ("associations", "list<string>"),
+        ("weight_class", "string"),
+        ("style", "string"),
+    ],
+    "organizations": [("organization_index", "int64"), ("fullname", "string")],
+    # written by analytics.py
+    "records": [
+        ("fighter", "int64"),
+        ("fights", "int64"),
+        ("wins", "int64"),
+        ("losses", "int64"),
+        ("draws", "int64"),
+        ("no_contests", "int64"),
+        ("ko_wins", "int64"),
+        ("submission_wins", "int64"),
+        ("decision_wins", "int64"),
+        ("finish_rate", "float64"),
+        ("mean_fight_seconds", "float64"),
+        ("longest_win_streak", "int64"),
+        ("current_streak", "int64"),
+        ("rating", "float64"),
+        ("peak_rating", "float64"),
+        ("rated_fights", "int64"),
+    ],
+    "events": [
+        ("fight_date", "string"),
+        ("url", "string"),
+        ("event_name", "string"),
+        ("location", "string"),
+        ("event_index", "int64"),
+        ("organization_index", "int64"),
+    ],
+}
+
+
+class JsonlSink(object):
+    """JsonlSink class - appends rows to line-delimited JSON file."""
+
+    # appended rows survive crash of the crawl, so crawl ledger can rely on them
+    resumable = True
+
+    def __init__(self, path: str, kind: Optional[str] = None) -> None:
+        self.path = path
+        # binary for JSON lines, text for CSV
+        self._file: IO[Any] = open(path, "ab")
+
+    def write(self, rows: Iterable[Dict[str, Optional[Any]]]) -> None:
+        self._file.write(to_jsonl(rows))
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> Any:
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+
+class CsvSink(JsonlSink):
+    """CsvSink class - appends rows to CSV file with to_dict keys as header."""
+
+    def __init__(self, path: str, kind: Optional[str] = None, fieldnames: Optional[List[str]] = None) -> None:
+        """
+        Initializes a CsvSink instance, header is written only to a new file.
+        :param path: Path to CSV file.
+        :param kind: Kind of rows (fights, fighters, organizations or events) defining the columns.
+        :param fieldnames: Columns of CSV file, they override columns given by kind.
+        """
+        self.path = path
+        if fieldnames is None:
+            fieldnames = [name for name, _ in SCHEMAS[kind]] if kind else None
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", newline="")
+        self._fieldnames = fieldnames
+        self._writer: Optional[Any] = None
+        self._write_header = new_file
+
+    def write(self, rows: Iterable[Dict[str, Optional[Any]]]) -> None:
+        for row in rows:
+            if self._writer is None:
+                self._writer = csv.DictWriter(self._file, fieldnames=self._fieldnames or list(row))
+                if self._write_header:
+                    self._writer.writeheader()
+            self._writer.writerow(row)
+
+
+class ReadmeCsvSink(CsvSink):
+    """ReadmeCsvSink class - writes fights in the CSV format shown in README."""
+
+    FIELDNAMES = ["Fighter", "Opponent", "Result", "Event", "Event_date", "Method", "Referee", "Round", "Time"]
+
+    def __init__(
+        self,
+        path: str,
+        fighter_names: Optional[Dict[int, str]] = None,
+        event_names: Optional[Dict[int, str]] = None,
+    ) -> None:
+        """
+        Initializes a ReadmeCsvSink instance.
+        :param path: Path to CSV file.
+        :param fighter_names: Fighter index to fullname mapping, indexes are written if name is unknown.
+        :param event_names: Event index to event name mapping, indexes are written if name is unknown.
+        """
+        super().__init__(path, fieldnames=self.FIELDNAMES)
+        self.fighter_names = fighter_names or dict()
+        self.event_names = event_names or dict()
+
+    def write(self, rows: Iterable[Dict[str, Optional[Any]]]) -> None:
+        super().write(self.to_readme_row(row) for row in rows)
+
+    def to_readme_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert Fight.to_dict row to README CSV row.
+        :param row: Dictionary returned by Fight.to_dict.
+        :return: Dictionary with README columns.
+        """
+        event_date = "N/A"
+        if row["date"]:
+            event_date = datetime.datetime.fromisoformat(row["date"]).strftime("%b / %d / %Y")
+        method = row["generalDecision"]
+        if row["specificDecision"]:
+            method = f"{method} ({row['specificDecision']})"
+        specific_time = row["specificTime"]
+        return {
+            "Fighter": self.fighter_names.get(row["fighterIndexA"], row["fighterIndexA"]),
+            "Opponent": self.fighter_names.get(row["fighterIndexB"], row["fighterIndexB"]),
+            "Result": row["result"],
+            "Event": self.event_names.get(row["eventIndex"], row["eventIndex"]),
+            "Event_date": event_date,
+            "Method": method,
+            "Referee": row["referee"] or "N/A",
+            "Round": row["round"],
+            "Time": f"{specific_time // 60}:{specific_time % 60:02d}" if specific_time >= 0 else "N/A",
+        }
+
+
+class ParquetSink(object):
+    """ParquetSink class - buffers rows and writes them as typed row groups of Parquet file."""
+
+    # Parquet footer is written on close, file of interrupted crawl is not readable
+    resumable = False
+
+    def __init__(self, path: str, kind: str, row_group_size: int = 65536) -> None:
+        """
+        Initializes a ParquetSink instance, existing file is overwritten.
+        :param path: Path to Parquet file.
+        :param kind: Kind of rows (fights, fighters, organizations or events) defining the schema.
+        :param row_group_size: Number of buffered rows written as one row group.
+        """
+        _import_pyarrow()
+        self.path = path
+        self.row_group_size = row_group_size
+        self._columns = SCHEMAS[kind]
+        self._converters = {name: self._get_converter(type_name) for name, type_name in self._columns}
+        self._schema = pyarrow.schema([(name, self._get_type(type_name)) for name, type_name in self._columns])
+        self._buffer: Dict[str, List[Any]] = {name: list() for name, _ in self._columns}
+        self._buffered_rows = 0
+        self._writer = pyarrow.parquet.ParquetWriter(path, self._schema, compression="zstd")
+
+    @staticmethod
+    def _get_type(type_name: str) -> Any:
+        if type_name == "timestamp":
+            return pyarrow.timestamp("s")
+        if type_name == "list<string>":
+            return pyarrow.list_(pyarrow.string())
+        return pyarrow.type_for_alias(type_name)
+
+    @staticmethod
+    def _get_converter(type_name: str) -> Optional[Callable[[Any], Any]]:
+        if type_name == "timestamp":
+            return lambda value: datetime.datetime.fromisoformat(value) if value else None
+        return None
+
+    def write(self, rows: Iterable[Dict[str, Optional[Any]]]) -> None:
+        for row in rows:
+            for name, values in self._buffer.items():
+                converter = self._converters[name]
+                value = row.get(name)
+                values.append(converter(value) if converter else value)
+            self._buffered_rows += 1
+            if self._buffered_rows >= self.row_group_size:
+                self._write_row_group()
+
+    def flush(self) -> None:
+        # rows are written by whole row groups, writing smaller ones on every flush would make reading slow
+        pass
+
+    def close(self) -> None:
+        self._write_row_group()
+        self._writer.close()
+
+    def _write_row_group(self) -> None:
+        if not self._buffered_rows:
+            return
+        self._writer.write_table(pyarrow.Table.from_pydict(self._buffer, schema=self._schema))
+        self._buffer = {name: list() for name, _ in self._columns}
+        self._buffered_rows = 0
+
+    def __enter__(self) -> Any:
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+
+class SqliteSink(object):
+    """SqliteSink class - upserts rows to indexed sqlite store, re-scraped rows replace the stored ones."""
+
+    # every batch is committed, so crawl ledger can rely on it
+    resumable = True
+
+    def __init__(self, path: str, kind: str) -> None:
+        self.path = path
+        self.kind = kind
+        self._store = Store(path)
+
+    def write(self, rows: Iterable[Dict[str, Optional[Any]]]) -> None:
+        self._store.upsert(self.kind, rows)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self._store.close()
+
+    def __enter__(self) -> Any:
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+
+def open_sink(path: str, kind: str) -> Any:
+    """
+    Open output sink chosen by extension of the file.
+    :param path: Path to output file (.jsonl, .json, .csv, .parquet or .sqlite).
+    :param kind: Kind of rows (fights, fighters, organizations or events).
+    :return: Opened sink with write, flush and close methods.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".json"):
+        return JsonlSink(path, kind)
+    if extension == ".csv":
+        return CsvSink(path, kind)
+    if extension == ".parquet":
+        return ParquetSink(path, kind)
+    if extension in (".sqlite", ".db"):
+        return SqliteSink(path, kind)
+    raise ValueError(f"Unsupported output file {path}, use .jsonl, .csv, .parquet or .sqlite")
+
+
+def convert(source_path: str, target_path: str, kind: str, batch_size: int = 65536) -> int:
+    """
+    Convert existing JSON lines output to another format, e.g. fights.jsonl -> fights.parquet.
+    :param source_path: Path to JSON lines file.
+    :param target_path: Path to output file, its format is given by extension.
+    :param kind: Kind of rows (fights, fighters, organizations or events).
+    :param batch_size: Number of rows passed to sink at once.
+    :return: Number of converted rows.
+    """
+    converted = 0
+    with open(source_path) as source_file, open_sink(target_path, kind) as sink:
+        batch = list()
+        for line in source_file:
+            if not line.strip():
+                continue
+            batch.append(json.loads(line))
+            if len(batch) >= batch_size:
+                sink.write(batch)
+                converted += len(batch)
+                batch = list()
+        sink.write(batch)
+        converted += len(batch)
+    return converted
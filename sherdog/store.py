@@ -0,0 +1,254 @@
+"""
+Indexed SQLite store of scraped fighters, fights, organizations and events. Rows returned by to_dict methods and
+written by organization crawl are upserted in batches under their natural primary keys, so re-scraped pages update
+rows in place instead of appending duplicates, and lookups of a fighter, event or organization are served by
+indexes instead of scans of whole JSONL files. Existing JSONL outputs are imported in one streaming pass.
+
+python -m sherdog.store data/sherdog.sqlite --fighters data/fighters.jsonl --fights data/fights.jsonl
+"""
+import argparse
+import json
+import sqlite3
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sherdog.serialization import loads
+
+# columns of rows in to_dict format with their sqlite types, primary keys and lookup indexes of every kind
+TABLES: Dict[str, Dict[str, Any]] = {
+    "fighters": {
+        "columns": [
+            ("index", "INTEGER NOT NULL"),
+            ("fullname", "TEXT"),
+            ("url", "TEXT"),
+            ("nickname", "TEXT"),
+            ("birthDate", "TEXT"),
+            ("deathDate", "TEXT"),
+            ("nationality", "TEXT"),
+            ("locality", "TEXT"),
+            ("weightKg", "REAL"),
+            ("heightCm", "REAL"),
+            ("associations", "TEXT"),
+            ("weight_class", "TEXT"),
+            ("style", "TEXT"),
+        ],
+        "primary_key": ("index",),
+        "indexes": [("fullname",)],
+    },
+    "fights": {
+        "columns": [
+            ("fighterIndexA", "INTEGER NOT NULL"),
+            ("fighterIndexB", "INTEGER NOT NULL"),
+            ("eventIndex", "INTEGER NOT NULL"),
+            ("date", "TEXT"),
+            ("weightClass", "TEXT"),
+            ("fightType", "TEXT"),
+            ("referee", "TEXT"),
+            ("result", "TEXT"),
+            ("generalDecision", "TEXT"),
+            ("specificDecision", "TEXT"),
+            ("specificTime", "INTEGER NOT NULL"),
+            ("round", "INTEGER NOT NULL"),
+            ("titleFight", "INTEGER"),
+        ],
+        # both views of a bout are kept, see fight_index.py for deduplicated bouts
+        "primary_key": ("fighterIndexA", "fighterIndexB", "eventIndex", "round", "specificTime"),
+        "indexes": [("fighterIndexB",), ("eventIndex",), ("date",)],
+    },
+    "organizations": {
+        "columns": [("organization_index", "INTEGER NOT NULL"), ("fullname", "TEXT")],
+        "primary_key": ("organization_index",),
+        "indexes": [],
+    },
+    "events": {
+        "columns": [
+            ("event_index", "INTEGER NOT NULL"),
+            ("organization_index", "INTEGER"),
+            ("fight_date", "TEXT"),
+            ("url", "TEXT"),
+            ("event_name", "TEXT"),
+            ("location", "TEXT"),
+        ],
+        "primary_key": ("event_index",),
+        "indexes": [("organization_index",), ("fight_date",)],
+    },
+}
+
+
+def _quote(column: str) -> str:
+    # index is a keyword of SQL
+    return f'"{column}"'
+
+
+def _encode_list(value: Optional[List[str]]) -> Optional[str]:
+    return None if value is None else json.dumps(value, ensure_ascii=False)
+
+
+def _decode_list(value: Optional[str]) -> Optional[List[str]]:
+    return None if value is None else json.loads(value)
+
+
+def _encode_bool(value: Optional[bool]) -> Optional[int]:
+    return None if value is None else int(bool(value))
+
+
+def _decode_bool(value: Optional[int]) -> Optional[bool]:
+    return None if value is None else bool(value)
+
+
+# columns not stored as they are, with functions converting them to and from sqlite values
+CONVERTERS: Dict[Tuple[str, str], Tuple[Callable[[Any], Any], Callable[[Any], Any]]] = {
+    ("fighters", "associations"): (_encode_list, _decode_list),
+    ("fights", "titleFight"): (_encode_bool, _decode_bool),
+}
+
+
+class Store(object):
+    """Store class - sqlite database of scraped rows with idempotent batch upserts and point queries."""
+
+    def __init__(self, path: str = "data/sherdog.sqlite", cache_size_mb: int = 64) -> None:
+        """
+        Initializes a Store instance, creates the sqlite database and its tables if they do not exist.
+        :param path: Path to the sqlite database.
+        :param cache_size_mb: Size of sqlite page cache.
+        """
+        self.path = path
+        # fighter and fight sinks of one crawl write to the same database from two connections
+        self._connection = sqlite3.connect(path, timeout=60)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute(f"PRAGMA cache_size=-{cache_size_mb * 1024}")
+        self._statements: Dict[str, str] = dict()
+        for kind, table in TABLES.items():
+            columns = ", ".join(f"{_quote(column)} {column_type}" for column, column_type in table["columns"])
+            primary_key = ", ".join(_quote(column) for column in table["primary_key"])
+            self._connection.execute(f"CREATE TABLE IF NOT EXISTS {kind} ({columns}, PRIMARY KEY ({primary_key}))")
+            for index_columns in table["indexes"]:
+                index_name = f"{kind}_{'_'.join(index_columns)}"
+                quoted_columns = ", ".join(_quote(column) for column in index_columns)
+                self._connection.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {kind} ({quoted_columns})")
+            self._statements[kind] = self._get_upsert_statement(kind)
+        self._connection.commit()
+
+    @staticmethod
+    def _get_upsert_statement(kind: str) -> str:
+        table = TABLES[kind]
+        columns = [column for column, _ in table["columns"]]
+        updated_columns = [column for column in columns if column not in table["primary_key"]]
+        return f"""
+            INSERT INTO {kind} ({", ".join(_quote(column) for column in columns)})
+            VALUES ({", ".join("?" for _ in columns)})
+            ON CONFLICT ({", ".join(_quote(column) for column in table["primary_key"])}) DO UPDATE SET
+            {", ".join(f"{_quote(column)} = excluded.{_quote(column)}" for column in updated_columns)}
+        """
+
+    @staticmethod
+    def _to_values(kind: str, row: Dict[str, Any]) -> Tuple[Any, ...]:
+        values = list()
+        for column, _ in TABLES[kind]["columns"]:
+            value = row.get(column)
+            if (kind, column) in CONVERTERS:
+                value = CONVERTERS[(kind, column)][0](value)
+            values.append(value)
+        return tuple(values)
+
+    @staticmethod
+    def _to_row(kind: str, values: Tuple[Any, ...]) -> Dict[str, Any]:
+        row = dict()
+        for (column, _), value in zip(TABLES[kind]["columns"], values):
+            if (kind, column) in CONVERTERS:
+                value = CONVERTERS[(kind, column)][1](value)
+            row[column] = value
+        return row
+
+    def upsert(self, kind: str, rows: Iterable[Dict[str, Any]], commit: bool = True) -> int:
+        """
+        Insert rows or update already stored rows with the same primary key.
+        :param kind: Kind of rows (fighters, fights, organizations or events).
+        :param rows: Rows in to_dict format.
+        :param commit: Commit the batch, so the rows are on disk when the method returns.
+        :return: Number of upserted rows.
+        """
+        values = [self._to_values(kind, row) for row in rows]
+        if values:
+            self._connection.executemany(self._statements[kind], values)
+        if commit:
+            self._connection.commit()
+        return len(values)
+
+    def import_jsonl(self, path: str, kind: str, batch_size: int = 10000) -> int:
+        """
+        Upsert rows of existing JSONL output in a single streaming pass, importing a file again changes nothing.
+        :param path: JSONL file written by scrape_all_* functions.
+        :param kind: Kind of rows (fighters, fights, organizations or events).
+        :param batch_size: Number of rows upserted in one transaction, it bounds memory of the pass.
+        :return: Number of read rows.
+        """
+        imported = 0
+        with open(path, "rb") as jsonl_file:
+            batch: List[Dict[str, Any]] = list()
+            for line in jsonl_file:
+                if not line.strip():
+                    continue
+                batch.append(loads(line))
+                if len(batch) >= batch_size:
+                    imported += self.upsert(kind, batch)
+                    batch = list()
+            imported += self.upsert(kind, batch)
+        return imported
+
+    def _select(self, kind: str, where: str, parameters: Tuple[Any, ...], order_by: str = "") -> List[Dict[str, Any]]:
+        columns = ", ".join(_quote(column) for column, _ in TABLES[kind]["columns"])
+        order = f" ORDER BY {order_by}" if order_by else ""
+        rows = self._connection.execute(f"SELECT {columns} FROM {kind} WHERE {where}{order}", parameters).fetchall()
+        return [self._to_row(kind, row) for row in rows]
+
+    def get_fighter(self, fighter_index: int) -> Optional[Dict[str, Any]]:
+        fighters = self._select("fighters", '"index" = ?', (fighter_index,))
+        return fighters[0] if fighters else None
+
+    def find_fighters(self, fullname: str) -> List[Dict[str, Any]]:
+        return self._select("fighters", "fullname = ?", (fullname,))
+
+    def get_fighter_fights(self, fighter_index: int) -> List[Dict[str, Any]]:
+        """
+        Get fights from fighter page of the given fighter.
+        :param fighter_index: Sherdog index of fighter.
+        :return: Rows in Fight.to_dict format with the fighter as fighter A, ordered by date.
+        """
+        return self._select("fights", '"fighterIndexA" = ?', (fighter_index,), order_by='"date"')
+
+    def get_event(self, event_index: int) -> Optional[Dict[str, Any]]:
+        events = self._select("events", "event_index = ?", (event_index,))
+        return events[0] if events else None
+
+    def get_event_fights(self, event_index: int) -> List[Dict[str, Any]]:
+        return self._select("fights", '"eventIndex" = ?', (event_index,))
+
+    def get_organization(self, organization_index: int) -> Optional[Dict[str, Any]]:
+        organizations = self._select("organizations", "organization_index = ?", (organization_index,))
+        return organizations[0] if organizations else None
+
+    def get_organization_events(self, organization_index: int) -> List[Dict[str, Any]]:
+        return self._select("events", "organization_index = ?", (organization_index,), order_by="fight_date")
+
+    def count(self, kind: str) -> int:
+        return self._connection.execute(f"SELECT COUNT(*) FROM {kind}").fetchone()[0]
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import JSONL outputs of the crawl into indexed sqlite store.")
+    parser.add_argument("database", help="sqlite database of the store")
+    for table_kind in TABLES:
+        parser.add_argument(f"--{table_kind}", nargs="*", default=[], help=f"JSONL files with {table_kind}")
+    args = parser.parse_args()
+
+    store = Store(args.database)
+    for table_kind in TABLES:
+        for filename in getattr(args, table_kind):
+            print(f"Imported {store.import_jsonl(filename, table_kind)} {table_kind} from {filename}")
+        print(f"Stored {table_kind}: {store.count(table_kind)}")
+    store.close()
@@ -0,0 +1,118 @@
+"""
+Process-wide provider of User-Agent headers. The browser database of fake_useragent is loaded at most once
+per process and cached on disk, so later runs do not import fake_useragent at all.
+"""
+import json
+import os
+import random
+import threading
+
+from typing import List, Optional
+
+FALLBACK_USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/118.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/118.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36",
+]
+ROTATIONS = ("random", "round-robin", "fixed")
+
+
+class UserAgentProvider(object):
+    """UserAgentProvider class - loads user agents once and rotates them between requests."""
+
+    SAMPLE_SIZE = 50
+
+    def __init__(self, browser: str = "chrome", rotation: str = "random", cache_path: Optional[str] = None) -> None:
+        """
+        Initializes a UserAgentProvider instance, user agents are loaded on the first request.
+        :param browser: Browser family taken from fake_useragent database.
+        :param rotation: How user agent changes between requests - random, round-robin or fixed.
+        :param cache_path: JSON file with cached user agents, nothing is cached if not set.
+        """
+        if rotation not in ROTATIONS:
+            raise ValueError(f"Unknown user agent rotation {rotation}, choose one of {ROTATIONS}")
+        self.browser = browser
+        self.rotation = rotation
+        self.cache_path = cache_path
+        self._user_agents: Optional[List[str]] = None
+        self._position = 0
+        self._lock = threading.Lock()
+
+    def get(self) -> str:
+        """
+        Get User-Agent header for the next request.
+        :return: User agent string.
+        """
+        user_agents = self._user_agents or self._load()
+        if self.rotation == "fixed":
+            return user_agents[0]
+        if self.rotation == "random":
+            return random.choice(user_agents)
+        with self._lock:
+            self._position = (self._position + 1) % len(user_agents)
+            return user_agents[self._position]
+
+    def _load(self) -> List[str]:
+        with self._lock:
+            if self._user_agents is None:
+                user_agents = self._read_cache() or self._read_database()
+                if user_agents and self.cache_path:
+                    self._write_cache(self.cache_path, user_agents)
+                self._user_agents = user_agents or FALLBACK_USER_AGENTS
+            return self._user_agents
+
+    def _read_cache(self) -> List[str]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return list()
+        with open(self.cache_path) as cache_file:
+            return json.load(cache_file).get(self.browser, list())
+
+    def _write_cache(self, cache_path: str, user_agents: List[str]) -> None:
+        cached = dict()
+        if os.path.exists(cache_path):
+            with open(cache_path) as cache_file:
+                cached = json.load(cache_file)
+        cached[self.browser] = user_agents
+        directory = os.path.dirname(cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # cache is shared by processes of sharded crawl, readers never see a partially written file
+        temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as cache_file:
+            json.dump(cached, cache_file)
+        os.replace(temporary_path, cache_path)
+
+    def _read_database(self) -> List[str]:
+        try:
+            from fake_useragent import UserAgent
+
+            user_agent = UserAgent()
+            # every attribute access returns random user agent of the browser, collect a sample of them
+            return sorted({getattr(user_agent, self.browser) for _ in range(self.SAMPLE_SIZE)})
+        except Exception as error:
+            print(f"Failed to load user agents database, fallback user agents are used: {error!r}")
+            return list()
+
+
+_provider = UserAgentProvider()
+
+
+def configure_user_agents(browser: str = "chrome", rotation: str = "random", cache_path: Optional[str] = None) -> None:
+    """
+    Replace process-wide user agent provider.
+    :param browser: Browser family taken from fake_useragent database.
+    :param rotation: How user agent changes between requests - random, round-robin or fixed.
+    :param cache_path: JSON file with cached user agents, e.g. data/user_agents.json.
+    """
+    global _provider
+    _provider = UserAgentProvider(browser=browser, rotation=rotation, cache_path=cache_path)
+
+
+def get_user_agent() -> str:
+    """
+    Get User-Agent header for the next request from process-wide provider.
+    :return: User agent string.
+    """
+    return _provider.get()
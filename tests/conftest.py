@@ -0,0 +1,14 @@
+from typing import Any, Iterator
+
+import pytest
+
+from sherdog.http_session import BASE_URL_VARIABLE
+from sherdog.sherdog_standin import StandInServer
+
+
+@pytest.fixture
+def standin(monkeypatch: Any) -> Iterator[StandInServer]:
+    """Local stand-in of sherdog.com scraped instead of the real site."""
+    with StandInServer() as server:
+        monkeypatch.setenv(BASE_URL_VARIABLE, server.base_url)
+        yield server
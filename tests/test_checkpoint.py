@@ -0,0 +1,45 @@
+from typing import Any
+
+import pytest
+
+from sherdog.checkpoint import CrawlLedger
+
+
+def test_pending_skips_finished_indexes(tmp_path: Any) -> None:
+    ledger = CrawlLedger(str(tmp_path / "crawl.sqlite"))
+    ledger.mark_done(2)
+    ledger.mark_skipped(3)
+    ledger.mark_failed(4, "timeout")
+    assert list(ledger.pending(1, 5)) == [1, 4, 5]
+    assert ledger.summary() == {CrawlLedger.DONE: 1, CrawlLedger.FAILED: 1, CrawlLedger.SKIPPED: 1}
+
+
+def test_failed_index_is_retried_until_max_attempts(tmp_path: Any) -> None:
+    ledger = CrawlLedger(str(tmp_path / "crawl.sqlite"))
+    for attempt in range(3):
+        assert list(ledger.pending(1, 1, max_attempts=3)) == [1]
+        ledger.mark_failed(1, f"attempt {attempt}")
+    assert list(ledger.pending(1, 1, max_attempts=3)) == []
+    assert ledger.get_state(1) == {"state": CrawlLedger.FAILED, "attempts": 3, "error": "attempt 2"}
+
+
+def test_successful_retry_keeps_attempts(tmp_path: Any) -> None:
+    ledger = CrawlLedger(str(tmp_path / "crawl.sqlite"))
+    ledger.mark_failed(1, "timeout")
+    ledger.mark_done(1)
+    assert ledger.get_state(1) == {"state": CrawlLedger.DONE, "attempts": 1, "error": None}
+    assert ledger.get_state(2) is None
+
+
+def test_ledger_kinds_and_shards(tmp_path: Any) -> None:
+    path = str(tmp_path / "crawl.sqlite")
+    fighters = CrawlLedger(path, kind="fighters")
+    events = CrawlLedger(path, kind="events")
+    fighters.mark_done(7)
+    assert events.get_state(7) is None
+    assert events.filter_pending([9, 7, 8]) == [9, 7, 8]
+    assert fighters.filter_pending([9, 7, 8]) == [9, 8]
+    shards = [list(fighters.pending(1, 10, shard=shard, shards=3)) for shard in range(3)]
+    assert sorted(sum(shards, list())) == [index for index in range(1, 11) if index != 7]
+    with pytest.raises(ValueError):
+        list(fighters.pending(1, 10, shard=3, shards=3))
@@ -0,0 +1,37 @@
+import os
+
+from typing import Any
+
+import pytest
+
+from sherdog.cli import DEFAULT_LEDGER, main
+from sherdog.sherdog_standin import StandInServer
+
+
+def _crawl_fighters(*arguments: str) -> int:
+    common = ["--log-file", "sherdog.log", "--user-agent-cache", "", "fighters", "--start", "1", "--end", "5"]
+    return main(common + ["--requests-per-second", "0", *arguments])
+
+
+def test_directories_of_ledger_page_store_and_liveness_are_created(
+    standin: StandInServer, tmp_path: Any, monkeypatch: Any
+) -> None:
+    monkeypatch.chdir(tmp_path)
+    assert _crawl_fighters("--page-store", "pages/store.sqlite", "--liveness", "probe/fighters.bin") == 0
+    assert os.path.exists(DEFAULT_LEDGER)
+    assert os.path.exists("pages/store.sqlite")
+    assert os.path.exists("probe/fighters.bin")
+    assert os.path.exists("data/fighters.jsonl")
+
+
+def test_parquet_outputs_are_crawled_without_default_ledger(
+    standin: StandInServer, tmp_path: Any, monkeypatch: Any
+) -> None:
+    pytest.importorskip("pyarrow")
+    monkeypatch.chdir(tmp_path)
+    outputs = ["--fighters-output", "out/fighters.parquet", "--fights-output", "out/fights.parquet"]
+    assert _crawl_fighters(*outputs) == 0
+    assert os.path.exists("out/fighters.parquet")
+    assert not os.path.exists(DEFAULT_LEDGER)
+    with pytest.raises(ValueError):
+        _crawl_fighters(*outputs, "--ledger", "data/explicit.sqlite")
@@ -0,0 +1,48 @@
+from typing import Any, Dict, List
+
+import pytest
+
+from sherdog.crawler import AdaptiveRateLimiter
+
+
+class _Response(object):
+    def __init__(self, status_code: int, headers: Dict[str, str]) -> None:
+        self.status_code = status_code
+        self.headers = headers
+
+    def close(self) -> None:
+        pass
+
+
+class _Session(object):
+    """Session answering with given statuses, one per request."""
+
+    def __init__(self, statuses: List[int]) -> None:
+        self.statuses = statuses
+        self.requests = 0
+
+    def get(self, url: str, **_: Any) -> _Response:
+        status = self.statuses[min(self.requests, len(self.statuses) - 1)]
+        self.requests += 1
+        return _Response(status, {"Retry-After": "0"} if status == 429 else dict())
+
+
+def test_throttled_answer_reaches_rate_limiter_before_retry() -> None:
+    rate_limiter = AdaptiveRateLimiter(requests_per_second=10.0, max_concurrency=4)
+    session = _Session([429, 200])
+    response = rate_limiter.throttle(session).get("http://sherdog.test/fighter/1")
+    assert response.status_code == 200
+    assert session.requests == 2
+    # the first 429 decreased the rate, the retry was sent through the limiter again
+    rate, limit = rate_limiter.get_rate("http://sherdog.test/fighter/1")
+    assert rate < 10.0
+    assert limit < 4
+
+
+@pytest.mark.parametrize("retries", [0, 2])
+def test_last_throttled_answer_is_returned(retries: int) -> None:
+    session = _Session([503])
+    throttled_session = AdaptiveRateLimiter().throttle(session, retries=retries)
+    throttled_session.backoff_factor = 0.0
+    assert throttled_session.get("http://sherdog.test/fighter/1").status_code == 503
+    assert session.requests == retries + 1
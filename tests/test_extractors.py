@@ -0,0 +1,64 @@
+from typing import Any, Dict, List
+
+import pytest
+
+from sherdog.extractors import EXTRACTORS, get_extractor
+from sherdog.sherdog_standin import DIED_EVERY, MISSING_BIO_EVERY, NOT_FOUND_PAGE, SyntheticWorld
+
+WORLD = SyntheticWorld(seed=1, not_found_rate=0.6)
+
+
+def _find_fighter(condition: Any) -> int:
+    return next(index for index in range(1, 10000) if WORLD.exists("fighter", index) and condition(index))
+
+
+def _has_plain_bio(index: int) -> bool:
+    return index % MISSING_BIO_EVERY != 0 and index % DIED_EVERY != 0
+
+
+CASES = [
+    ("regular", _find_fighter(lambda index: _has_plain_bio(index) and WORLD.get_bouts(index))),
+    ("missing bio", _find_fighter(lambda index: index % MISSING_BIO_EVERY == 0)),
+    ("death date", _find_fighter(lambda index: index % DIED_EVERY == 0 and index % MISSING_BIO_EVERY)),
+    ("no fights", _find_fighter(lambda index: _has_plain_bio(index) and not WORLD.get_bouts(index))),
+]
+
+
+def _extract_all(page: str, fighter_index: int) -> Dict[str, Any]:
+    outputs = dict()
+    for name in EXTRACTORS:
+        if name == "lxml":
+            pytest.importorskip("lxml")
+        fighter = get_extractor(name).extract(page.encode("utf-8"), fighter_index)
+        fights: List[Dict[str, Any]] = [fight.to_dict() for fight in fighter.fights]
+        outputs[name] = (fighter.valid, fighter.to_dict(), fights)
+    return outputs
+
+
+@pytest.mark.parametrize("case,fighter_index", CASES)
+def test_backends_extract_identical_fighters(case: str, fighter_index: int) -> None:
+    page = WORLD.fighter_page(fighter_index)
+    assert page is not None
+    outputs = _extract_all(page, fighter_index)
+    valid, fighter, fights = outputs["soup"]
+    assert valid
+    assert fighter["fullname"] == f"Fighter {fighter_index}"
+    if case == "missing bio":
+        assert fighter["birthDate"] is None and fighter["heightCm"] is None
+    elif case == "death date":
+        assert fighter["deathDate"] is not None and fighter["birthDate"] < fighter["deathDate"]
+    else:
+        assert fighter["birthDate"] is not None and fighter["deathDate"] is None
+    assert (len(fights) == 0) == (case == "no fights")
+    assert len(fights) == len(WORLD.get_bouts(fighter_index))
+    for name, output in outputs.items():
+        assert output == outputs["soup"], name
+
+
+def test_backends_reject_not_found_page() -> None:
+    outputs = _extract_all(NOT_FOUND_PAGE, 1)
+    for name, (valid, _, fights) in outputs.items():
+        assert not valid, name
+        assert fights == [], name
+    for name, output in outputs.items():
+        assert output == outputs["soup"], name
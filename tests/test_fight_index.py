@@ -0,0 +1,58 @@
+import json
+
+from typing import Any, Dict, List
+
+from sherdog.fight_index import FightIndex
+
+
+def _get_fight(fighter_a: int, fighter_b: int, result: str, **values: Any) -> Dict[str, Any]:
+    fight = {
+        "fighterIndexA": fighter_a,
+        "fighterIndexB": fighter_b,
+        "eventIndex": 7,
+        "date": "2020-01-01T00:00:00",
+        "weightClass": None,
+        "fightType": "PRO",
+        "referee": "Herb Dean",
+        "result": result,
+        "generalDecision": "KO",
+        "specificDecision": "Punches",
+        "specificTime": 125,
+        "round": 1,
+        "titleFight": False,
+    }
+    fight.update(values)
+    return fight
+
+
+def _write_fights(path: Any, fights: List[Dict[str, Any]]) -> str:
+    with open(path, "w") as fights_file:
+        fights_file.writelines(f"{json.dumps(fight)}\n" for fight in fights)
+    return str(path)
+
+
+def _get_views(fight_index: FightIndex) -> List[int]:
+    return [row[0] for row in fight_index._connection.execute("SELECT views FROM bouts")]
+
+
+def test_both_views_are_merged(tmp_path: Any) -> None:
+    fights_filename = _write_fights(
+        tmp_path / "fights.jsonl",
+        [_get_fight(2, 1, "win", weightClass="Lightweight"), _get_fight(1, 2, "loss"), _get_fight(1, 3, "win")],
+    )
+    fight_index = FightIndex(str(tmp_path / "index.sqlite"))
+    assert fight_index.build(fights_filename) == {"rows": 3, "bouts": 2}
+    assert sorted(_get_views(fight_index)) == [1, 2]
+    fights = fight_index.get_fighter_fights(2)
+    assert len(fights) == 1
+    assert (fights[0]["fighterIndexA"], fights[0]["result"], fights[0]["weightClass"]) == (2, "win", "Lightweight")
+    assert fight_index.get_opponents(1) == {2: 1, 3: 1}
+
+
+def test_rebuild_is_idempotent(tmp_path: Any) -> None:
+    fights_filename = _write_fights(tmp_path / "fights.jsonl", [_get_fight(2, 1, "win"), _get_fight(1, 3, "win")])
+    fight_index = FightIndex(str(tmp_path / "index.sqlite"))
+    for _ in range(3):
+        assert fight_index.build(fights_filename) == {"rows": 2, "bouts": 2}
+        assert _get_views(fight_index) == [1, 1]
+        assert fight_index.get_opponents(1) == {2: 1, 3: 1}
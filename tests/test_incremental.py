@@ -0,0 +1,93 @@
+import json
+
+from typing import Any, Dict, List
+
+from sherdog.event import Event
+from sherdog.fighter import Fighter
+from sherdog.incremental import load_state, refresh_from_events
+from sherdog.sherdog_standin import StandInServer, SyntheticWorld
+
+
+def _write_events(path: Any, events: List[Dict[str, Any]]) -> str:
+    with open(path, "w") as events_file:
+        events_file.writelines(f"{json.dumps(event)}\n" for event in events)
+    return str(path)
+
+
+def _get_event(event_index: int, fight_date: str, url: str = "") -> Dict[str, Any]:
+    return {
+        "fight_date": f"{fight_date}T00:00:00",
+        "url": url or SyntheticWorld.get_event_href(event_index),
+        "event_name": f"Event {event_index}",
+        "location": "",
+        "event_index": event_index,
+        "organization_index": 1,
+    }
+
+
+def _count_fights(tmp_path: Any, fighter_index: int) -> int:
+    with open(tmp_path / "fights.jsonl") as fights_file:
+        return sum(json.loads(line)["fighterIndexA"] == fighter_index for line in fights_file if line.strip())
+
+
+def _refresh(tmp_path: Any, events: List[Dict[str, Any]]) -> Dict[str, int]:
+    return refresh_from_events(
+        _write_events(tmp_path / "events.jsonl", events),
+        str(tmp_path / "fighters.jsonl"),
+        str(tmp_path / "fights.jsonl"),
+        state_path=str(tmp_path / "state.json"),
+        concurrency=2,
+        requests_per_second=0.0,
+    )
+
+
+def test_deleted_event_does_not_hold_state_back(standin: StandInServer, tmp_path: Any) -> None:
+    events = [
+        _get_event(1, "2020-01-01"),
+        _get_event(2, "2020-01-02", url="/events/Deleted-Event"),
+        _get_event(9, "2020-01-03"),
+    ]
+    counts = _refresh(tmp_path, events)
+    assert counts["events"] == 3
+    assert counts["fighters"] > 0
+    assert load_state(str(tmp_path / "state.json"))["last_event_date"] == "2020-01-03"
+
+
+def test_failed_event_holds_state_back(standin: StandInServer, tmp_path: Any, monkeypatch: Any) -> None:
+    download_page = Event.download_page
+
+    def fail_second_event(href: str, session: Any = None) -> Any:
+        if href.endswith("-2"):
+            raise ConnectionError("connection reset")
+        return download_page(href, session)
+
+    monkeypatch.setattr(Event, "download_page", staticmethod(fail_second_event))
+    events = [_get_event(1, "2020-01-01"), _get_event(2, "2020-01-02"), _get_event(9, "2020-01-03")]
+    assert _refresh(tmp_path, events)["events"] == 1
+    assert load_state(str(tmp_path / "state.json"))["last_event_date"] == "2020-01-01"
+
+
+def test_event_published_later_on_the_same_date_is_refreshed(standin: StandInServer, tmp_path: Any) -> None:
+    assert _refresh(tmp_path, [_get_event(1, "2020-01-01")])["events"] == 1
+    assert _refresh(tmp_path, [_get_event(1, "2020-01-01"), _get_event(9, "2020-01-01")])["events"] == 1
+    assert load_state(str(tmp_path / "state.json"))["last_event_indexes"] == [1, 9]
+    assert _refresh(tmp_path, [_get_event(1, "2020-01-01"), _get_event(9, "2020-01-01")])["events"] == 0
+
+
+def test_failed_fighter_is_retried_by_next_refresh(standin: StandInServer, tmp_path: Any, monkeypatch: Any) -> None:
+    event = _get_event(1, "2020-01-01")
+    failed_index = Event.get_fighter_indexes(Event.download_page(event["url"]) or b"")[0]
+    download_page = Fighter.download_page
+
+    def fail_fighter(fighter_index: int, proxy_session: Any = None) -> Any:
+        if fighter_index == failed_index:
+            raise ConnectionError("connection reset")
+        return download_page(fighter_index, proxy_session=proxy_session)
+
+    monkeypatch.setattr(Fighter, "download_page", staticmethod(fail_fighter))
+    _refresh(tmp_path, [event])
+    assert load_state(str(tmp_path / "state.json"))["failed_fighters"] == [failed_index]
+    monkeypatch.setattr(Fighter, "download_page", staticmethod(download_page))
+    # no new events, only the failed fighter is downloaded again
+    assert _refresh(tmp_path, [event]) == {"events": 0, "fighters": 1, "fights": _count_fights(tmp_path, failed_index)}
+    assert load_state(str(tmp_path / "state.json"))["failed_fighters"] == []
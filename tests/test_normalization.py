@@ -0,0 +1,20 @@
+import pytest
+
+from sherdog.normalization import normalize_birth_date, normalize_fight_date
+
+
+def test_dates_are_normalized_to_iso() -> None:
+    assert normalize_fight_date("Apr / 18 / 1973") == "1973-04-18T00:00:00"
+    assert normalize_birth_date("Apr 18, 1973") == "1973-04-18T00:00:00"
+
+
+def test_non_ascii_digits_are_left_to_strptime() -> None:
+    assert normalize_fight_date("Apr / 18 / ١٩٧٣") == "1973-04-18T00:00:00"
+
+
+@pytest.mark.parametrize("date_text", ["Apr / ¹18 / 1973", "Apr / 18 / ¹973", "Apr / 31 / 1973"])
+def test_non_dates_raise_value_error(date_text: str) -> None:
+    with pytest.raises(ValueError):
+        normalize_fight_date(date_text)
+    with pytest.raises(ValueError):
+        normalize_birth_date(date_text.replace(" / ", " ", 1).replace(" / ", ", "))
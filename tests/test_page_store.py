@@ -0,0 +1,93 @@
+from typing import Any, Dict, List, Optional
+
+import pytest
+import requests
+
+from sherdog.page_store import PageStore
+
+URL = "https://www.sherdog.com/fighter/index?id=1"
+
+
+class _Response(object):
+    def __init__(self, status_code: int, content: bytes = b"", headers: Optional[Dict[str, str]] = None) -> None:
+        self.status_code = status_code
+        self.ok = status_code < 400
+        self.content = content
+        self.headers = headers or dict()
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} Error")
+
+
+class _Session(object):
+    """_Session class - answers requests with prepared responses and remembers sent headers."""
+
+    def __init__(self, *responses: _Response) -> None:
+        self.responses = list(responses)
+        self.sent_headers: List[Dict[str, str]] = list()
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, **_: Any) -> _Response:
+        self.sent_headers.append(dict(headers or dict()))
+        return self.responses.pop(0)
+
+
+def test_new_page_is_changed(tmp_path: Any) -> None:
+    store = PageStore(str(tmp_path / "pages.sqlite"))
+    assert store.fetch(URL, _Session(_Response(200, b"page"))) == (b"page", True)
+    stored_page = store.get(URL)
+    assert stored_page is not None and not stored_page["extracted"]
+
+
+def test_same_page_is_changed_until_extracted(tmp_path: Any) -> None:
+    store = PageStore(str(tmp_path / "pages.sqlite"))
+    session = _Session(*[_Response(200, b"page") for _ in range(3)])
+    store.fetch(URL, session)
+    # extraction of the first download failed, the page is extracted again
+    assert store.fetch(URL, session) == (b"page", True)
+    store.mark_extracted(URL)
+    assert store.fetch(URL, session) == (b"page", False)
+
+
+def test_new_content_resets_extracted(tmp_path: Any) -> None:
+    store = PageStore(str(tmp_path / "pages.sqlite"))
+    store.fetch(URL, _Session(_Response(200, b"page")))
+    store.mark_extracted(URL)
+    assert store.fetch(URL, _Session(_Response(200, b"new page"))) == (b"new page", True)
+    stored_page = store.get(URL)
+    assert stored_page is not None and not stored_page["extracted"]
+
+
+def test_not_modified_page(tmp_path: Any) -> None:
+    store = PageStore(str(tmp_path / "pages.sqlite"))
+    store.fetch(URL, _Session(_Response(200, b"page", {"ETag": '"v1"'})))
+    session = _Session(_Response(304), _Response(304))
+    assert store.fetch(URL, session) == (b"page", True)
+    assert session.sent_headers[0]["If-None-Match"] == '"v1"'
+    store.mark_extracted(URL)
+    assert store.fetch(URL, session) == (b"page", False)
+
+
+def test_missing_page(tmp_path: Any) -> None:
+    store = PageStore(str(tmp_path / "pages.sqlite"))
+    assert store.fetch(URL, _Session(_Response(404))) == (None, True)
+    assert store.get(URL) is None
+
+
+def test_throttled_page_is_not_missing(tmp_path: Any) -> None:
+    store = PageStore(str(tmp_path / "pages.sqlite"))
+    with pytest.raises(requests.HTTPError):
+        store.fetch(URL, _Session(_Response(429)))
+    assert store.get(URL) is None
+
+
+def test_archive_without_extracted_column(tmp_path: Any) -> None:
+    path = str(tmp_path / "pages.sqlite")
+    store = PageStore(path)
+    store.fetch(URL, _Session(_Response(200, b"page")))
+    store.mark_extracted(URL)
+    store._connection.execute("ALTER TABLE pages DROP COLUMN extracted")
+    store._connection.commit()
+    store.close()
+    store = PageStore(path)
+    assert store.fetch(URL, _Session(_Response(200, b"page"))) == (b"page", True)
@@ -0,0 +1,65 @@
+import threading
+
+from typing import Any
+
+from sherdog.http_session import BASE_URL_VARIABLE
+from sherdog.organization import Organization
+from sherdog.probe import LivenessMap, probe_organization
+from sherdog.sherdog_standin import StandInServer
+
+from sherdog import scrapers
+
+
+def test_missing_fighters_are_marked_dead_without_probing(tmp_path: Any, monkeypatch: Any) -> None:
+    liveness = LivenessMap(str(tmp_path / "liveness.bin"))
+    with StandInServer(not_found_rate=0.5, seed=1) as server:
+        monkeypatch.setenv(BASE_URL_VARIABLE, server.base_url)
+        scrapers.scrape_all_fighters_concurrently(
+            str(tmp_path / "fighters.jsonl"),
+            str(tmp_path / "fights.jsonl"),
+            start_index=1,
+            end_index=20,
+            requests_per_second=0.0,
+            liveness=liveness,
+        )
+        missing = [index for index in range(1, 21) if not server.world.exists("fighter", index)]
+    assert missing
+    assert [index for index in range(1, 21) if liveness.is_dead(index)] == missing
+    assert LivenessMap(str(tmp_path / "liveness.bin")).counts() == {"live": 20 - len(missing), "dead": len(missing)}
+
+
+def test_missing_organizations_are_probed_dead(tmp_path: Any, monkeypatch: Any) -> None:
+    liveness = LivenessMap()
+    with StandInServer(not_found_rate=0.5, seed=1) as server:
+        monkeypatch.setenv(BASE_URL_VARIABLE, server.base_url)
+        for organization_index in range(1, 11):
+            state = probe_organization(organization_index, Organization.get_url(organization_index))
+            exists = server.world.exists("organization", organization_index)
+            assert state == (LivenessMap.UNKNOWN if exists else LivenessMap.DEAD)
+        scrapers.scrape_all_organizations(
+            str(tmp_path / "organizations.jsonl"),
+            str(tmp_path / "events.jsonl"),
+            start_index=1,
+            end_index=10,
+            liveness=liveness,
+            probe=True,
+        )
+        missing = [index for index in range(1, 11) if not server.world.exists("organization", index)]
+    assert missing
+    assert [index for index in range(1, 11) if liveness.is_dead(index)] == missing
+
+
+def test_concurrent_saves_keep_bitmap_readable(tmp_path: Any) -> None:
+    liveness = LivenessMap(str(tmp_path / "liveness.bin"), save_every=1)
+
+    def set_dead(first_index: int) -> None:
+        for index in range(first_index, 4000, 8):
+            liveness.set_dead(index)
+
+    threads = [threading.Thread(target=set_dead, args=(first_index,)) for first_index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    liveness.save()
+    assert LivenessMap(str(tmp_path / "liveness.bin")).counts() == {"live": 0, "dead": 4000}
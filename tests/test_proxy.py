@@ -0,0 +1,45 @@
+from typing import Any, Dict, List
+
+from sherdog.proxy import ProxyPool
+
+
+class _Session(object):
+    def __init__(self) -> None:
+        self.closed = False
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class _Proxies(object):
+    """Free proxies of the test, valid_urls decides which of them pass validation."""
+
+    def __init__(self, valid_urls: List[str]) -> None:
+        self.valid_urls = valid_urls
+        self.sessions: Dict[str, _Session] = dict()
+
+    def _get_free_proxies(self) -> List[Dict[str, Any]]:
+        return [{"url": url, "https_available": True} for url in self.valid_urls]
+
+    def _get_only_valid_proxies(self, proxies_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [dict(data, request_time=0.1) for data in proxies_data if data["url"] in self.valid_urls]
+
+    def _get_https_session(self, proxy_url: str, trust_env: bool = False, retries: int = 0) -> _Session:
+        self.sessions[proxy_url] = _Session()
+        return self.sessions[proxy_url]
+
+
+def test_sessions_of_evicted_proxies_are_closed() -> None:
+    proxies = _Proxies(["1.1.1.1:80", "2.2.2.2:80"])
+    pool = ProxyPool(proxies=proxies, max_consecutive_errors=2)  # type: ignore[arg-type]
+    assert pool.refresh() == 2
+    proxies.valid_urls = ["1.1.1.1:80"]
+    assert pool.refresh() == 1
+    assert proxies.sessions["2.2.2.2:80"].closed
+    assert not proxies.sessions["1.1.1.1:80"].closed
+
+    pool.report("1.1.1.1:80", success=False)
+    assert not proxies.sessions["1.1.1.1:80"].closed
+    pool.report("1.1.1.1:80", success=False)
+    assert proxies.sessions["1.1.1.1:80"].closed
+    assert pool.acquire() is None
@@ -0,0 +1,106 @@
+import json
+
+from functools import partial
+from typing import Any, List
+
+import pytest
+
+from sherdog.checkpoint import CrawlLedger
+from sherdog.extractors import get_extractor
+from sherdog.http_session import BASE_URL_VARIABLE, build_session
+from sherdog.page_store import PageStore
+from sherdog.sherdog_standin import StandInServer
+
+from sherdog import scrapers
+
+
+class _FailingExtractor(object):
+    def extract(self, page_content: bytes, fighter_index: int) -> Any:
+        raise ValueError("extraction failed")
+
+
+def _read_jsonl(path: Any) -> List[Any]:
+    with open(path) as jsonl_file:
+        return [json.loads(line) for line in jsonl_file]
+
+
+def _crawl_fighters(tmp_path: Any, run: str, **kwargs: Any) -> None:
+    scrapers.scrape_all_fighters_concurrently(
+        str(tmp_path / f"fighters_{run}.jsonl"),
+        str(tmp_path / f"fights_{run}.jsonl"),
+        start_index=1,
+        end_index=10,
+        concurrency=4,
+        requests_per_second=0.0,
+        **kwargs,
+    )
+
+
+def test_failed_extraction_is_repeated_for_unchanged_pages(
+    standin: StandInServer, tmp_path: Any, monkeypatch: Any
+) -> None:
+    page_store = PageStore(str(tmp_path / "pages.sqlite"))
+    ledger = CrawlLedger(str(tmp_path / "crawl.sqlite"))
+    monkeypatch.setattr(scrapers, "get_extractor", lambda backend: _FailingExtractor())
+    _crawl_fighters(tmp_path, "first", page_store=page_store, ledger=ledger)
+    assert ledger.summary()[CrawlLedger.FAILED] == 10
+    monkeypatch.setattr(scrapers, "get_extractor", get_extractor)
+    _crawl_fighters(tmp_path, "second", page_store=page_store, ledger=ledger)
+    assert ledger.summary()[CrawlLedger.DONE] == 10
+    assert [fighter["index"] for fighter in _read_jsonl(tmp_path / "fighters_second.jsonl")] == list(
+        range(1, 11)
+    )
+
+
+def test_unchanged_pages_are_skipped_once_written(standin: StandInServer, tmp_path: Any) -> None:
+    page_store = PageStore(str(tmp_path / "pages.sqlite"))
+    _crawl_fighters(tmp_path, "first", page_store=page_store)
+    _crawl_fighters(tmp_path, "second", page_store=page_store)
+    assert len(_read_jsonl(tmp_path / "fighters_first.jsonl")) == 10
+    assert _read_jsonl(tmp_path / "fighters_second.jsonl") == []
+    # a new ledger means a new output, which has to get all fighters
+    _crawl_fighters(tmp_path, "third", page_store=page_store, ledger=CrawlLedger(str(tmp_path / "crawl.sqlite")))
+    assert len(_read_jsonl(tmp_path / "fighters_third.jsonl")) == 10
+
+
+@pytest.mark.parametrize("with_page_store", [False, True])
+def test_throttled_fighters_are_retried(tmp_path: Any, monkeypatch: Any, with_page_store: bool) -> None:
+    ledger = CrawlLedger(str(tmp_path / "crawl.sqlite"))
+    page_store = PageStore(str(tmp_path / "pages.sqlite")) if with_page_store else None
+    monkeypatch.setattr(scrapers, "build_session", partial(build_session, backoff_factor=0.0))
+    # every fighter exists, so none of them may be recorded as missing
+    with StandInServer(throttle_rate=0.5, retry_after_seconds=0, seed=3) as server:
+        monkeypatch.setenv(BASE_URL_VARIABLE, server.base_url)
+        for run in ("first", "second"):
+            scrapers.scrape_all_fighters_concurrently(
+                str(tmp_path / f"fighters_{run}.jsonl"),
+                str(tmp_path / f"fights_{run}.jsonl"),
+                start_index=1,
+                end_index=60,
+                requests_per_second=0.0,
+                page_store=page_store,
+                ledger=ledger,
+            )
+            summary = ledger.summary()
+            assert summary[CrawlLedger.SKIPPED] == 0
+            assert summary[CrawlLedger.DONE] + summary[CrawlLedger.FAILED] == 60
+            server.throttle_rate = 0.0
+    assert ledger.summary()[CrawlLedger.DONE] == 60
+
+
+def test_unchanged_organizations_are_not_written_again(standin: StandInServer, tmp_path: Any) -> None:
+    page_store = PageStore(str(tmp_path / "pages.sqlite"))
+    for run in ("first", "second"):
+        scrapers.scrape_all_organizations(
+            str(tmp_path / f"organizations_{run}.jsonl"),
+            str(tmp_path / f"events_{run}.jsonl"),
+            page_store=page_store,
+            start_index=48,
+            end_index=52,
+        )
+    existing = [index for index in range(48, 53) if standin.world.exists("organization", index)]
+    organizations = _read_jsonl(tmp_path / "organizations_first.jsonl")
+    assert [organization["organization_index"] for organization in organizations] == existing
+    assert len(_read_jsonl(tmp_path / "events_first.jsonl")) > 0
+    assert _read_jsonl(tmp_path / "organizations_second.jsonl") == []
+    assert _read_jsonl(tmp_path / "events_second.jsonl") == []
@@ -0,0 +1,66 @@
+import json
+import time
+
+from typing import Any
+
+from sherdog.sharded_crawl import WorkQueue, merge_shards, renewed_lease, split_crawl_kwargs
+
+
+def test_chunks_are_leased_once(tmp_path: Any) -> None:
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"))
+    assert queue.enqueue_range(1, 25, chunk_size=10) == 3
+    assert queue.enqueue_range(1, 25, chunk_size=10) == 0
+    assert [queue.lease(worker) for worker in ("a", "b", "c", "d")] == [(1, 10), (11, 20), (21, 25), None]
+    assert queue.complete(1, "a")
+    assert queue.release(11, "b")
+    assert queue.summary() == {WorkQueue.PENDING: 1, WorkQueue.LEASED: 1, WorkQueue.DONE: 1}
+    assert queue.lease("d") == (11, 20)
+
+
+def test_expired_lease_is_leased_again(tmp_path: Any) -> None:
+    queue = WorkQueue(str(tmp_path / "queue.sqlite"))
+    queue.enqueue_range(1, 10, chunk_size=10)
+    assert queue.lease("a", lease_seconds=0.05) == (1, 10)
+    assert queue.lease("b", lease_seconds=0.05) is None
+    time.sleep(0.1)
+    assert queue.lease("b") == (1, 10)
+    # stale worker cannot renew, complete nor release chunk leased by another one
+    assert not queue.renew(1, "a")
+    assert not queue.complete(1, "a")
+    assert not queue.release(1, "a")
+    assert queue.get_chunks() == [(1, 10, WorkQueue.LEASED)]
+    assert queue.complete(1, "b")
+    assert queue.get_chunks() == [(1, 10, WorkQueue.DONE)]
+
+
+def test_renewed_lease_does_not_expire(tmp_path: Any) -> None:
+    queue_path = str(tmp_path / "queue.sqlite")
+    queue = WorkQueue(queue_path)
+    queue.enqueue_range(1, 10, chunk_size=10)
+    assert queue.lease("a", lease_seconds=0.3) == (1, 10)
+    with renewed_lease(queue_path, "fighters", "a", 1, lease_seconds=0.3):
+        time.sleep(0.6)
+        assert queue.lease("b") is None
+    time.sleep(0.4)
+    assert queue.lease("b") == (1, 10)
+
+
+def test_merge_shards_in_index_order(tmp_path: Any) -> None:
+    (tmp_path / "fights").mkdir()
+    for name, indexes in (("000000011-000000020", [11, 12]), ("000000001-000000010", [1, 2])):
+        with open(tmp_path / "fights" / f"{name}.jsonl", "w") as shard_file:
+            shard_file.writelines(f"{json.dumps({'fighterIndexA': index})}\n" for index in indexes)
+    assert merge_shards(str(tmp_path), "fights", str(tmp_path / "fights.jsonl")) == 4
+    with open(tmp_path / "fights.jsonl") as fights_file:
+        assert [json.loads(line)["fighterIndexA"] for line in fights_file] == [1, 2, 11, 12]
+
+
+def test_rate_limit_and_concurrency_are_split_among_workers() -> None:
+    organization_kwargs = split_crawl_kwargs({"requests_per_second": 4.0, "concurrency": 8}, workers=4)
+    assert organization_kwargs == {"requests_per_second": 1.0, "concurrency": 2}
+    # defaults of the whole crawl are split too, a worker always gets at least one request in flight
+    assert split_crawl_kwargs({"backend": "lxml"}, workers=16) == {
+        "backend": "lxml",
+        "requests_per_second": 0.25,
+        "concurrency": 1,
+    }
@@ -0,0 +1,95 @@
+import json
+
+from typing import Any, Dict, List
+
+from sherdog.store import Store
+
+
+def _get_fighter(fighter_index: int, fullname: str) -> Dict[str, Any]:
+    return {
+        "index": fighter_index,
+        "fullname": fullname,
+        "url": f"/fighter/{fullname.replace(' ', '-')}-{fighter_index}",
+        "nickname": None,
+        "birthDate": "1990-01-01T00:00:00",
+        "deathDate": None,
+        "nationality": "United States",
+        "locality": None,
+        "weightKg": 70.3,
+        "heightCm": 180.34,
+        "associations": ["Team A", "Team B"],
+        "weight_class": "Lightweight",
+        "style": None,
+    }
+
+
+def _get_fight(fighter_a: int, fighter_b: int, **values: Any) -> Dict[str, Any]:
+    fight = {
+        "fighterIndexA": fighter_a,
+        "fighterIndexB": fighter_b,
+        "eventIndex": 7,
+        "date": "2020-01-01T00:00:00",
+        "weightClass": None,
+        "fightType": "PRO",
+        "referee": "Herb Dean",
+        "result": "WIN",
+        "generalDecision": "KO",
+        "specificDecision": "Punches",
+        "specificTime": 125,
+        "round": 1,
+        "titleFight": True,
+    }
+    fight.update(values)
+    return fight
+
+
+def _write_rows(path: Any, rows: List[Dict[str, Any]]) -> str:
+    with open(path, "w") as rows_file:
+        rows_file.writelines(f"{json.dumps(row)}\n" for row in rows)
+    return str(path)
+
+
+def test_upserting_same_rows_again_changes_nothing(tmp_path: Any) -> None:
+    store = Store(str(tmp_path / "sherdog.sqlite"))
+    fighters = [_get_fighter(1, "John Doe"), _get_fighter(2, "Jack Roe")]
+    fights = [_get_fight(1, 2), _get_fight(2, 1, result="LOSS")]
+    for _ in range(2):
+        assert store.upsert("fighters", fighters) == 2
+        assert store.upsert("fights", fights) == 2
+    assert store.count("fighters") == 2
+    # both views of a bout are kept
+    assert store.count("fights") == 2
+    assert store.get_fighter(1) == fighters[0]
+    assert store.get_fighter_fights(1) == [fights[0]]
+    store.close()
+
+
+def test_upsert_replaces_stored_row(tmp_path: Any) -> None:
+    store = Store(str(tmp_path / "sherdog.sqlite"))
+    store.upsert("fighters", [_get_fighter(1, "John Doe")])
+    store.upsert("fights", [_get_fight(1, 2, titleFight=False)])
+    renamed_fighter = _get_fighter(1, "Johnny Doe")
+    renamed_fighter["associations"] = None
+    store.upsert("fighters", [renamed_fighter])
+    store.upsert("fights", [_get_fight(1, 2, referee="Marc Goddard", titleFight=None)])
+    assert store.count("fighters") == 1
+    assert store.get_fighter(1) == renamed_fighter
+    assert store.find_fighters("John Doe") == []
+    assert store.count("fights") == 1
+    assert store.get_fighter_fights(1) == [_get_fight(1, 2, referee="Marc Goddard", titleFight=None)]
+    store.close()
+
+
+def test_importing_jsonl_again_changes_nothing(tmp_path: Any) -> None:
+    fighters = [_get_fighter(1, "John Doe"), _get_fighter(2, "Jack Roe")]
+    fighters_filename = _write_rows(tmp_path / "fighters.jsonl", fighters)
+    fights_filename = _write_rows(tmp_path / "fights.jsonl", [_get_fight(1, 2), _get_fight(2, 1, result="LOSS")])
+    store = Store(str(tmp_path / "sherdog.sqlite"))
+    for _ in range(2):
+        assert store.import_jsonl(fighters_filename, "fighters", batch_size=1) == 2
+        assert store.import_jsonl(fights_filename, "fights", batch_size=1) == 2
+    assert store.count("fighters") == 2
+    assert store.count("fights") == 2
+    event_fights = sorted(store.get_event_fights(7), key=lambda fight: fight["fighterIndexA"])
+    assert event_fights == [_get_fight(1, 2), _get_fight(2, 1, result="LOSS")]
+    store.close()
@@ -0,0 +1,38 @@
+import json
+
+from typing import Any, List
+
+from sherdog import user_agent
+from sherdog.cli import get_parser, main
+from sherdog.user_agent import UserAgentProvider
+
+
+def test_user_agents_are_loaded_from_database_only_once(tmp_path: Any, monkeypatch: Any) -> None:
+    cache_path = str(tmp_path / "data" / "user_agents.json")
+    loads: List[int] = list()
+
+    def read_database(provider: UserAgentProvider) -> List[str]:
+        loads.append(1)
+        return ["agent a", "agent b"]
+
+    monkeypatch.setattr(UserAgentProvider, "_read_database", read_database)
+    assert UserAgentProvider(rotation="fixed", cache_path=cache_path).get() == "agent a"
+    with open(cache_path) as cache_file:
+        assert json.load(cache_file) == {"chrome": ["agent a", "agent b"]}
+    provider = UserAgentProvider(rotation="round-robin", cache_path=cache_path)
+    assert [provider.get() for _ in range(3)] == ["agent b", "agent a", "agent b"]
+    assert len(loads) == 1
+
+
+def test_command_line_configures_cached_user_agents(tmp_path: Any, monkeypatch: Any) -> None:
+    monkeypatch.setattr(user_agent, "_provider", user_agent._provider)
+    assert get_parser().parse_args(["fighters"]).user_agent_cache == "data/user_agents.json"
+    cache_path = str(tmp_path / "user_agents.json")
+    with open(cache_path, "w") as cache_file:
+        json.dump({"chrome": ["cached agent"]}, cache_file)
+    pages = tmp_path / "pages"
+    pages.mkdir()
+    argv = ["--log-file", str(tmp_path / "sherdog.log"), "--user-agent-cache", cache_path, "parse-only", str(pages)]
+    argv += ["--fighters-output", str(tmp_path / "fighters.jsonl"), "--fights-output", str(tmp_path / "fights.jsonl")]
+    assert main(argv) == 0
+    assert user_agent.get_user_agent() == "cached agent"